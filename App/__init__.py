@@ -2,31 +2,48 @@ import os
 
 import sentry_sdk
 from flask import Flask
-from flask_jwt_extended import get_jwt, verify_jwt_in_request
-from sentry_sdk.integrations.flask import FlaskIntegration
 from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import factory
-from app.extensions import cache, db, jwt, limiter
+from app.extensions import cache, db, jwt, limiter, migrate
+from app.utils.admision import ControlAdmision
+from app.utils.compresion import Compresion
+from app.utils.decorators import verificar_jwt
+from app.utils.json_provider import FastJSONProvider
+from app.utils.metricas import Metricas
+from app.utils.perfil_sql import PerfilSQL
+from app.utils.perfilador import Perfilador
+from app.utils.telemetria import iniciar_telemetria, instrumentar_app
+from app.utils.trazas import iniciar_sentry
 
 def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(factory(config_name))
+    app.json = FastJSONProvider(app)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
-    # Inicialización de Celery para vincularlo al contexto de Flask
-    from app.celery_app import celery
-    
-    # Configuración de Sentry
-    sentry_dsn = os.getenv("SENTRY_DSN_BACKEND")
-    if sentry_dsn:
-        sentry_sdk.init(
-            dsn=sentry_dsn,
-            integrations=[FlaskIntegration()],
-            traces_sample_rate=1.0
-        )
+    # Configuración de Sentry (muestreo de trazas por ruta y resultado, ver SENTRY_TRAZAS_*)
+    iniciar_sentry(app.config)
+    # Trazas de OpenTelemetry (OTEL_EXPORTADOR): Flask, SQLAlchemy, Redis, requests, R2 y Celery
+    iniciar_telemetria(app.config)
+    # Asignaciones trazadas desde el arranque (reportes de GET /api/v1/memoria)
+    if app.config.get('MEMORIA_TRACEMALLOC_MARCOS'):
+        from app.utils.memoria import iniciar_tracemalloc
+        iniciar_tracemalloc(app.config['MEMORIA_TRACEMALLOC_MARCOS'])
 
     # Inicialización de extensiones
+    # Primero las métricas: la latencia incluye la espera de admisión
+    Metricas(app)
+    # Perfil de una petición a pedido de un administrador (X-Perfilar), cierra después de PerfilSQL
+    Perfilador(app)
+    # Sentencias SQL por petición, detección de N+1 y presupuesto (SQL_PRESUPUESTO)
+    PerfilSQL(app)
+    # Antes de db.init_app: instala el pool que respeta el plazo de cada petición
+    ControlAdmision(app)
     db.init_app(app)
+    instrumentar_app(app, db)
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(__file__), 'migrations'))
     cache.init_app(app)
+    # gzip/brotli para respuestas grandes; las variantes comprimidas se guardan en la caché
+    Compresion(app, cache)
     limiter.init_app(app)
     jwt.init_app(app)
 
@@ -34,8 +51,8 @@ def create_app(config_name=None):
     @app.before_request
     def set_sentry_user_context():
         try:
-            verify_jwt_in_request(optional=True)
-            claims = get_jwt()
+            # Misma verificación que reutilizan luego @jwt_required y @admin_required
+            claims = verificar_jwt(opcional=True)
             if claims and "email" in claims:
                 sentry_sdk.set_user({
                     "id": claims.get("sub"),
@@ -52,13 +69,17 @@ def create_app(config_name=None):
     from app.routes.administrador_resource import Administrador
     from app.routes.analytics_resource import Analytics
     from app.routes.auth_resource import Auth
+    from app.routes.cache_resource import CacheBP
     from app.routes.chatbot_resource import ChatbotBP
     from app.routes.config_resource import Config
+    from app.routes.diagnostico_resource import Diagnostico
     from app.routes.fecha_resource import Fecha
     from app.routes.gasto_resource import GastoBP
     from app.routes.pago_resource import PagoBP
     from app.routes.persona_resource import Persona
     from app.routes.reserva_resource import Reserva
+    from app.routes.stream_resource import Stream
+    from app.routes.sync_resource import Sync
     from app.routes.test_notifications_resource import TestNotifications
     from app.routes.usuario_resource import Usuario
     
@@ -74,6 +95,10 @@ def create_app(config_name=None):
     app.register_blueprint(TestNotifications, url_prefix='/api/v1')
     app.register_blueprint(GastoBP, url_prefix='/api/v1')
     app.register_blueprint(ChatbotBP, url_prefix='/api/v1')
+    app.register_blueprint(Stream, url_prefix='/api/v1')
+    app.register_blueprint(Sync, url_prefix='/api/v1')
+    app.register_blueprint(CacheBP, url_prefix='/api/v1')
+    app.register_blueprint(Diagnostico, url_prefix='/api/v1')
     
     @app.teardown_appcontext
     def shutdown_session(exception=None):
@@ -0,0 +1,80 @@
+"""
+Presupuesto de arranque: tiempo de `import app` + `create_app()` y RSS del proceso.
+
+Mide en un intérprete nuevo (sin módulos ya cargados) y además verifica que las
+dependencias pesadas no se importen al levantar la app: WeasyPrint, Dialogflow,
+boto3, Celery, pyinstrument y las integraciones de Sentry se cargan recién donde se usan.
+Termina con código 1 si se excede el presupuesto, para poder usarlo en CI.
+
+Uso:
+    python -m app.benchmarks.arranque
+    python -m app.benchmarks.arranque --max-segundos 1.5 --max-rss-mb 120 --config testing
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Módulos que no deben aparecer en sys.modules después de create_app()
+MODULOS_PESADOS = (
+    'weasyprint',
+    'google.cloud.dialogflow',
+    'boto3',
+    'botocore',
+    'celery',
+    'sentry_sdk.integrations.flask',
+    'pyinstrument',
+    'opentelemetry.sdk',
+)
+
+_MEDICION = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+from app import create_app
+create_app({config!r})
+segundos = time.perf_counter() - inicio
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+pesados = [m for m in {pesados!r} if m in sys.modules]
+print(json.dumps({{'segundos': segundos, 'rss_mb': rss_kb / 1024, 'pesados': pesados}}))
+"""
+
+
+def medir(config: str) -> dict:
+    codigo = _MEDICION.format(config=config, pesados=MODULOS_PESADOS)
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True,
+                            env={**os.environ, 'SENTRY_DSN_BACKEND': ''})
+    if salida.returncode != 0:
+        raise RuntimeError(salida.stderr.strip().splitlines()[-1] if salida.stderr else "create_app() falló")
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica el presupuesto de arranque de create_app()")
+    parser.add_argument('--max-segundos', type=float, default=float(os.getenv('ARRANQUE_MAX_SEGUNDOS', 2.0)))
+    parser.add_argument('--max-rss-mb', type=float, default=float(os.getenv('ARRANQUE_MAX_RSS_MB', 150)))
+    parser.add_argument('--config', default='testing')
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    mediciones = [medir(args.config) for _ in range(args.repeticiones)]
+    segundos = min(m['segundos'] for m in mediciones)
+    rss_mb = max(m['rss_mb'] for m in mediciones)
+    pesados = sorted({p for m in mediciones for p in m['pesados']})
+
+    print(f"create_app({args.config!r}): {segundos:.3f}s (máx {args.max_segundos}s), "
+          f"RSS {rss_mb:.1f} MB (máx {args.max_rss_mb} MB)")
+    fallas = []
+    if segundos > args.max_segundos:
+        fallas.append("tiempo de arranque excedido")
+    if rss_mb > args.max_rss_mb:
+        fallas.append("RSS excedido")
+    if pesados:
+        fallas.append(f"módulos pesados importados al arrancar: {', '.join(pesados)}")
+    for falla in fallas:
+        print(f"  FALLA: {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
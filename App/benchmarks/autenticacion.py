@@ -0,0 +1,115 @@
+"""
+Micro-benchmark de la verificación del JWT por petición.
+
+Compara, en una app mínima con las mismas capas que las rutas reales
+(middleware de Sentry + @jwt_required + @admin_required):
+
+- antes: cada capa llama a verify_jwt_in_request (3 decodificaciones y
+  verificaciones de firma por petición autenticada);
+- ahora: verificar_jwt decodifica una vez y las demás capas leen de `g`.
+
+Uso:
+    python -m app.benchmarks.autenticacion            # 3000 peticiones
+    python -m app.benchmarks.autenticacion 10000
+"""
+import sys
+import time
+from functools import wraps
+
+from flask import Flask, jsonify
+from flask_jwt_extended import (JWTManager, create_access_token, get_jwt, jwt_required as jwt_required_original,
+                                verify_jwt_in_request)
+from flask_jwt_extended import view_decorators
+
+from app.utils.decorators import admin_required, jwt_required, verificar_jwt
+
+
+def _admin_required_original(fn):
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        verify_jwt_in_request()
+        if get_jwt().get("role") == "administrador":
+            return fn(*args, **kwargs)
+        return jsonify(message="¡Acceso solo para administradores!"), 403
+    return decorator
+
+
+def _app() -> Flask:
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'benchmark-' + 'x' * 32
+    JWTManager(app)
+
+    @app.before_request
+    def contexto():
+        from flask import request
+        if request.path.startswith('/antes'):
+            try:
+                verify_jwt_in_request(optional=True)
+                get_jwt()
+            except Exception:
+                pass
+        else:
+            verificar_jwt(opcional=True)
+
+    @app.route('/antes')
+    @jwt_required_original()
+    @_admin_required_original
+    def antes():
+        return jsonify(ok=True)
+
+    @app.route('/ahora')
+    @jwt_required()
+    @admin_required()
+    def ahora():
+        return jsonify(ok=True)
+
+    return app
+
+
+def _contar_decodificaciones(cliente, ruta: str, cabeceras: dict) -> int:
+    contador = {'n': 0}
+    original = view_decorators.decode_token
+
+    def contando(*args, **kwargs):
+        contador['n'] += 1
+        return original(*args, **kwargs)
+
+    view_decorators.decode_token = contando
+    try:
+        cliente.get(ruta, headers=cabeceras)
+    finally:
+        view_decorators.decode_token = original
+    return contador['n']
+
+
+def _medir(cliente, ruta: str, cabeceras: dict, cantidad: int) -> float:
+    """Microsegundos por petición (mejor de 3 rondas)."""
+    mejor = float('inf')
+    for _ in range(3):
+        inicio = time.perf_counter()
+        for _ in range(cantidad):
+            cliente.get(ruta, headers=cabeceras)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / cantidad * 1e6
+
+
+def main(cantidad: int = 3000):
+    app = _app()
+    with app.app_context():
+        token = create_access_token(identity='1', additional_claims={
+            'role': 'administrador', 'email': 'admin@salon.com', 'username': 'admin'})
+    cabeceras = {'Authorization': f'Bearer {token}'}
+    cliente = app.test_client()
+
+    assert cliente.get('/antes', headers=cabeceras).status_code == 200
+    assert cliente.get('/ahora', headers=cabeceras).status_code == 200
+
+    print(f"Peticiones: {cantidad}")
+    for ruta in ('/antes', '/ahora'):
+        decodificaciones = _contar_decodificaciones(cliente, ruta, cabeceras)
+        micros = _medir(cliente, ruta, cabeceras, cantidad)
+        print(f"  {ruta:<8} {micros:8.1f} µs/petición   {decodificaciones} decodificación(es) del JWT")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
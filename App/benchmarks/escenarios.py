@@ -0,0 +1,163 @@
+"""
+Escenarios de la suite de rendimiento, compartidos por la prueba de carga
+(locustfile.py) y los micro-benchmarks en proceso (micro.py), y los datos que
+necesitan: ids y términos sacados de la base sembrada (megabase.sql o
+`python -m app.benchmarks.sembrar`), para no pedir fechas o reservas inexistentes.
+
+Uso (genera el archivo de datos que lee locust con BENCH_DATOS):
+    python -m app.benchmarks.escenarios > datos_bench.json
+"""
+import json
+import random
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+
+# Comprobante de ~200 KB, como una foto o PDF de transferencia
+COMPROBANTE = b'%PDF-1.4\n' + b'0' * 200_000
+
+
+@dataclass
+class Peticion:
+    metodo: str
+    ruta: str
+    nombre: str  # Agrupa en el reporte (sin ids)
+    rol: str = None  # None (público), 'usuario' o 'administrador'
+    params: dict = None
+    json: dict = None
+    formulario: dict = None
+    archivo: bytes = None  # Se envía como el campo 'comprobante'
+
+
+@dataclass
+class Datos:
+    fechas: list = field(default_factory=list)
+    # Fechas disponibles a futuro: cada solicitud de reserva consume una (una reserva por día)
+    fechas_libres: deque = field(default_factory=deque)
+    reservas_con_saldo: list = field(default_factory=list)
+    terminos: list = field(default_factory=list)
+
+    @classmethod
+    def desde_json(cls, datos: dict) -> 'Datos':
+        return cls(fechas=datos['fechas'], fechas_libres=deque(datos['fechas_libres']),
+                   reservas_con_saldo=datos['reservas_con_saldo'], terminos=datos['terminos'])
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'Datos':
+        with open(ruta) as archivo:
+            return cls.desde_json(json.load(archivo))
+
+
+def preparar(app, limite: int = 5000) -> dict:
+    """
+    Lee de la base los ids y términos de búsqueda que usan los escenarios.
+    """
+    from sqlalchemy import func
+
+    from app.extensions import db
+    from app.models import Fecha, Pago, Reserva, Usuario
+
+    with app.app_context():
+        fechas = [id for (id,) in db.session.query(Fecha.id).order_by(func.random()).limit(limite)]
+        libres = [id for (id,) in db.session.query(Fecha.id).filter(
+            Fecha.estado == 'disponible', Fecha.dia > date.today()
+        ).order_by(Fecha.dia).limit(limite)]
+        pagado = db.session.query(func.coalesce(func.sum(Pago.monto), 0)).filter(
+            Pago.reserva_id == Reserva.id).scalar_subquery()
+        reservas = [id for (id,) in db.session.query(Reserva.id).filter(
+            Reserva.estado == 'confirmada', Reserva.valor_alquiler - pagado > 1000
+        ).order_by(func.random()).limit(limite)]
+        apellidos = [apellido for (apellido,) in db.session.query(Usuario.apellido).filter(
+            Usuario.apellido.isnot(None)
+        ).order_by(func.random()).limit(200)]
+
+    # Búsqueda en vivo: el panel consulta a medida que se tipea (2, 3, 4... letras)
+    terminos = sorted({apellido[:n].lower() for apellido in apellidos for n in (2, 3, 5) if len(apellido) >= n})
+    return {'fechas': fechas, 'fechas_libres': libres, 'reservas_con_saldo': reservas, 'terminos': terminos}
+
+
+# --- Escenarios -------------------------------------------------------------
+
+def calendario(datos: Datos) -> Peticion:
+    return Peticion('GET', '/api/v1/fecha', 'GET /fecha')
+
+
+def calendario_proyectado(datos: Datos) -> Peticion:
+    return Peticion('GET', '/api/v1/fecha', 'GET /fecha?fields', params={'fields': 'id,dia,estado'})
+
+
+def detalle_fecha(datos: Datos) -> Peticion:
+    return Peticion('GET', f'/api/v1/fecha/{random.choice(datos.fechas)}', 'GET /fecha/[id]')
+
+
+def busqueda_reservas(datos: Datos) -> Peticion:
+    return Peticion('GET', '/api/v1/reserva/buscar', 'GET /reserva/buscar', rol='administrador',
+                    params={'q': random.choice(datos.terminos)})
+
+
+def busqueda_usuarios(datos: Datos) -> Peticion:
+    return Peticion('GET', '/api/v1/usuario/buscar', 'GET /usuario/buscar', rol='administrador',
+                    params={'q': random.choice(datos.terminos)})
+
+
+def solicitar_reserva(datos: Datos) -> Peticion:
+    if not datos.fechas_libres:
+        return None
+    return Peticion('POST', '/api/v1/reserva/solicitar', 'POST /reserva/solicitar', rol='usuario',
+                    formulario={'fecha_id': str(datos.fechas_libres.popleft()), 'cantidad_personas': '80',
+                                'hora_inicio': '20:00', 'hora_fin': '04:00'},
+                    archivo=COMPROBANTE)
+
+
+def mis_reservas(datos: Datos) -> Peticion:
+    return Peticion('GET', '/api/v1/reserva/mis-reservas', 'GET /reserva/mis-reservas', rol='usuario')
+
+
+def listado_reservas(datos: Datos) -> Peticion:
+    return Peticion('GET', '/api/v1/reserva', 'GET /reserva', rol='administrador')
+
+
+def listado_gastos(datos: Datos) -> Peticion:
+    return Peticion('GET', '/api/v1/gasto', 'GET /gasto', rol='administrador')
+
+
+def analytics(datos: Datos) -> Peticion:
+    hoy = date.today()
+    mes = random.randint(1, 12)
+    return Peticion('GET', '/api/v1/analytics', 'GET /analytics', rol='administrador',
+                    params={'mes': mes, 'anio': hoy.year if mes <= hoy.month else hoy.year - 1})
+
+
+def registrar_pago(datos: Datos) -> Peticion:
+    if not datos.reservas_con_saldo:
+        return None
+    return Peticion('POST', f'/api/v1/reserva/{random.choice(datos.reservas_con_saldo)}/pagos',
+                    'POST /reserva/[id]/pagos', rol='administrador', json={'monto': 1.0})
+
+
+ESCENARIOS = {
+    'calendario': calendario,
+    'calendario_proyectado': calendario_proyectado,
+    'detalle_fecha': detalle_fecha,
+    'busqueda_reservas': busqueda_reservas,
+    'busqueda_usuarios': busqueda_usuarios,
+    'solicitar_reserva': solicitar_reserva,
+    'mis_reservas': mis_reservas,
+    'listado_reservas': listado_reservas,
+    'listado_gastos': listado_gastos,
+    'analytics': analytics,
+    'registrar_pago': registrar_pago,
+}
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+if __name__ == '__main__':
+    from app import create_app
+    json.dump(preparar(create_app()), sys.stdout)
@@ -0,0 +1,175 @@
+"""
+Dobles de los servicios externos para medir la app sin depender de ellos:
+R2 (S3), SMTP, Telegram y Dialogflow responden en el proceso con una latencia
+fija configurable, así los resultados no varían con la red ni consumen cuotas.
+
+`instalar()` parchea los puntos donde la app los usa; el servidor, el worker
+de Celery y el consumidor del bus de eventos se levantan con los dobles ya instalados:
+
+    python -m app.benchmarks.falsos servidor      # gunicorn (FLASK_ENV=production) o el servidor de desarrollo
+    python -m app.benchmarks.falsos worker        # worker de Celery (procesar_reserva_background, correos)
+    python -m app.benchmarks.falsos eventos       # app.events.worker (Telegram, invalidación de caché, SSE)
+    python -m app.benchmarks.falsos eventos cache # solo algunos grupos de consumidores
+    python -m app.benchmarks.falsos servidor --latencia-r2-ms 0 --latencia-smtp-ms 0
+"""
+import argparse
+import os
+import smtplib
+import sys
+import time
+from types import SimpleNamespace
+
+import requests
+
+LATENCIAS_POR_DEFECTO = {'r2': 80, 'smtp': 300, 'telegram': 150, 'dialogflow': 250}
+DIRECTORIO_UPLOADS = '/home/flaskapp/app/uploads'
+
+
+def _esperar(ms: float):
+    if ms:
+        time.sleep(ms / 1000)
+
+
+class ClienteS3Falso:
+    """
+    upload_fileobj lee el archivo entero (como boto3) y lo descarta.
+    """
+
+    def __init__(self, latencia_ms: float):
+        self.latencia_ms = latencia_ms
+        self.subidas = 0
+
+    def upload_fileobj(self, archivo, bucket, clave, ExtraArgs=None):
+        while archivo.read(1024 * 1024):
+            pass
+        _esperar(self.latencia_ms)
+        self.subidas += 1
+
+
+class SMTPFalso:
+    latencia_ms = 0
+    enviados = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def login(self, usuario, password):
+        return (235, b'OK')
+
+    def sendmail(self, remitente, destinatarios, mensaje):
+        _esperar(self.latencia_ms)
+        SMTPFalso.enviados += 1
+        return {}
+
+    def send_message(self, mensaje, *args, **kwargs):
+        return self.sendmail(None, None, mensaje)
+
+    def quit(self):
+        pass
+
+
+class SesionDialogflowFalsa:
+    def __init__(self, latencia_ms: float):
+        self.latencia_ms = latencia_ms
+
+    def session_path(self, proyecto, sesion):
+        return f'projects/{proyecto}/agent/sessions/{sesion}'
+
+    def detect_intent(self, request=None, **kwargs):
+        _esperar(self.latencia_ms)
+        return SimpleNamespace(query_result=SimpleNamespace(
+            fulfillment_text="Tenemos fechas disponibles, podés consultarlas en el calendario."))
+
+
+def _post_telegram_falso(post_original, latencia_ms: float):
+    def post(url, *args, **kwargs):
+        if str(url).startswith('https://api.telegram.org/'):
+            _esperar(latencia_ms)
+            return SimpleNamespace(status_code=200, text='{"ok":true}', json=lambda: {'ok': True})
+        return post_original(url, *args, **kwargs)
+    return post
+
+
+def instalar(latencias: dict = None):
+    """
+    Reemplaza los clientes externos de este proceso (y de los que se forkeen después).
+    """
+    latencias = {**LATENCIAS_POR_DEFECTO, **(latencias or {})}
+
+    from app.services import chatbot_service
+    from app.utils import storage
+
+    # R2: todas las subidas pasan por obtener_cliente_s3()
+    cliente_s3 = ClienteS3Falso(latencias['r2'])
+    storage.obtener_cliente_s3 = lambda: cliente_s3
+    os.environ.setdefault('R2_BUCKET_NAME', 'bench')
+    os.environ.setdefault('R2_PUBLIC_URL', 'https://r2.bench.local')
+
+    # SMTP: los servicios validan la configuración antes de conectarse
+    SMTPFalso.latencia_ms = latencias['smtp']
+    smtplib.SMTP = smtplib.SMTP_SSL = SMTPFalso
+    for variable, valor in (('SMTP_SERVER', 'smtp.bench.local'), ('SMTP_PORT', '465'),
+                            ('SENDER_EMAIL', 'salon@bench.local'), ('SENDER_APP_PASSWORD', 'bench'),
+                            ('ADMIN_EMAIL', 'admin@bench.local')):
+        os.environ.setdefault(variable, valor)
+
+    # Telegram: PushNotificationService llama a requests.post
+    requests.post = _post_telegram_falso(requests.post, latencias['telegram'])
+    os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'bench')
+    os.environ.setdefault('TELEGRAM_CHAT_IDS', '1')
+
+    # Dialogflow: sin credenciales de Google ni canal gRPC
+    sesion = SesionDialogflowFalsa(latencias['dialogflow'])
+    chatbot_service._obtener_session_client = lambda credenciales: sesion
+    chatbot_service.ChatbotService._get_credentials = lambda self: ('salon-bench', None)
+
+    # request_by_user guarda el comprobante en la ruta del contenedor
+    try:
+        os.makedirs(DIRECTORIO_UPLOADS, exist_ok=True)
+    except OSError:
+        print(f"ADVERTENCIA: no se puede crear {DIRECTORIO_UPLOADS}; POST /reserva/solicitar fallará fuera del contenedor")
+    return latencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Levanta la app o el worker con los servicios externos simulados")
+    parser.add_argument('proceso', choices=('servidor', 'worker', 'eventos'))
+    parser.add_argument('grupos', nargs='*', help="Con 'eventos': grupos de consumidores (por defecto todos)")
+    for servicio, ms in LATENCIAS_POR_DEFECTO.items():
+        parser.add_argument(f'--latencia-{servicio}-ms', type=float, default=ms)
+    args = parser.parse_args(argv)
+    if args.grupos and args.proceso != 'eventos':
+        parser.error("los grupos solo aplican a 'eventos'")
+    latencias = instalar({servicio: getattr(args, f'latencia_{servicio}_ms') for servicio in LATENCIAS_POR_DEFECTO})
+    print("Servicios externos simulados: " + ", ".join(f"{s} {ms:g} ms" for s, ms in latencias.items()))
+
+    if args.proceso == 'worker':
+        from app.celery_app import celery
+        celery.worker_main(['worker', '--loglevel=warning'])
+        return
+
+    if args.proceso == 'eventos':
+        # Sin consumidor no se invalida la caché y las lecturas miden datos viejos;
+        # sin los dobles, las alertas de reservas salen a Telegram de verdad
+        from app.events.worker import main as consumir_eventos
+        consumir_eventos(args.grupos)
+        return
+
+    from app import create_app
+    env = os.getenv('FLASK_ENV', 'development')
+    if env == 'production':
+        from app.config import factory
+        from app.servidor import GunicornApp, opciones_gunicorn
+        GunicornApp(create_app, opciones_gunicorn(factory(env))).run()
+    else:
+        create_app().run(host='0.0.0.0', port=int(os.getenv('PORT', 5000)), threaded=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Prueba de carga con locust sobre la base sembrada y los servicios externos simulados.
+
+Tres perfiles de usuario con la mezcla de tráfico real: visitantes que miran el
+calendario, clientes que consultan y solicitan reservas (con comprobante) y
+administradores que buscan en vivo, listan, miran analytics y registran pagos.
+Al terminar imprime req/s y p50/p95/p99 por escenario.
+
+Preparación (servidor con RATELIMIT_ENABLED=false para medir la app y no el limiter):
+    python -m app.benchmarks.falsos servidor &
+    python -m app.benchmarks.falsos worker &
+    python -m app.benchmarks.falsos eventos &
+    python -m app.benchmarks.escenarios > datos_bench.json
+
+Uso:
+    BENCH_DATOS=datos_bench.json \\
+    BENCH_ADMIN_CORREO=... BENCH_ADMIN_PASSWORD=... BENCH_USUARIO_CORREO=... BENCH_USUARIO_PASSWORD=... \\
+        locust -f app/benchmarks/locustfile.py --host http://127.0.0.1:5000 --headless -u 100 -r 10 -t 5m
+
+En lugar de credenciales se pueden pasar tokens (BENCH_TOKEN_ADMIN, BENCH_TOKEN_USUARIO).
+Con varios procesos de locust cada uno consume su propia lista de fechas libres:
+dos pueden solicitar el mismo día y uno recibe el error de fecha no disponible.
+"""
+import os
+
+from locust import HttpUser, between, events, task
+
+from app.benchmarks import escenarios
+
+_datos = None
+
+
+def datos() -> escenarios.Datos:
+    global _datos
+    if _datos is None:
+        _datos = escenarios.Datos.cargar(os.environ.get('BENCH_DATOS', 'datos_bench.json'))
+    return _datos
+
+
+class UsuarioBench(HttpUser):
+    abstract = True
+    rol = None
+    wait_time = between(0.5, 2.0)
+
+    def on_start(self):
+        self.token = self._token() if self.rol else None
+
+    def _token(self) -> str:
+        prefijo = 'ADMIN' if self.rol == 'administrador' else 'USUARIO'
+        token = os.getenv(f'BENCH_TOKEN_{prefijo}')
+        if token:
+            return token
+        respuesta = self.client.post('/api/v1/login', name='POST /login', json={
+            'correo': os.environ[f'BENCH_{prefijo}_CORREO'],
+            'password': os.environ[f'BENCH_{prefijo}_PASSWORD'],
+        })
+        return respuesta.json()['data']['token']
+
+    def ejecutar(self, escenario: str):
+        peticion = escenarios.ESCENARIOS[escenario](datos())
+        if peticion is None:
+            # Sin datos para el escenario (p. ej. se agotaron las fechas libres)
+            return
+        cabeceras = {'Authorization': f'Bearer {self.token}'} if peticion.rol else {}
+        archivos = {'comprobante': ('comprobante.pdf', peticion.archivo, 'application/pdf')} if peticion.archivo else None
+        self.client.request(peticion.metodo, peticion.ruta, name=peticion.nombre, headers=cabeceras,
+                            params=peticion.params, json=peticion.json, data=peticion.formulario, files=archivos)
+
+
+class Visitante(UsuarioBench):
+    weight = 6
+
+    @task(5)
+    def calendario(self):
+        self.ejecutar('calendario')
+
+    @task(2)
+    def calendario_proyectado(self):
+        self.ejecutar('calendario_proyectado')
+
+    @task(3)
+    def detalle_fecha(self):
+        self.ejecutar('detalle_fecha')
+
+
+class Cliente(UsuarioBench):
+    weight = 1
+    rol = 'usuario'
+
+    @task(3)
+    def calendario(self):
+        self.ejecutar('calendario')
+
+    @task(3)
+    def mis_reservas(self):
+        self.ejecutar('mis_reservas')
+
+    @task(1)
+    def solicitar_reserva(self):
+        self.ejecutar('solicitar_reserva')
+
+
+class Administrador(UsuarioBench):
+    weight = 2
+    rol = 'administrador'
+
+    @task(6)
+    def busqueda_reservas(self):
+        self.ejecutar('busqueda_reservas')
+
+    @task(3)
+    def busqueda_usuarios(self):
+        self.ejecutar('busqueda_usuarios')
+
+    @task(2)
+    def listado_reservas(self):
+        self.ejecutar('listado_reservas')
+
+    @task(1)
+    def listado_gastos(self):
+        self.ejecutar('listado_gastos')
+
+    @task(1)
+    def analytics(self):
+        self.ejecutar('analytics')
+
+    @task(1)
+    def registrar_pago(self):
+        self.ejecutar('registrar_pago')
+
+
+@events.quitting.add_listener
+def _reporte(environment, **kwargs):
+    print(f"\n  {'escenario':<30} {'peticiones':>10} {'fallas':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for entrada in sorted(environment.stats.entries.values(), key=lambda e: e.name):
+        print(f"  {entrada.name:<30} {entrada.num_requests:10d} {entrada.num_failures:7d} {entrada.total_rps:8.1f} "
+              f"{entrada.get_response_time_percentile(0.50):8.0f} {entrada.get_response_time_percentile(0.95):8.0f} "
+              f"{entrada.get_response_time_percentile(0.99):8.0f}")
@@ -0,0 +1,139 @@
+"""
+Micro-benchmarks en proceso de los escenarios de la suite (ver escenarios.py).
+
+Cada escenario corre con el cliente de pruebas de Flask: la pila completa
+(admisión, JWT, caché, SQL, serialización) sin red ni gunicorn, contra la base
+y el Redis configurados y con los servicios externos simulados (falsos.py).
+Reporta llamadas/s, p50/p95/p99 y sentencias SQL promedio por escenario, para
+comparar un cambio antes y después sin montar la prueba de carga.
+
+Los escenarios de escritura (solicitar_reserva, registrar_pago) modifican la
+base sembrada: --sin-escritura los omite.
+
+Uso:
+    python -m app.benchmarks.micro
+    python -m app.benchmarks.micro --repeticiones 200 --solo calendario analytics
+    python -m app.benchmarks.micro --json resultados.json
+"""
+import argparse
+import io
+import json
+import sys
+import time
+
+from app.benchmarks import escenarios, falsos
+
+ESCRITURA = ('solicitar_reserva', 'registrar_pago')
+
+
+def _tokens(app) -> dict:
+    """
+    JWT de un administrador y de un usuario de la base, sin pasar por el login.
+    """
+    from flask_jwt_extended import create_access_token
+
+    from app.models import Administrador, Usuario
+
+    tokens = {}
+    with app.app_context():
+        for rol, modelo in (('administrador', Administrador), ('usuario', Usuario)):
+            persona = modelo.query.order_by(modelo.id).first()
+            if persona is None:
+                continue
+            tokens[rol] = create_access_token(identity=str(persona.id), additional_claims={
+                'role': persona.tipo, 'email': persona.correo, 'username': f"{persona.nombre} {persona.apellido}"})
+    return tokens
+
+
+def _enviar(cliente, peticion: escenarios.Peticion, tokens: dict):
+    cabeceras = {'Authorization': f"Bearer {tokens[peticion.rol]}"} if peticion.rol else {}
+    datos = dict(peticion.formulario or {})
+    if peticion.archivo:
+        datos['comprobante'] = (io.BytesIO(peticion.archivo), 'comprobante.pdf', 'application/pdf')
+    return cliente.open(peticion.ruta, method=peticion.metodo, headers=cabeceras, query_string=peticion.params,
+                        json=peticion.json, data=datos or None)
+
+
+def medir(app, nombre: str, datos: escenarios.Datos, tokens: dict, repeticiones: int, calentamiento: int) -> dict:
+    escenario = escenarios.ESCENARIOS[nombre]
+    cliente = app.test_client()
+    latencias, sentencias, errores = [], [], 0
+    for i in range(calentamiento + repeticiones):
+        peticion = escenario(datos)
+        if peticion is None:
+            break
+        if peticion.rol and peticion.rol not in tokens:
+            return {'escenario': nombre, 'omitido': f"no hay {peticion.rol} en la base"}
+        inicio = time.perf_counter()
+        respuesta = _enviar(cliente, peticion, tokens)
+        duracion = time.perf_counter() - inicio
+        if i < calentamiento:
+            continue
+        if respuesta.status_code >= 400:
+            errores += 1
+        latencias.append(duracion * 1000)
+        if 'X-SQL-Count' in respuesta.headers:
+            sentencias.append(int(respuesta.headers['X-SQL-Count']))
+
+    if not latencias:
+        return {'escenario': nombre, 'omitido': "sin datos para el escenario"}
+    return {
+        'escenario': nombre,
+        'llamadas': len(latencias),
+        'llamadas_s': len(latencias) / (sum(latencias) / 1000),
+        'p50': escenarios.percentil(latencias, 50),
+        'p95': escenarios.percentil(latencias, 95),
+        'p99': escenarios.percentil(latencias, 99),
+        'sql': sum(sentencias) / len(sentencias) if sentencias else None,
+        'errores': errores,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks en proceso de los escenarios de la suite")
+    parser.add_argument('--repeticiones', type=int, default=100)
+    parser.add_argument('--calentamiento', type=int, default=5)
+    parser.add_argument('--solo', nargs='+', choices=sorted(escenarios.ESCENARIOS), help="Escenarios a medir")
+    parser.add_argument('--sin-escritura', action='store_true', help="Omite los escenarios que modifican la base")
+    parser.add_argument('--latencia-externa', action='store_true',
+                        help="Simula también la latencia de R2/SMTP/Telegram/Dialogflow (por defecto 0 ms)")
+    parser.add_argument('--config', default=None, help="Entorno de configuración (por defecto FLASK_ENV)")
+    parser.add_argument('--json', help="Guarda los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    falsos.instalar(None if args.latencia_externa else {servicio: 0 for servicio in falsos.LATENCIAS_POR_DEFECTO})
+
+    from app import create_app
+    from app.extensions import limiter
+
+    app = create_app(args.config)
+    # Cabeceras del perfil SQL para contar sentencias; el rate limit mediría al limiter
+    app.config['SQL_CABECERAS'] = True
+    limiter.enabled = False
+
+    datos = escenarios.Datos.desde_json(escenarios.preparar(app))
+    tokens = _tokens(app)
+    nombres = args.solo or list(escenarios.ESCENARIOS)
+    if args.sin_escritura:
+        nombres = [nombre for nombre in nombres if nombre not in ESCRITURA]
+
+    resultados = []
+    print(f"  {'escenario':<24} {'llamadas/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL':>6} {'errores':>8}")
+    for nombre in nombres:
+        r = medir(app, nombre, datos, tokens, args.repeticiones, args.calentamiento)
+        resultados.append(r)
+        if 'omitido' in r:
+            print(f"  {nombre:<24} omitido: {r['omitido']}")
+            continue
+        sql = f"{r['sql']:6.1f}" if r['sql'] is not None else f"{'-':>6}"
+        print(f"  {nombre:<24} {r['llamadas_s']:10.1f} {r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f} "
+              f"{sql} {r['errores']:8d}")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
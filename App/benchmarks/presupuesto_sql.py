@@ -0,0 +1,106 @@
+"""
+Verificación del presupuesto SQL estricto (SQL_PRESUPUESTO_ESTRICTO de TestingConfig).
+
+Levanta create_app('testing') sobre SQLite en memoria, siembra reservas con pagos
+y pide GET /reserva?fields=...,saldo_restante, un N+1 conocido: saldo_restante
+hace un SELECT SUM por reserva si los pagos no vinieron en la consulta.
+
+- Con la proyección tal como está (DEPENDENCIAS_PROYECCION carga los pagos) la
+  respuesta tiene que entrar en @presupuesto_sql(5).
+- Sin esa dependencia (la regresión que el presupuesto debe atajar) tiene que
+  responder 500 con "Presupuesto SQL excedido".
+
+Termina con código 1 si alguna de las dos no se cumple, para poder usarlo en CI.
+
+Uso:
+    python -m app.benchmarks.presupuesto_sql
+    python -m app.benchmarks.presupuesto_sql --reservas 50
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+
+RUTA = '/api/v1/reserva'
+CAMPOS = 'id,estado,saldo_restante'
+
+
+def sembrar(cantidad: int) -> int:
+    """
+    Un administrador y `cantidad` reservas de un usuario, cada una con dos pagos. Devuelve el id del admin.
+    """
+    from app.extensions import db
+    from app.models import Administrador, Fecha, Pago, Reserva, Usuario
+
+    admin = Administrador(nombre='Admin', apellido='Bench', correo='admin@bench.local', dni=1,
+                          consentimiento_datos=True)
+    admin.set_password('bench1234')
+    usuario = Usuario(nombre='Cliente', apellido='Bench', correo='cliente@bench.local', dni=2,
+                      consentimiento_datos=True)
+    usuario.set_password('bench1234')
+    db.session.add_all([admin, usuario])
+    db.session.flush()
+
+    ahora = datetime.utcnow()
+    for i in range(cantidad):
+        fecha = Fecha(dia=date.today() + timedelta(days=i + 1), estado='reservada', valor_estimado=100000)
+        reserva = Reserva(estado='confirmada', valor_alquiler=100000, usuario_id=usuario.id, fecha=fecha,
+                          fecha_creacion=ahora, cantidad_personas=80, requiere_reintegro=False)
+        reserva.pagos = [Pago(monto=30000, fecha_pago=ahora), Pago(monto=20000, fecha_pago=ahora)]
+        db.session.add(reserva)
+    db.session.commit()
+    return admin.id
+
+
+def pedir(app, token: str):
+    cliente = app.test_client()
+    return cliente.get(RUTA, query_string={'fields': CAMPOS}, headers={'Authorization': f'Bearer {token}'})
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica que el presupuesto SQL estricto ataje un N+1")
+    parser.add_argument('--reservas', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    from flask_jwt_extended import create_access_token
+
+    from app import create_app
+    from app.extensions import cache, db
+    from app.repositories import reserva_repository
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        admin_id = sembrar(args.reservas)
+        token = create_access_token(identity=str(admin_id), additional_claims={'role': 'administrador'})
+
+    fallas = []
+    respuesta = pedir(app, token)
+    sentencias = respuesta.headers.get('X-SQL-Count')
+    print(f"GET {RUTA}?fields={CAMPOS}: {respuesta.status_code}, {sentencias} sentencias")
+    if respuesta.status_code != 200:
+        fallas.append(f"la proyección con pagos debería entrar en el presupuesto: {respuesta.get_json()}")
+
+    # La regresión: saldo_restante sin los pagos cargados
+    dependencias = dict(reserva_repository.DEPENDENCIAS_PROYECCION)
+    reserva_repository.DEPENDENCIAS_PROYECCION.clear()
+    try:
+        with app.app_context():
+            cache.clear()
+        respuesta = pedir(app, token)
+    finally:
+        reserva_repository.DEPENDENCIAS_PROYECCION.update(dependencias)
+    cuerpo = respuesta.get_json() or {}
+    print(f"Sin DEPENDENCIAS_PROYECCION: {respuesta.status_code}, {cuerpo.get('message')}")
+    if respuesta.status_code != 500 or 'Presupuesto SQL excedido' not in (cuerpo.get('message') or ''):
+        fallas.append("el N+1 de saldo_restante no excedió el presupuesto estricto")
+    else:
+        for repetida in cuerpo['data']['repetidas']:
+            print(f"  {repetida['veces']}x {repetida['sentencia'][:100]}")
+
+    for falla in fallas:
+        print(f"  FALLA: {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
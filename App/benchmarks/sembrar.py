@@ -0,0 +1,289 @@
+"""
+Generador de datos sintéticos para benchmarks: años de fechas, reservas, pagos y
+gastos coherentes entre sí (y usuarios nuevos si se piden), cargados con COPY por lotes.
+
+Reglas que respeta:
+- Una fecha por día y como máximo una reserva por fecha. Los viernes y sábados se ocupan más.
+- Días pasados: reservas confirmadas (pagadas completas), archivadas y canceladas
+  por arrepentimiento (algunas con reintegro pendiente). Archivadas y canceladas liberan la fecha.
+- Días futuros: confirmadas con saldo, pendientes (con vencimiento) y alguna cancelada.
+- Pagos: seña al reservar y cuotas antes del evento. Los valores siguen una inflación mensual.
+- Gastos: todos los meses, por categoría (Servicios, Insumos, Otros).
+- Los usuarios nuevos tienen la contraseña --password (para loguearse en la prueba de carga).
+
+Escala: las fechas, reservas y pagos crecen con los años (un salón tiene ~365 días
+por año). El volumen grande sale de --usuarios (2 filas c/u) y --gastos-por-mes:
+    python -m app.benchmarks.sembrar --anios 10 --usuarios 4000000 --gastos-por-mes 12000   # ~10M filas
+
+Uso:
+    python -m app.benchmarks.sembrar                       # 5 años hacia atrás y 1 adelante
+    python -m app.benchmarks.sembrar --vaciar --anios 8 --ocupacion 0.7 --semilla 42
+"""
+import argparse
+import calendar
+import csv
+import io
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+NOMBRES = ('Maxi', 'Natalia', 'Roxana', 'Alvaro', 'Juan', 'Maria', 'Carlos', 'Laura', 'Sofia', 'Diego', 'Matias',
+           'Lucia', 'Agustin', 'Florencia', 'Martin', 'Camila', 'Facundo', 'Micaela', 'Lucas', 'Julieta', 'Franco',
+           'Valentina', 'Tomas', 'Martina', 'Nicolas', 'Antonella', 'Joaquin', 'Delfina', 'Ignacio', 'Paula')
+APELLIDOS = ('Guzman', 'Ulloa', 'Castro', 'Garcia', 'Lopez', 'Bustos', 'Perez', 'Rodriguez', 'Martinez', 'Gomez',
+             'Fernandez', 'Gonzalez', 'Diaz', 'Alvarez', 'Romero', 'Ruiz', 'Torres', 'Dominguez', 'Sosa', 'Quiroga',
+             'Paz', 'Silva', 'Molina', 'Ortiz', 'Morales', 'Herrera', 'Medina', 'Rios', 'Gimenez', 'Rojas')
+GASTOS = {
+    'Servicios': (0.4, ('Luz', 'Gas', 'Agua', 'Internet', 'Seguridad', 'Limpieza', 'Mantenimiento aire acondicionado')),
+    'Insumos': (0.4, ('Bebidas', 'Vajilla', 'Manteles', 'Artículos de limpieza', 'Decoración', 'Hielo')),
+    'Otros': (0.2, ('Reparaciones', 'Impuestos municipales', 'Publicidad', 'Honorarios contables')),
+}
+# Probabilidad base de que un día tenga reserva (lunes a domingo), escalada por --ocupacion
+OCUPACION_SEMANAL = (0.15, 0.1, 0.1, 0.2, 0.8, 0.95, 0.5)
+HORARIOS = (('20:00', '04:00'), ('21:00', '05:00'), ('13:00', '19:00'), ('12:00', '18:00'))
+
+COLUMNAS = {
+    'persona': ('id', 'nombre', 'apellido', 'correo', 'dni', 'telefono', 'password_hash', 'tipo', 'activo',
+                'consentimiento_datos', 'fecha_consentimiento'),
+    'usuario': ('id',),
+    'fecha': ('id', 'dia', 'estado', 'valor_estimado', 'usuario_id', 'updated_at'),
+    'reserva': ('id', 'fecha_creacion', 'fecha_vencimiento', 'estado', 'comprobante_url', 'valor_alquiler',
+                'ip_aceptacion', 'fecha_aceptacion', 'version_contrato', 'cantidad_personas', 'usuario_id',
+                'fecha_id', 'hora_inicio', 'hora_fin', 'observaciones', 'requiere_reintegro', 'updated_at'),
+    'pago': ('id', 'monto', 'fecha_pago', 'reserva_id', 'updated_at'),
+    'gasto': ('id', 'descripcion', 'monto', 'categoria', 'fecha', 'updated_at'),
+}
+
+
+class Cargador:
+    """
+    Escribe filas en CSV en memoria y las manda con COPY cada `lote` filas (un commit por lote).
+    """
+
+    def __init__(self, conexion, lote: int):
+        self.conexion = conexion
+        self.lote = lote
+        self.filas = {}
+
+    def cargar(self, tabla: str, filas) -> int:
+        sql = f"COPY {tabla} ({', '.join(COLUMNAS[tabla])}) FROM STDIN WITH (FORMAT csv, NULL '')"
+        buffer, pendientes, total = io.StringIO(), 0, 0
+        escritor = csv.writer(buffer)
+        for fila in filas:
+            escritor.writerow(fila)
+            pendientes += 1
+            if pendientes >= self.lote:
+                total += self._enviar(sql, buffer, pendientes)
+                buffer, pendientes = io.StringIO(), 0
+                escritor = csv.writer(buffer)
+        if pendientes:
+            total += self._enviar(sql, buffer, pendientes)
+        self.filas[tabla] = self.filas.get(tabla, 0) + total
+        return total
+
+    def _enviar(self, sql: str, buffer: io.StringIO, filas: int) -> int:
+        buffer.seek(0)
+        with self.conexion.cursor() as cursor:
+            cursor.copy_expert(sql, buffer)
+        self.conexion.commit()
+        return filas
+
+
+def _siguiente_id(cursor, tabla: str) -> int:
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {tabla}")
+    return cursor.fetchone()[0]
+
+
+def _inflacion(dia: date, inicio: date, mensual: float) -> float:
+    return (1 + mensual) ** ((dia.year - inicio.year) * 12 + dia.month - inicio.month)
+
+
+def generar_usuarios(rng, cantidad: int, primer_id: int, primer_dni: int, password_hash: str, ahora: datetime):
+    for i in range(cantidad):
+        id = primer_id + i
+        yield (id, rng.choice(NOMBRES), rng.choice(APELLIDOS), f'bench_{id}@seed.local', primer_dni + i,
+               f'2604{rng.randrange(1000000):06d}', password_hash, 'usuario', 't', 't', ahora.isoformat(sep=' '))
+
+
+def planificar(rng, args, dias_existentes: set, usuarios: list, ids: dict, hoy: date, ahora: datetime):
+    """
+    Arma fechas, reservas y pagos en memoria (son pocas filas: una por día como máximo).
+    """
+    inicio = hoy - timedelta(days=round(365 * args.anios))
+    fin = hoy + timedelta(days=round(365 * args.anios_futuros))
+    fechas, reservas, pagos = [], [], []
+    fecha_id, reserva_id, pago_id = ids['fecha'], ids['reserva'], ids['pago']
+
+    dia = inicio
+    while dia <= fin:
+        if dia in dias_existentes:
+            dia += timedelta(days=1)
+            continue
+        factor = _inflacion(dia, inicio, args.inflacion_mensual)
+        valor = round(args.valor_base * factor * rng.uniform(0.9, 1.15), -2)
+        estado_fecha, usuario_fecha = 'disponible', None
+
+        if rng.random() < min(1.0, OCUPACION_SEMANAL[dia.weekday()] * args.ocupacion):
+            usuario_id = rng.choice(usuarios)
+            pasado = dia < hoy
+            sorteo = rng.random()
+            if pasado:
+                estado = 'confirmada' if sorteo < 0.8 else 'archivada' if sorteo < 0.92 else 'cancelada'
+            else:
+                estado = 'confirmada' if sorteo < 0.65 else 'pendiente' if sorteo < 0.95 else 'cancelada'
+
+            if estado == 'pendiente':
+                # Recién solicitada: vence a las 72 h de creada
+                creacion = ahora - timedelta(hours=rng.uniform(1, 70))
+                vencimiento = creacion + timedelta(hours=72)
+            else:
+                creacion = datetime.combine(dia, datetime.min.time()) - timedelta(days=rng.randint(10, 240),
+                                                                                  minutes=rng.randint(0, 1439))
+                creacion = min(creacion, ahora - timedelta(days=1))
+                vencimiento = None
+
+            if estado in ('confirmada', 'pendiente'):
+                estado_fecha = 'reservada' if estado == 'confirmada' else 'pendiente'
+                usuario_fecha = usuario_id
+            reintegro = estado == 'cancelada' and rng.random() < 0.5
+            inicio_hora, fin_hora = rng.choice(HORARIOS)
+            observaciones = 'Cancelada por arrepentimiento' if estado == 'cancelada' else None
+            reservas.append((
+                reserva_id, creacion.isoformat(sep=' '), vencimiento.isoformat(sep=' ') if vencimiento else None,
+                estado, f'{args.url_comprobantes}/comprobantes/{reserva_id}.pdf', valor, '10.0.0.1',
+                creacion.isoformat(sep=' '), '2.0', rng.choice((40, 60, 80, 100, 120, 150)), usuario_id, fecha_id,
+                inicio_hora, fin_hora, observaciones, 't' if reintegro else 'f', creacion.isoformat(sep=' '),
+            ))
+
+            # Seña al reservar; las confirmadas pasadas terminan de pagar antes del evento
+            if estado != 'pendiente':
+                sena = round(valor * 0.3, -2)
+                montos = [sena]
+                if estado == 'confirmada':
+                    resto = valor - sena
+                    cuotas = rng.randint(1, 3)
+                    if pasado:
+                        montos += [round(resto / cuotas, 2)] * (cuotas - 1) + [round(resto - round(resto / cuotas, 2) * (cuotas - 1), 2)]
+                    elif rng.random() < 0.5:
+                        montos.append(round(resto * rng.uniform(0.2, 0.6), -2))
+                limite = min(datetime.combine(dia, datetime.min.time()), ahora)
+                for n, monto in enumerate(montos):
+                    cuando = creacion + (limite - creacion) * (n / len(montos)) + timedelta(hours=rng.uniform(1, 48))
+                    cuando = min(cuando, ahora).isoformat(sep=' ')
+                    pagos.append((pago_id, monto, cuando, reserva_id, cuando))
+                    pago_id += 1
+            reserva_id += 1
+
+        fechas.append((fecha_id, dia.isoformat(), estado_fecha, valor, usuario_fecha, ahora.isoformat(sep=' ')))
+        fecha_id += 1
+        dia += timedelta(days=1)
+    return fechas, reservas, pagos
+
+
+def generar_gastos(rng, args, primer_id: int, hoy: date, ahora: datetime):
+    inicio = hoy - timedelta(days=round(365 * args.anios))
+    id = primer_id
+    anio, mes = inicio.year, inicio.month
+    while (anio, mes) <= (hoy.year, hoy.month):
+        dias_mes = calendar.monthrange(anio, mes)[1] if (anio, mes) != (hoy.year, hoy.month) else hoy.day
+        factor = _inflacion(date(anio, mes, 1), inicio, args.inflacion_mensual)
+        for categoria, (peso, descripciones) in GASTOS.items():
+            for _ in range(max(1, round(args.gastos_por_mes * peso))):
+                yield (id, rng.choice(descripciones), round(rng.uniform(5000, 120000) * factor, 2), categoria,
+                       date(anio, mes, rng.randint(1, dias_mes)).isoformat(), ahora.isoformat(sep=' '))
+                id += 1
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos coherentes y los carga con COPY")
+    parser.add_argument('--anios', type=float, default=5, help="Años de historia hacia atrás")
+    parser.add_argument('--anios-futuros', type=float, default=1, help="Años de calendario hacia adelante")
+    parser.add_argument('--ocupacion', type=float, default=1.0, help="Multiplica la ocupación semanal base")
+    parser.add_argument('--usuarios', type=int, default=0, help="Usuarios nuevos (además de los existentes)")
+    parser.add_argument('--gastos-por-mes', type=int, default=30)
+    parser.add_argument('--valor-base', type=float, default=150000, help="Alquiler al inicio del período")
+    parser.add_argument('--inflacion-mensual', type=float, default=0.03)
+    parser.add_argument('--password', default='bench1234', help="Contraseña de los usuarios nuevos")
+    parser.add_argument('--url-comprobantes', default='https://r2.bench.local')
+    parser.add_argument('--lote', type=int, default=50000, help="Filas por COPY")
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--vaciar', action='store_true', help="Borra antes fechas, reservas, pagos y gastos")
+    parser.add_argument('--config', default=None, help="Entorno de configuración (por defecto FLASK_ENV)")
+    args = parser.parse_args(argv)
+
+    from passlib.hash import pbkdf2_sha256
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app(args.config)
+    rng = random.Random(args.semilla)
+    hoy, ahora = date.today(), datetime.utcnow().replace(microsecond=0)
+    inicio_total = time.perf_counter()
+
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            print("El generador usa COPY: necesita PostgreSQL")
+            return 1
+        conexion = db.engine.raw_connection()
+        try:
+            cursor = conexion.cursor()
+            # Es una carga descartable: no hace falta esperar el fsync de cada lote
+            cursor.execute("SET synchronous_commit = off")
+            if args.vaciar:
+                cursor.execute("TRUNCATE pago, reserva, fecha, gasto RESTART IDENTITY CASCADE")
+                conexion.commit()
+
+            ids = {tabla: _siguiente_id(cursor, tabla) for tabla in ('persona', 'fecha', 'reserva', 'pago', 'gasto')}
+            cargador = Cargador(conexion, args.lote)
+
+            if args.usuarios:
+                cursor.execute("SELECT COALESCE(MAX(dni), 10000000) + 1 FROM persona")
+                primer_dni = cursor.fetchone()[0]
+                hash_password = pbkdf2_sha256.hash(args.password)
+                cargador.cargar('persona', generar_usuarios(rng, args.usuarios, ids['persona'], primer_dni,
+                                                            hash_password, ahora))
+                cargador.cargar('usuario', ((ids['persona'] + i,) for i in range(args.usuarios)))
+                print(f"  usuarios: {args.usuarios} ({time.perf_counter() - inicio_total:.1f}s)")
+
+            # Las reservas se reparten entre a lo sumo 200k usuarios al azar
+            cursor.execute("SELECT id FROM usuario ORDER BY random() LIMIT 200000")
+            usuarios = [fila[0] for fila in cursor.fetchall()]
+            if not usuarios:
+                print("No hay usuarios: cargá megabase.sql o usá --usuarios N")
+                return 1
+            cursor.execute("SELECT dia FROM fecha")
+            dias_existentes = {fila[0] for fila in cursor.fetchall()}
+
+            fechas, reservas, pagos = planificar(rng, args, dias_existentes, usuarios, ids, hoy, ahora)
+            cargador.cargar('fecha', fechas)
+            cargador.cargar('reserva', reservas)
+            cargador.cargar('pago', pagos)
+            cargador.cargar('gasto', generar_gastos(rng, args, ids['gasto'], hoy, ahora))
+
+            # Las secuencias siguen desde los ids cargados a mano
+            for tabla in ('persona', 'fecha', 'reserva', 'pago', 'gasto'):
+                cursor.execute(f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), "
+                               f"(SELECT COALESCE(MAX(id), 1) FROM {tabla}))")
+            conexion.commit()
+            # Estadísticas del planificador al día para que los planes de los benchmarks sean los reales
+            conexion.autocommit = True
+            for tabla in cargador.filas:
+                cursor.execute(f"ANALYZE {tabla}")
+        finally:
+            conexion.close()
+
+    segundos = time.perf_counter() - inicio_total
+    total = sum(cargador.filas.values())
+    for tabla, filas in cargador.filas.items():
+        print(f"  {tabla:<10} {filas:>12,}")
+    print(f"  {'total':<10} {total:>12,} filas en {segundos:.1f}s ({total / segundos:,.0f} filas/s)")
+    print("Las cachés (Redis) y la agenda de vencimientos quedan viejas: vaciá la caché y "
+          "reiniciá el worker (reconstruye los vencimientos al iniciar).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark de serialización de listas de reservas (costo por fila).
+
+Compara el dump de Marshmallow contra el dump precompilado de los schemas y
+el encoder json estándar contra orjson. Usa objetos planos con los mismos
+atributos que los modelos para no medir consultas (saldo_restante hace un SELECT).
+
+Uso:
+    python -m app.benchmarks.serializacion            # 2000 filas
+    python -m app.benchmarks.serializacion 10000
+"""
+import json
+import sys
+import timeit
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+from marshmallow import Schema
+
+from app.mapping import ReservaSchema, UsuarioSchema
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _reservas(cantidad: int) -> list:
+    ahora = datetime(2026, 1, 1, 12, 0)
+    filas = []
+    for i in range(cantidad):
+        usuario = SimpleNamespace(id=i, nombre=f"Nombre {i}", apellido="Apellido", correo=f"cliente{i}@mail.com",
+                                  telefono="3410000000", dni=30000000 + i, tipo='usuario',
+                                  consentimiento_datos=True, fecha_consentimiento=ahora)
+        pagos = [SimpleNamespace(id=i * 10 + k, monto=15000.0, fecha_pago=ahora + timedelta(days=k), reserva_id=i)
+                 for k in range(3)]
+        filas.append(SimpleNamespace(
+            id=i, fecha_creacion=ahora, estado='confirmada', comprobante_url=f"https://r2/comprobante_{i}.pdf",
+            valor_alquiler=120000.0, ip_aceptacion='10.0.0.1', fecha_aceptacion=ahora, version_contrato='v2',
+            cantidad_personas=80, usuario=usuario, fecha=SimpleNamespace(id=i, dia=date(2026, 3, 1) + timedelta(days=i)),
+            hora_inicio=time(20, 0), hora_fin=time(4, 0), observaciones=None, pagos=pagos,
+            saldo_restante=75000.0, requiere_reintegro=False, usuario_id=i, fecha_id=i,
+        ))
+    return filas
+
+
+def _medir(funcion, filas: int, repeticiones: int = 5) -> float:
+    """Microsegundos por fila (mejor de `repeticiones`)."""
+    tiempos = timeit.repeat(funcion, number=1, repeat=repeticiones)
+    return min(tiempos) / filas * 1e6
+
+
+def main(cantidad: int = 2000):
+    reservas = _reservas(cantidad)
+    usuarios = [r.usuario for r in reservas]
+    reserva_schema, usuario_schema = ReservaSchema(), UsuarioSchema()
+
+    # Los resultados deben ser idénticos antes de comparar tiempos
+    assert reserva_schema.dump(reservas, many=True) == Schema.dump(reserva_schema, reservas, many=True)
+    assert usuario_schema.dump(usuarios, many=True) == Schema.dump(usuario_schema, usuarios, many=True)
+
+    resultados = {
+        'reservas marshmallow': _medir(lambda: Schema.dump(reserva_schema, reservas, many=True), cantidad),
+        'reservas precompilado': _medir(lambda: reserva_schema.dump(reservas, many=True), cantidad),
+        'usuarios marshmallow': _medir(lambda: Schema.dump(usuario_schema, usuarios, many=True), cantidad),
+        'usuarios precompilado': _medir(lambda: usuario_schema.dump(usuarios, many=True), cantidad),
+    }
+
+    payload = {'message': 'Reservas encontradas', 'status_code': 200, 'data': reserva_schema.dump(reservas, many=True)}
+    resultados['json estándar'] = _medir(lambda: json.dumps(payload), cantidad)
+    if orjson is not None:
+        resultados['orjson'] = _medir(lambda: orjson.dumps(payload), cantidad)
+
+    print(f"Filas: {cantidad}")
+    for nombre, micros in resultados.items():
+        print(f"  {nombre:<24} {micros:8.2f} µs/fila")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,139 @@
+"""
+Prueba de carga que compara los modos de gunicorn (sync, gthread, gevent).
+
+Levanta `main.py` en producción una vez por modo (mismo host, misma base y
+Redis), le aplica la misma mezcla de rutas con N clientes concurrentes
+durante D segundos y reporta req/s, p50/p95/p99, 503 de admisión y errores.
+El rate limit se desactiva en el servidor de prueba (RATELIMIT_ENABLED=false).
+
+Las rutas lentas (PDF, chatbot) son las que muestran la diferencia: con
+workers sync cada una bloquea un proceso entero.
+
+Uso:
+    python -m app.benchmarks.servidor
+    python -m app.benchmarks.servidor --modos sync gthread --clientes 64 --duracion 30 \\
+        --ruta /api/v1/fecha --ruta /api/v1/analytics/reporte-pdf --token <jwt admin>
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+RUTAS_POR_DEFECTO = ['/api/v1/fecha', '/api/v1/fecha/1']
+
+
+def _esperar_servidor(base: str, proceso, limite: float = 60.0):
+    hasta = time.monotonic() + limite
+    while time.monotonic() < hasta:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor terminó antes de aceptar conexiones")
+        try:
+            urllib.request.urlopen(base + RUTAS_POR_DEFECTO[0], timeout=2)
+            return
+        except urllib.error.HTTPError:
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def _percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _cliente(base: str, rutas: list, token: str, hasta: float, resultados: list, indice: int):
+    cabeceras = {'Accept-Encoding': 'gzip'}
+    if token:
+        cabeceras['Authorization'] = f'Bearer {token}'
+    i = indice
+    while time.monotonic() < hasta:
+        ruta = rutas[i % len(rutas)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(base + ruta, headers=cabeceras), timeout=60) as r:
+                r.read()
+                estado = r.status
+        except urllib.error.HTTPError as e:
+            estado = e.code
+        except OSError:
+            estado = 0
+        resultados.append((ruta, estado, time.perf_counter() - inicio))
+
+
+def medir_modo(modo: str, args) -> dict:
+    env = {
+        **os.environ,
+        'FLASK_ENV': 'production',
+        'GUNICORN_WORKER_CLASS': modo,
+        'GUNICORN_BIND': f'127.0.0.1:{args.puerto}',
+        'RATELIMIT_ENABLED': 'false',
+    }
+    if args.workers:
+        env['GUNICORN_WORKERS'] = str(args.workers)
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+    proceso = subprocess.Popen([sys.executable, main_py], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f'http://127.0.0.1:{args.puerto}'
+    try:
+        _esperar_servidor(base, proceso)
+        resultados = []
+        hasta = time.monotonic() + args.duracion
+        hilos = [threading.Thread(target=_cliente, args=(base, args.rutas, args.token, hasta, resultados, n))
+                 for n in range(args.clientes)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=30)
+
+    latencias = [t * 1000 for _, estado, t in resultados if 200 <= estado < 400]
+    return {
+        'modo': modo,
+        'peticiones': len(resultados),
+        'req_s': len(latencias) / args.duracion,
+        'p50': _percentil(latencias, 50),
+        'p95': _percentil(latencias, 95),
+        'p99': _percentil(latencias, 99),
+        'promedio': statistics.fmean(latencias) if latencias else 0.0,
+        'rechazos_503': sum(1 for _, estado, _ in resultados if estado == 503),
+        'errores': sum(1 for _, estado, _ in resultados if estado == 0 or (estado >= 400 and estado != 503)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara modos de gunicorn bajo la misma carga")
+    parser.add_argument('--modos', nargs='+', default=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--clientes', type=int, default=32)
+    parser.add_argument('--duracion', type=float, default=20.0)
+    parser.add_argument('--workers', type=int, default=0, help="Fija los workers (0: según CPUs)")
+    parser.add_argument('--puerto', type=int, default=5055)
+    parser.add_argument('--ruta', dest='rutas', action='append', help="Ruta a incluir en la mezcla (repetible)")
+    parser.add_argument('--token', default=os.getenv('BENCH_TOKEN'), help="JWT para rutas protegidas")
+    args = parser.parse_args(argv)
+    args.rutas = args.rutas or RUTAS_POR_DEFECTO
+
+    print(f"Clientes: {args.clientes}  Duración: {args.duracion}s  Rutas: {', '.join(args.rutas)}")
+    print(f"  {'modo':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'503':>6} {'errores':>8}")
+    for modo in args.modos:
+        try:
+            r = medir_modo(modo, args)
+        except RuntimeError as e:
+            print(f"  {modo:<8} {e}")
+            continue
+        print(f"  {r['modo']:<8} {r['req_s']:8.1f} {r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f} "
+              f"{r['rechazos_503']:6d} {r['errores']:8d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+from .invalidacion import invalidar_al_confirmar
+from .near_cache import LocalLRU, NearCache
+from .single_flight import EntradaCache, cache_protegida, valor_en_cache
@@ -0,0 +1,203 @@
+import pickle
+import zlib
+
+from cachelib.serializers import RedisSerializer
+
+# Descuenta primero las llaves del espacio que ya vencieron por TTL (ZSET por vencimiento,
+# como mucho ARGV[7] por escritura): si no, un espacio de TTL corto llena su cuota entre
+# reconciliaciones aunque casi todo lo contado ya no exista
+_GUARDAR = """
+local t = redis.call('TIME')
+local ahora = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local vencidas = redis.call('ZRANGEBYSCORE', KEYS[4], '-inf', ahora, 'LIMIT', 0, tonumber(ARGV[7]))
+for _, vencida in ipairs(vencidas) do
+    local tam_vencida = redis.call('HGET', KEYS[2], vencida)
+    if tam_vencida then
+        redis.call('HDEL', KEYS[2], vencida)
+        redis.call('HINCRBY', KEYS[3], ARGV[4] .. ':bytes', -tonumber(tam_vencida))
+        redis.call('HINCRBY', KEYS[3], ARGV[4] .. ':claves', -1)
+    end
+    redis.call('ZREM', KEYS[4], vencida)
+end
+local tam = string.len(ARGV[1])
+local anterior = redis.call('HGET', KEYS[2], ARGV[3])
+local previo = tonumber(anterior or '0')
+local usado = tonumber(redis.call('HGET', KEYS[3], ARGV[4] .. ':bytes') or '0')
+if usado - previo + tam > tonumber(ARGV[5]) then
+    redis.call('HINCRBY', KEYS[3], ARGV[4] .. ':rechazos', 1)
+    return -1
+end
+local ttl = tonumber(ARGV[2])
+local ok
+if ARGV[6] == '1' then
+    if ttl > 0 then ok = redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl, 'NX')
+    else ok = redis.call('SET', KEYS[1], ARGV[1], 'NX') end
+else
+    if ttl > 0 then ok = redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+    else ok = redis.call('SET', KEYS[1], ARGV[1]) end
+end
+if not ok then return 0 end
+if ttl > 0 then redis.call('ZADD', KEYS[4], ahora + ttl, ARGV[3])
+else redis.call('ZREM', KEYS[4], ARGV[3]) end
+redis.call('HSET', KEYS[2], ARGV[3], tam)
+redis.call('HINCRBY', KEYS[3], ARGV[4] .. ':bytes', tam - previo)
+if not anterior then redis.call('HINCRBY', KEYS[3], ARGV[4] .. ':claves', 1) end
+return 1
+"""
+
+_BORRAR = """
+local n = redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[4], ARGV[1])
+local tam = redis.call('HGET', KEYS[2], ARGV[1])
+if tam then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('HINCRBY', KEYS[3], ARGV[2] .. ':bytes', -tonumber(tam))
+    redis.call('HINCRBY', KEYS[3], ARGV[2] .. ':claves', -1)
+end
+return n
+"""
+
+
+class SerializadorComprimido(RedisSerializer):
+    """
+    Igual que el serializador de Redis de cachelib, pero comprime con zlib
+    los valores que superan el umbral (listas de reservas con pagos anidados).
+    """
+    PREFIJO = b'z'
+
+    def __init__(self, umbral: int = 16 * 1024):
+        self.umbral = umbral
+
+    def dumps(self, value, protocol=pickle.HIGHEST_PROTOCOL):
+        dump = super().dumps(value, protocol)
+        # '!' + pickle; los enteros se guardan en texto plano y nunca se comprimen
+        if len(dump) > self.umbral and dump.startswith(b'!'):
+            return self.PREFIJO + zlib.compress(dump[1:], 6)
+        return dump
+
+    def loads(self, value):
+        if value is not None and value.startswith(self.PREFIJO):
+            return pickle.loads(zlib.decompress(value[1:]))
+        return super().loads(value)
+
+
+class ContabilidadCache:
+    """
+    Lleva en Redis los bytes y la cantidad de llaves de cada espacio de la caché
+    y rechaza escrituras que superen la cuota del espacio o el tamaño máximo
+    por valor. Las llaves vencidas por TTL se descuentan en cada escritura del
+    espacio (VENCIMIENTOS_KEY); `reconciliar()` corrige lo demás (desalojos por
+    maxmemory, escrituras por fuera de la caché).
+    """
+    USO_KEY = 'cache_meta:uso'
+    TAMANOS_KEY = 'cache_meta:tamanos:{}'
+    VENCIMIENTOS_KEY = 'cache_meta:vencimientos:{}'
+    # Vencidas que descuenta cada escritura como máximo (acota lo que tarda el script)
+    VENCIDAS_POR_ESCRITURA = 100
+    # El primer prefijo que coincide define el espacio (el orden importa: 'fechas_all' es una vista)
+    ESPACIOS = (
+        ('views', ('view/', 'fechas_all')),
+        ('reservas', ('reserva', 'mis_reservas_')),
+        ('fechas', ('fecha',)),
+        ('usuarios', ('usuario', 'administrador', 'persona')),
+    )
+    OTROS = 'otros'
+    MB = 1024 * 1024
+    CUOTAS_POR_DEFECTO = {'reservas': 64 * MB, 'fechas': 16 * MB, 'usuarios': 16 * MB, 'views': 32 * MB, 'otros': 16 * MB}
+
+    def __init__(self, cliente, cuotas: dict = None, max_valor_bytes: int = 4 * MB):
+        self.cliente = cliente
+        self.cuotas = {**self.CUOTAS_POR_DEFECTO, **(cuotas or {})}
+        self.max_valor_bytes = max_valor_bytes
+        self._guardar = cliente.register_script(_GUARDAR)
+        self._borrar = cliente.register_script(_BORRAR)
+
+    def espacio(self, key: str) -> str:
+        for nombre, prefijos in self.ESPACIOS:
+            if key.startswith(prefijos):
+                return nombre
+        return self.OTROS
+
+    def guardar(self, llave_redis: str, key: str, dump: bytes, timeout: int, nx: bool = False) -> bool:
+        """
+        SET con contabilidad atómica. Devuelve False si no se guardó (cuota, tamaño o NX).
+        """
+        espacio = self.espacio(key)
+        if len(dump) > self.max_valor_bytes:
+            self.cliente.hincrby(self.USO_KEY, f"{espacio}:rechazos", 1)
+            return False
+        resultado = self._guardar(
+            keys=[llave_redis, self.TAMANOS_KEY.format(espacio), self.USO_KEY,
+                  self.VENCIMIENTOS_KEY.format(espacio)],
+            args=[dump, timeout if timeout and timeout > 0 else 0, key, espacio,
+                  self.cuotas.get(espacio, self.cuotas[self.OTROS]), '1' if nx else '0', self.VENCIDAS_POR_ESCRITURA]
+        )
+        return resultado == 1
+
+    def borrar(self, pares) -> list:
+        """
+        Borra [(llave_redis, key), ...] descontando su tamaño. Devuelve las keys que existían.
+        """
+        pipe = self.cliente.pipeline(transaction=False)
+        for llave_redis, key in pares:
+            espacio = self.espacio(key)
+            self._borrar(keys=[llave_redis, self.TAMANOS_KEY.format(espacio), self.USO_KEY,
+                               self.VENCIMIENTOS_KEY.format(espacio)],
+                         args=[key, espacio], client=pipe)
+        return [key for (_, key), borradas in zip(pares, pipe.execute()) if borradas]
+
+    def reiniciar(self):
+        nombres = [nombre for nombre, _ in self.ESPACIOS] + [self.OTROS]
+        self.cliente.delete(self.USO_KEY, *[self.TAMANOS_KEY.format(n) for n in nombres],
+                            *[self.VENCIMIENTOS_KEY.format(n) for n in nombres])
+
+    def reconciliar(self, prefijo: str) -> dict:
+        """
+        Quita de la contabilidad las llaves que vencieron por TTL y recalcula los totales.
+        """
+        nombres = [nombre for nombre, _ in self.ESPACIOS] + [self.OTROS]
+        for espacio in nombres:
+            tamanos_key = self.TAMANOS_KEY.format(espacio)
+            tamanos = self.cliente.hgetall(tamanos_key)
+            if not tamanos:
+                self.cliente.hset(self.USO_KEY, mapping={f"{espacio}:bytes": 0, f"{espacio}:claves": 0})
+                continue
+
+            keys = list(tamanos)
+            pipe = self.cliente.pipeline(transaction=False)
+            for key in keys:
+                pipe.exists(prefijo.encode() + key)
+            existentes = pipe.execute()
+
+            vencidas = [key for key, existe in zip(keys, existentes) if not existe]
+            if vencidas:
+                self.cliente.hdel(tamanos_key, *vencidas)
+                self.cliente.zrem(self.VENCIMIENTOS_KEY.format(espacio), *vencidas)
+            vivas = [int(tamanos[key]) for key, existe in zip(keys, existentes) if existe]
+            self.cliente.hset(self.USO_KEY, mapping={f"{espacio}:bytes": sum(vivas), f"{espacio}:claves": len(vivas)})
+        return self.reporte()
+
+    def reporte(self) -> dict:
+        uso = {k.decode(): int(float(v)) for k, v in self.cliente.hgetall(self.USO_KEY).items()}
+        espacios = {}
+        for espacio, cuota in self.cuotas.items():
+            usados = max(uso.get(f"{espacio}:bytes", 0), 0)
+            espacios[espacio] = {
+                'bytes': usados,
+                'claves': max(uso.get(f"{espacio}:claves", 0), 0),
+                'cuota_bytes': cuota,
+                'uso_porcentaje': round(usados * 100 / cuota, 1) if cuota else None,
+                'rechazos': uso.get(f"{espacio}:rechazos", 0),
+            }
+        memoria = self.cliente.info('memory')
+        return {
+            'espacios': espacios,
+            'max_valor_bytes': self.max_valor_bytes,
+            'redis': {
+                'used_memory': memoria.get('used_memory'),
+                'used_memory_human': memoria.get('used_memory_human'),
+                'maxmemory': memoria.get('maxmemory'),
+                'maxmemory_policy': memoria.get('maxmemory_policy'),
+                'claves_db_cache': self.cliente.dbsize(),
+            },
+        }
@@ -0,0 +1,32 @@
+import sentry_sdk
+from sqlalchemy import event
+
+from app.extensions import cache, db
+
+SESSION_KEY = 'cache_invalidaciones'
+
+
+def invalidar_al_confirmar(*claves: str):
+    """
+    Agenda el borrado de llaves de caché para cuando la transacción actual haga commit.
+    Borrar antes del commit deja una ventana en la que otra petición vuelve a
+    cachear los datos viejos; si hay rollback, no se borra nada.
+    """
+    db.session.info.setdefault(SESSION_KEY, set()).update(claves)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _borrar_claves(session):
+    claves = session.info.pop(SESSION_KEY, None)
+    if not claves:
+        return
+    try:
+        cache.delete_many(*claves)
+    except Exception as e:
+        # El commit ya se hizo: la caché vence sola por TTL
+        sentry_sdk.capture_exception(e)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _descartar_claves(session):
+    session.info.pop(SESSION_KEY, None)
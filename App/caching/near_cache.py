@@ -0,0 +1,250 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from flask_caching.backends.rediscache import RedisCache
+
+from app.utils.metricas import CACHE_OPERACIONES
+from app.utils.perfil_sql import contar_cache
+
+from .cuotas import ContabilidadCache, SerializadorComprimido
+
+
+class LocalLRU:
+    """
+    Caché en memoria del proceso: LRU acotada por cantidad de entradas y con TTL.
+    Guarda los bytes serializados tal como vienen de Redis, así cada lectura
+    devuelve una copia nueva del objeto (los modelos no se comparten entre peticiones).
+    """
+
+    def __init__(self, max_items: int = 1024, ttl: float = 5.0):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entrada = self._datos.get(key)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._datos[key]
+                return None
+            self._datos.move_to_end(key)
+            return valor
+
+    def set(self, key: str, valor: bytes, ttl: float = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._datos[key] = (time.monotonic() + ttl, valor)
+            self._datos.move_to_end(key)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._datos.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class NearCache(RedisCache):
+    """
+    Backend de Flask-Caching de dos niveles: una LRU local por proceso delante de Redis.
+
+    Solo se guardan en memoria las llaves con los prefijos configurados (lecturas
+    por ID muy frecuentes). Cualquier escritura o borrado se publica en un canal
+    pub/sub y cada proceso descarta su copia local; mientras la suscripción no
+    está activa el nivel local se desactiva, y el TTL corto acota lo que pueda
+    perderse si un mensaje no llega.
+
+    Las escrituras pasan por ContabilidadCache (bytes y llaves por espacio,
+    cuotas y tamaño máximo por valor) y los valores grandes se comprimen.
+
+    Uso: CACHE_TYPE = "app.caching.NearCache"
+    """
+    CANAL_INVALIDACION = 'near_cache_invalidacion'
+    PREFIJOS_LOCALES = ('fecha_', 'reserva_', 'usuario_', 'administrador_')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.local = LocalLRU()
+        self.prefijos_locales = self.PREFIJOS_LOCALES
+        self.contadores = {'local_hits': 0, 'local_misses': 0, 'redis_hits': 0, 'redis_misses': 0}
+        self._pid = None
+        self._suscrito = False
+        self._generacion = 0
+        self.serializer = SerializadorComprimido()
+        self.contabilidad = ContabilidadCache(self._write_client)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        instancia = super().factory(app, config, args, kwargs)
+        instancia.local = LocalLRU(
+            max_items=int(config.get('NEAR_CACHE_MAX_ITEMS', 1024)),
+            ttl=float(config.get('NEAR_CACHE_TTL', 5))
+        )
+        instancia.prefijos_locales = tuple(config.get('NEAR_CACHE_PREFIJOS', cls.PREFIJOS_LOCALES))
+        instancia.serializer = SerializadorComprimido(umbral=int(config.get('CACHE_UMBRAL_COMPRESION', 16 * 1024)))
+        instancia.contabilidad = ContabilidadCache(
+            instancia._write_client,
+            cuotas=config.get('CACHE_CUOTAS'),
+            max_valor_bytes=int(config.get('CACHE_MAX_VALOR_BYTES', 4 * 1024 * 1024))
+        )
+        return instancia
+
+    # --- Suscripción a invalidaciones -------------------------------------
+
+    def _asegurar_suscriptor(self):
+        # Tras un fork (gunicorn, celery) el hilo del padre no existe en el hijo
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._suscrito = False
+            self.local.clear()
+            threading.Thread(target=self._escuchar_invalidaciones, name='near-cache', daemon=True).start()
+
+    def _escuchar_invalidaciones(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            pubsub = self._write_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.CANAL_INVALIDACION)
+                self._suscrito = True
+                for mensaje in pubsub.listen():
+                    self._aplicar_invalidacion(mensaje['data'])
+            except redis.exceptions.RedisError:
+                pass
+            finally:
+                # Sin suscripción no podemos garantizar coherencia: vaciamos y dejamos de usar la LRU
+                self._suscrito = False
+                self.local.clear()
+                pubsub.close()
+            time.sleep(1)
+
+    def _aplicar_invalidacion(self, data):
+        self._generacion += 1
+        keys = json.loads(data)
+        if keys == '*':
+            self.local.clear()
+        else:
+            self.local.delete(*keys)
+
+    def _invalidar(self, *keys):
+        self._generacion += 1
+        if keys == ('*',):
+            self.local.clear()
+            mensaje = '*'
+        else:
+            keys = [k for k in keys if self._es_local(k)]
+            if not keys:
+                return
+            self.local.delete(*keys)
+            mensaje = keys
+        try:
+            self._write_client.publish(self.CANAL_INVALIDACION, json.dumps(mensaje))
+        except redis.exceptions.RedisError:
+            pass
+
+    def _es_local(self, key: str) -> bool:
+        return key.startswith(self.prefijos_locales)
+
+    # --- API de Flask-Caching -----------------------------------------------
+
+    @staticmethod
+    def _contar(espacio: str, resultado: str):
+        CACHE_OPERACIONES.labels(espacio, resultado).inc()
+        # Y en la petición en curso, para el perfil a pedido (app.utils.perfilador)
+        contar_cache(resultado)
+
+    def get(self, key):
+        espacio = self.contabilidad.espacio(key)
+        if not self._es_local(key):
+            valor = super().get(key)
+            self._contar(espacio, 'miss' if valor is None else 'hit_redis')
+            return valor
+
+        self._asegurar_suscriptor()
+        if self._suscrito:
+            crudo = self.local.get(key)
+            if crudo is not None:
+                self.contadores['local_hits'] += 1
+                self._contar(espacio, 'hit_local')
+                return self.serializer.loads(crudo)
+        self.contadores['local_misses'] += 1
+
+        generacion = self._generacion
+        crudo = self._read_client.get(self._get_prefix() + key)
+        if crudo is None:
+            self.contadores['redis_misses'] += 1
+            self._contar(espacio, 'miss')
+            return None
+        self.contadores['redis_hits'] += 1
+        self._contar(espacio, 'hit_redis')
+        # Si llegó una invalidación mientras leíamos, no guardamos un valor que puede ser viejo
+        if self._suscrito and generacion == self._generacion:
+            self.local.set(key, crudo)
+        return self.serializer.loads(crudo)
+
+    def _guardar(self, key, value, timeout, nx=False) -> bool:
+        timeout = self._normalize_timeout(timeout)
+        dump = self.serializer.dumps(value)
+        resultado = self.contabilidad.guardar(self._get_prefix() + key, key, dump, timeout, nx=nx)
+        self._invalidar(key)
+        return resultado
+
+    def set(self, key, value, timeout=None):
+        return self._guardar(key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        return self._guardar(key, value, timeout, nx=True)
+
+    def set_many(self, mapping, timeout=None):
+        return [key for key, value in mapping.items() if self._guardar(key, value, timeout)]
+
+    def delete(self, key):
+        resultado = bool(self.contabilidad.borrar([(self._get_prefix() + key, key)]))
+        self._invalidar(key)
+        return resultado
+
+    def delete_many(self, *keys):
+        if not keys:
+            return []
+        borradas = self.contabilidad.borrar([(self._get_prefix() + key, key) for key in keys])
+        # Las copias locales se invalidan igual: otra instancia pudo haberlas guardado
+        self._invalidar(*keys)
+        return borradas
+
+    def clear(self):
+        resultado = super().clear()
+        self.contabilidad.reiniciar()
+        self._invalidar('*')
+        return resultado
+
+    def reconciliar(self) -> dict:
+        """
+        Descuenta de las cuotas las llaves que vencieron por TTL.
+        """
+        return self.contabilidad.reconciliar(self._get_prefix())
+
+    def estadisticas(self) -> dict:
+        """
+        Aciertos y fallos por nivel de este proceso.
+        """
+        return {
+            'pid': os.getpid(),
+            'umbral_compresion': self.serializer.umbral,
+            'suscrito': self._suscrito,
+            'entradas_locales': len(self.local),
+            **self.contadores,
+        }
@@ -0,0 +1,216 @@
+import importlib
+import inspect
+import logging
+import time
+import uuid
+from functools import wraps
+from typing import Any, NamedTuple
+
+import sentry_sdk
+
+from app.extensions import cache, redis_client
+
+# Libera el lease solo si sigue siendo nuestro (no pisa el de otro proceso si el nuestro venció)
+_LIBERAR_LEASE = redis_client.register_script("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""")
+
+# Funciones decoradas por nombre, para que la tarea de refresco anticipado las encuentre
+REGISTRO = {}
+
+logger = logging.getLogger(__name__)
+
+
+class EntradaCache(NamedTuple):
+    """
+    Valor guardado en la caché junto con su vencimiento "suave".
+    Pasado `suave_hasta` el valor sigue sirviéndose mientras un solo proceso lo recalcula.
+    `ausente` marca un resultado negativo (la entidad no existe o está inactiva).
+    """
+    valor: Any
+    suave_hasta: float
+    ausente: bool = False
+
+
+def _lease_key(clave: str) -> str:
+    return f"lease_{clave}"
+
+
+def tomar_lease(clave: str, segundos: int):
+    """
+    Intenta ser el único proceso que recalcula `clave`. Devuelve el token o None.
+    """
+    token = uuid.uuid4().hex
+    if redis_client.set(_lease_key(clave), token, nx=True, ex=segundos):
+        return token
+    return None
+
+
+def liberar_lease(clave: str, token: str):
+    _LIBERAR_LEASE(keys=[_lease_key(clave)], args=[token])
+
+
+def lease_tomado(clave: str) -> bool:
+    return bool(redis_client.exists(_lease_key(clave)))
+
+
+def desenvolver(entrada):
+    """
+    Devuelve (valor, suave_hasta). Los valores guardados sin envoltorio
+    (cache.set directo) se consideran frescos.
+    """
+    if isinstance(entrada, EntradaCache):
+        return entrada.valor, entrada.suave_hasta
+    return entrada, float('inf')
+
+
+def valor_en_cache(clave: str):
+    """
+    Lee el valor cacheado (fresco o vencido) sin recalcular. None si no hay nada.
+    """
+    entrada = cache.get(clave)
+    if entrada is None:
+        return None
+    return desenvolver(entrada)[0]
+
+
+def cache_protegida(clave, timeout: int = 300, ttl_suave: int = None, lease_segundos: int = 30,
+                    espera_maxima: float = 3.0, refresco_anticipado: bool = False,
+                    cachear_si=bool, ttl_negativo: int = None, unless=None):
+    """
+    Decorador de caché con protección contra estampidas.
+
+    - `clave`: llave fija o plantilla con los argumentos de la función por nombre,
+      p. ej. 'reserva_{reserva_id}'.
+    - `timeout`: vida real del valor en Redis. `ttl_suave`: a partir de cuándo se
+      considera viejo (por defecto el 80% del timeout).
+    - Un valor viejo se sigue sirviendo mientras un único proceso (el que toma el
+      lease en Redis) lo recalcula; con `refresco_anticipado` el recálculo se
+      delega a Celery y la petición responde de inmediato.
+    - Sin ningún valor, el que no consiguió el lease espera hasta `espera_maxima`
+      a que el otro termine antes de ir a la base por su cuenta.
+    - `cachear_si` decide si el resultado se guarda; `unless` salta la caché.
+    - Con `ttl_negativo`, un resultado vacío se recuerda con un centinela durante
+      esos segundos: la misma llave que invalida al crear lo borra.
+    """
+    ttl_suave = ttl_suave if ttl_suave is not None else int(timeout * 0.8)
+
+    def decorador(f):
+        nombre = f"{f.__module__}:{f.__qualname__}"
+        es_metodo = '.' in f.__qualname__
+        firma = inspect.signature(f)
+
+        def _clave(args, kwargs):
+            return clave.format(**firma.bind(*args, **kwargs).arguments)
+
+        def _calcular_y_guardar(args, kwargs, llave):
+            resultado = f(*args, **kwargs)
+            guardado = True
+            if cachear_si(resultado):
+                guardado = cache.set(llave, EntradaCache(resultado, time.time() + ttl_suave), timeout=timeout)
+            elif ttl_negativo and resultado is None:
+                guardado = cache.set(llave, EntradaCache(None, time.time() + ttl_negativo, ausente=True),
+                                     timeout=ttl_negativo)
+            if guardado is False:
+                # Cuota del espacio llena o valor más grande que CACHE_MAX_VALOR_KB: quienes
+                # esperaban el valor lo notan al liberarse el lease y consultan por su cuenta
+                logger.warning("No se pudo guardar '%s' en la caché (cuota o tamaño máximo)", llave)
+            return resultado
+
+        def _recalcular_con_lease(args, kwargs, llave, token):
+            try:
+                return _calcular_y_guardar(args, kwargs, llave)
+            finally:
+                liberar_lease(llave, token)
+
+        def _refrescar_en_segundo_plano(args, kwargs, llave, token):
+            from app.tasks import refrescar_cache_protegida
+            argumentos = list(args[1:] if es_metodo else args)
+            try:
+                refrescar_cache_protegida.delay(nombre, argumentos, kwargs, token)
+            except Exception as e:
+                # Sin broker: recalculamos aquí mismo
+                sentry_sdk.capture_exception(e)
+                _recalcular_con_lease(args, kwargs, llave, token)
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if unless is not None and unless():
+                return f(*args, **kwargs)
+
+            llave = _clave(args, kwargs)
+            entrada = cache.get(llave)
+
+            if entrada is not None:
+                if isinstance(entrada, EntradaCache) and entrada.ausente:
+                    return None
+                valor, suave_hasta = desenvolver(entrada)
+                if time.time() < suave_hasta:
+                    return valor
+                # Vencido: solo uno recalcula, el resto sigue sirviendo el valor viejo
+                token = tomar_lease(llave, lease_segundos)
+                if token:
+                    if refresco_anticipado:
+                        _refrescar_en_segundo_plano(args, kwargs, llave, token)
+                    else:
+                        return _recalcular_con_lease(args, kwargs, llave, token)
+                return valor
+
+            token = tomar_lease(llave, lease_segundos)
+            if token:
+                return _recalcular_con_lease(args, kwargs, llave, token)
+
+            # Otro proceso está recalculando: esperamos su resultado en vez de repetir la consulta
+            limite = time.monotonic() + espera_maxima
+            while time.monotonic() < limite:
+                time.sleep(0.05)
+                entrada = cache.get(llave)
+                if entrada is not None:
+                    return desenvolver(entrada)[0]
+                if not lease_tomado(llave):
+                    # Terminó sin guardar nada (no cacheable, negativo sin ttl_negativo o set
+                    # rechazado): no tiene sentido seguir esperando. Releemos por si guardó
+                    # justo antes de liberar.
+                    entrada = cache.get(llave)
+                    if entrada is not None:
+                        return desenvolver(entrada)[0]
+                    break
+            return f(*args, **kwargs)
+
+        def refrescar(args, kwargs, token=None):
+            """
+            Recalcula y guarda el valor (usado por la tarea de Celery). `args` incluye self.
+            """
+            llave = _clave(args, kwargs)
+            try:
+                return _calcular_y_guardar(args, kwargs, llave)
+            finally:
+                if token:
+                    liberar_lease(llave, token)
+
+        wrapper.refrescar = refrescar
+        wrapper.nombre_cache = nombre
+        REGISTRO[nombre] = wrapper
+        return wrapper
+
+    return decorador
+
+
+def refrescar(nombre: str, argumentos: list, kwargs: dict = None, token: str = None):
+    """
+    Recalcula una entrada registrada por `cache_protegida` ('modulo:Clase.metodo').
+    Para métodos se crea una instancia nueva de la clase (los servicios no
+    reciben argumentos obligatorios).
+    """
+    modulo_nombre, _, qualname = nombre.partition(':')
+    objeto = importlib.import_module(modulo_nombre)
+    partes = qualname.split('.')
+    for parte in partes[:-1]:
+        objeto = getattr(objeto, parte)
+
+    wrapper = REGISTRO[nombre]
+    args = [objeto()] + list(argumentos) if len(partes) > 1 else list(argumentos)
+    return wrapper.refrescar(args, kwargs or {}, token)
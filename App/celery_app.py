@@ -1,19 +1,49 @@
 import os
-from celery import Celery
+import time
+from celery import Celery, signals
 from celery.schedules import crontab
+from celery.utils.log import get_task_logger
+from celery.worker.control import control_command
 from flask import has_app_context
 
+from app.utils.telemetria import instrumentar_celery
+
+logger = get_task_logger(__name__)
+
+# Resultados en su propia base lógica (la caché usa la 1 y el limiter la 2). El broker
+# sigue por defecto en la 0: cambiarlo con tareas encoladas o con ETA/countdown las deja
+# huérfanas en la base vieja. Para moverlo (CELERY_BROKER_DB=3) ver el README.
+_redis_base = f"redis://:{os.getenv('REDIS_PASSWORD', '1234')}@{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', 6379)}"
+
 # 1. Creamos la instancia principal de Celery apuntando a Docker
 celery = Celery(
     "app",
-    broker=os.getenv("CELERY_BROKER_URL", "redis://:1234@redis:6379/0"),
-    backend=os.getenv("CELERY_RESULT_BACKEND", "redis://:1234@redis:6379/0"),
+    broker=os.getenv("CELERY_BROKER_URL", f"{_redis_base}/{os.getenv('CELERY_BROKER_DB', 0)}"),
+    backend=os.getenv("CELERY_RESULT_BACKEND", f"{_redis_base}/{os.getenv('CELERY_RESULT_DB', 4)}"),
     include=['app.tasks'] # Le decimos dónde buscar las tareas
 )
+# Los resultados vencen solos para que no crezcan sin límite
+celery.conf.result_expires = 3600
+
+# Los procesos del pool que superan este RSS se reemplazan al terminar la tarea en curso
+if os.getenv("CELERY_MAX_MEMORY_MB"):
+    celery.conf.worker_max_memory_per_child = int(os.getenv("CELERY_MAX_MEMORY_MB")) * 1024  # KB
 
 # Configuramos la zona horaria para que el cron se ejecute a tu hora local real
 celery.conf.timezone = 'America/Argentina/Buenos_Aires'
 
+# App de Flask del proceso worker: se crea una sola vez, no en cada tarea
+_flask_app = None
+
+
+def _app_flask():
+    global _flask_app
+    if _flask_app is None:
+        from app import create_app
+        _flask_app = create_app()
+    return _flask_app
+
+
 # Celery corre en un proceso paralelo. Si no hacemos esto, cuando intente 
 # usar db.session.get() para actualizar el calendario, crasheará.
 class FlaskTask(celery.Task):
@@ -22,13 +52,152 @@ class FlaskTask(celery.Task):
             return self.run(*args, **kwargs)
         else:
             # Si el Worker de Celery lo está ejecutando, levanta el entorno de Flask primero
-            from app import create_app
-            flask_app = create_app()
-            with flask_app.app_context():
+            with _app_flask().app_context():
                 return self.run(*args, **kwargs)
 
 celery.Task = FlaskTask
 
+
+def _config_entorno():
+    from flask import Config as FlaskConfig
+
+    from app.config import factory
+    config = FlaskConfig(os.path.dirname(__file__))
+    config.from_object(factory(os.getenv("FLASK_ENV")))
+    return config
+
+
+# En la web (que importa este módulo recién al encolar, con la telemetría ya iniciada)
+# cada .delay() lleva el contexto de la traza en los headers del mensaje
+instrumentar_celery()
+
+
+@signals.worker_process_init.connect
+def _iniciar_telemetria(**kwargs):
+    """
+    Cada proceso del pool arma su proveedor de trazas después del fork y retoma
+    el contexto que trae cada tarea: petición → tarea → R2 → Telegram en una traza.
+    """
+    from app.utils.telemetria import iniciar_telemetria
+    if iniciar_telemetria(_config_entorno(), servicio=os.getenv('OTEL_SERVICIO_WORKER', 'salon-worker')):
+        instrumentar_celery()
+
+
+@signals.celeryd_init.connect
+@signals.beat_init.connect
+def _iniciar_sentry(**kwargs):
+    """
+    Sentry en el worker (antes del fork de los procesos hijos) con la integración
+    de Celery y el mismo muestreo por resultado que la web (SENTRY_TRAZAS_TASAS_TAREAS).
+    """
+    from app.utils.trazas import iniciar_sentry
+    iniciar_sentry(_config_entorno(), celery=True)
+
+
+# --- Métricas Prometheus de las tareas (duración, fallas) --------------------
+
+_inicios_tareas = {}
+
+
+@signals.celeryd_init.connect
+def _exponer_metricas(**kwargs):
+    """
+    El worker expone /metrics en CELERY_METRICS_PORT agregando todos sus procesos hijos.
+    """
+    puerto = os.getenv("CELERY_METRICS_PORT")
+    if not puerto:
+        return
+    from prometheus_client import start_http_server
+
+    from app.utils import metricas
+    metricas.limpiar_directorio()
+    start_http_server(int(puerto), registry=metricas.registro())
+
+
+@signals.task_prerun.connect
+def _tarea_iniciada(task_id=None, task=None, **kwargs):
+    from app.utils import perfil_sql
+    umbral_ms = os.getenv('SQL_LENTA_UMBRAL_MS')
+    _inicios_tareas[task_id] = (time.perf_counter(),
+                                perfil_sql.iniciar(task.name, umbral_lento=float(umbral_ms) / 1000 if umbral_ms else None))
+
+
+@signals.task_postrun.connect
+def _tarea_terminada(task_id=None, task=None, state=None, **kwargs):
+    registro = _inicios_tareas.pop(task_id, None)
+    if registro is None:
+        return
+    inicio, token_sql = registro
+    from app.utils import perfil_sql
+    from app.utils.metricas import TAREAS_DURACION
+    TAREAS_DURACION.labels(task.name, state or 'desconocido').observe(time.perf_counter() - inicio)
+
+    # Mismo detector de N+1 que en las peticiones (SQL_N_MAS_1_UMBRAL)
+    contexto = perfil_sql.terminar(token_sql)
+    repetidas = contexto.repetidas(int(os.getenv('SQL_N_MAS_1_UMBRAL', 5)))
+    if repetidas:
+        logger.warning("Posible N+1 en la tarea %s (%d sentencias, %.1f ms): %s", task.name,
+                       contexto.sentencias, contexto.duracion * 1000,
+                       "; ".join(f"{n}x {sentencia[:160]}" for sentencia, n in repetidas.items()))
+
+    # Las consultas lentas de la tarea van al mismo registro que las de la web
+    if contexto.lentas:
+        from app.utils.consultas_lentas import encolar
+        encolar(task.name, contexto.lentas, float(os.getenv('SQL_LENTA_EXPLAIN_MUESTRA', 0.1)),
+                int(os.getenv('SQL_LENTA_EXPLAIN_INTERVALO', 3600)))
+
+
+@signals.task_failure.connect
+def _tarea_fallida(sender=None, **kwargs):
+    from app.utils.metricas import TAREAS_FALLIDAS
+    TAREAS_FALLIDAS.labels(sender.name if sender else 'desconocida').inc()
+
+
+@signals.worker_process_shutdown.connect
+def _proceso_terminado(pid=None, **kwargs):
+    from app.utils.metricas import proceso_terminado
+    proceso_terminado(pid or os.getpid())
+
+# --- Memoria de los procesos del worker --------------------------------------
+
+@signals.worker_process_init.connect
+def _trazar_memoria(**kwargs):
+    """
+    Cada proceso del pool (los que corren las tareas) traza desde el arranque si
+    MEMORIA_TRACEMALLOC_MARCOS > 0 y atiende las acciones del comando `memoria`.
+    """
+    from app.extensions import redis_client
+    from app.utils.memoria import escuchar_acciones, iniciar_tracemalloc
+    marcos = int(os.getenv('MEMORIA_TRACEMALLOC_MARCOS', 0))
+    if marcos:
+        iniciar_tracemalloc(marcos)
+    escuchar_acciones(redis_client, 'worker')
+
+
+@control_command(
+    args=[('accion', str), ('limite', int), ('nombre', str), ('pid', int)],
+    signature='[reporte|iniciar|detener|snapshot|diferencia] [limite] [nombre] [pid]',
+)
+def memoria(state, accion='reporte', limite=15, nombre=None, pid=None):
+    """
+    Memoria del worker: `celery -A app.celery_app.celery control memoria [accion] [limite] [nombre] [pid]`.
+    Corre en el proceso principal, que no ejecuta tareas: la acción se difunde a los
+    procesos del pool (o solo a `pid`) y vuelve la respuesta de cada uno en 'pool'.
+    Con --pool=solo o threads se aplica al principal. 'diferencia' compara el
+    snapshot `nombre` con el momento actual.
+    """
+    from app.extensions import redis_client
+    from app.utils import memoria as diagnostico_memoria
+    parametros = {'accion': accion, 'limite': limite, 'nombre': nombre, 'desde': nombre}
+    try:
+        pool = diagnostico_memoria.difundir(redis_client, 'worker', parametros, pid=pid)
+        if pool is None:
+            return diagnostico_memoria.ejecutar(accion, limite, nombre=nombre, desde=nombre, padre=os.getpid())
+        return {'principal': diagnostico_memoria.reporte(limite, padre=os.getpid()), 'pool': pool}
+    except (KeyError, ValueError) as e:
+        return {'error': str(e)}
+
+
 # 3. Programación de Tareas Periódicas (Celery Beat)
 celery.conf.beat_schedule = {
     'notificar-pendientes-9am': {
@@ -39,4 +208,20 @@ celery.conf.beat_schedule = {
         'task': 'app.tasks.check_upcoming_reservations',
         'schedule': crontab(hour=10, minute=0),
     },
+    'purgar-registro-eliminaciones': {
+        'task': 'app.tasks.purgar_registro_eliminaciones',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'purgar-consultas-lentas': {
+        'task': 'app.tasks.purgar_consultas_lentas',
+        'schedule': crontab(hour=4, minute=15),
+    },
+    'reconciliar-uso-cache': {
+        'task': 'app.tasks.reconciliar_uso_cache',
+        'schedule': 600.0,  # Descuenta de las cuotas las llaves vencidas por TTL
+    },
+    'expirar-reservas-vencidas': {
+        'task': 'app.tasks.expirar_reservas_vencidas',
+        'schedule': 60.0,  # Cada minuto: solo procesa las entradas vencidas del sorted set
+    },
 }
\ No newline at end of file
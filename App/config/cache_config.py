@@ -10,11 +10,11 @@ if env == "testing":
     }
 else:
     cache_config = {
-        "CACHE_TYPE": "RedisCache",
+        "CACHE_TYPE": "app.caching.NearCache",
         "CACHE_DEFAULT_TIMEOUT": 300,
         "CACHE_REDIS_HOST": os.environ.get('REDIS_HOST'),
         "CACHE_REDIS_PORT": os.environ.get('REDIS_PORT'),
-        "CACHE_REDIS_DB": os.environ.get('REDIS_DB'),
+        "CACHE_REDIS_DB": os.environ.get('CACHE_REDIS_DB', 1),
         "CACHE_REDIS_PASSWORD": os.environ.get('REDIS_PASSWORD'),
         "CACHE_KEY_PREFIX": "flask_"
     }
@@ -10,11 +10,92 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = datetime.timedelta(hours=2)
+    # Horas que tiene una reserva pendiente para ser confirmada antes de liberar la fecha
+    RESERVA_VENCIMIENTO_HORAS = int(os.getenv('RESERVA_VENCIMIENTO_HORAS', 72))
+    # Caché local por proceso delante de Redis (app.caching.NearCache)
+    NEAR_CACHE_MAX_ITEMS = int(os.getenv('NEAR_CACHE_MAX_ITEMS', 1024))
+    NEAR_CACHE_TTL = float(os.getenv('NEAR_CACHE_TTL', 5))
+    # Cuotas de memoria por espacio de la caché (MB) y compresión de valores grandes
+    CACHE_CUOTAS = {
+        espacio: int(os.getenv(f'CACHE_CUOTA_{espacio.upper()}_MB', mb)) * 1024 * 1024
+        for espacio, mb in (('reservas', 64), ('fechas', 16), ('usuarios', 16), ('views', 32), ('otros', 16))
+    }
+    CACHE_MAX_VALOR_BYTES = int(os.getenv('CACHE_MAX_VALOR_KB', 4096)) * 1024
+    CACHE_UMBRAL_COMPRESION = int(os.getenv('CACHE_UMBRAL_COMPRESION_KB', 16)) * 1024
+    # Solo se apaga para pruebas de carga (benchmarks/servidor.py)
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() != 'false'
+    # Control de admisión (app.utils.admision): lugares por proceso (vacío: los que el worker
+    # atiende a la vez, sin los de SSE y hasta el tamaño del pool), espera por un lugar antes
+    # del 503, plazo total de la petición (acota la espera del pool) y Retry-After
+    ADMISION_CAPACIDAD = int(os.getenv('ADMISION_CAPACIDAD', 0)) or None
+    ADMISION_ESPERA_MAXIMA = float(os.getenv('ADMISION_ESPERA_MAXIMA', 0.5))
+    ADMISION_PLAZO_SEGUNDOS = float(os.getenv('ADMISION_PLAZO_SEGUNDOS', 10))
+    ADMISION_RETRY_AFTER = int(os.getenv('ADMISION_RETRY_AFTER', 2))
+    # Servidor (app.servidor): clase de worker sync/gthread/gevent; los workers salen de
+    # la cantidad de CPUs si no se fijan. Timeout holgado para el PDF de WeasyPrint.
+    GUNICORN_BIND = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+    GUNICORN_WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', 0)) or None
+    GUNICORN_CPUS = int(os.getenv('GUNICORN_CPUS', 0)) or None
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 8))
+    GUNICORN_WORKER_CONNECTIONS = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 500))
+    GUNICORN_KEEPALIVE = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+    GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', 60))
+    GUNICORN_GRACEFUL_TIMEOUT = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+    GUNICORN_PRELOAD = {'1': True, 'true': True, '0': False, 'false': False}.get(os.getenv('GUNICORN_PRELOAD', '').lower())
+    GUNICORN_MAX_REQUESTS = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+    GUNICORN_MAX_REQUESTS_JITTER = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+    GUNICORN_ACCESSLOG = os.getenv('GUNICORN_ACCESSLOG')
+    # Streams SSE simultáneos por worker; vacío: según la clase de worker (app.servidor.streams_por_worker:
+    # 0 con sync, GUNICORN_THREADS/4 con gthread, la mitad de las conexiones con gevent). En producción
+    # los streams se sirven desde el servicio `sse` del compose (gevent, 900 por worker)
+    SSE_MAX_CONEXIONES = int(os.getenv('SSE_MAX_CONEXIONES')) if os.getenv('SSE_MAX_CONEXIONES') else None
+    # Reciclaje por memoria: el worker que pasa este RSS (MB) se reemplaza; se mide cada N peticiones
+    GUNICORN_MAX_RSS_MB = int(os.getenv('GUNICORN_MAX_RSS_MB', 0)) or None
+    GUNICORN_RSS_CADA = int(os.getenv('GUNICORN_RSS_CADA', 50))
+    # Frames de tracemalloc desde el arranque (0: apagado, se prende desde POST /memoria)
+    MEMORIA_TRACEMALLOC_MARCOS = int(os.getenv('MEMORIA_TRACEMALLOC_MARCOS', 0))
+    # Perfil SQL por petición (app.utils.perfil_sql): presupuesto de sentencias y aviso de N+1
+    SQL_PRESUPUESTO = int(os.getenv('SQL_PRESUPUESTO', 0)) or None
+    SQL_PRESUPUESTO_ESTRICTO = False
+    SQL_N_MAS_1_UMBRAL = int(os.getenv('SQL_N_MAS_1_UMBRAL', 5))
+    SQL_CABECERAS = False
+    # Registro de consultas lentas (tabla consulta_lenta): umbral en ms (vacío: apagado),
+    # fracción que se manda a EXPLAIN (ANALYZE, BUFFERS) y como máximo un plan por consulta por intervalo
+    SQL_LENTA_UMBRAL_MS = float(os.getenv('SQL_LENTA_UMBRAL_MS', 0)) or None
+    SQL_LENTA_EXPLAIN_MUESTRA = float(os.getenv('SQL_LENTA_EXPLAIN_MUESTRA', 0.1))
+    SQL_LENTA_EXPLAIN_INTERVALO = int(os.getenv('SQL_LENTA_EXPLAIN_INTERVALO', 3600))
+    # Perfilador a pedido (app.utils.perfilador): intervalo de muestreo en segundos,
+    # vida de los perfiles en Redis y cuántos se conservan
+    PERFILADOR_HABILITADO = os.getenv('PERFILADOR_HABILITADO', 'true').lower() != 'false'
+    PERFILADOR_INTERVALO = float(os.getenv('PERFILADOR_INTERVALO', 0.001))
+    PERFILADOR_TTL = int(os.getenv('PERFILADOR_TTL', 86400))
+    PERFILADOR_MAX = int(os.getenv('PERFILADOR_MAX', 50))
+    # OpenTelemetry (app.utils.telemetria): otlp (OTEL_EXPORTER_OTLP_ENDPOINT), archivo
+    # (un span JSON por línea en OTEL_ARCHIVO), azure o consola; vacío: apagado
+    OTEL_EXPORTADOR = os.getenv('OTEL_EXPORTADOR') or None
+    OTEL_SERVICIO = os.getenv('OTEL_SERVICIO', 'salon-api')
+    OTEL_ARCHIVO = os.getenv('OTEL_ARCHIVO', '/tmp/trazas.jsonl')
+    OTEL_MUESTRA = float(os.getenv('OTEL_MUESTRA', 1.0))
+    OTEL_RUTAS_EXCLUIDAS = os.getenv('OTEL_RUTAS_EXCLUIDAS', '/metrics,/health,/stream/')
+    # Muestreo de trazas de Sentry (app.utils.trazas): las rutas/tareas con tasa propia se
+    # muestrean al empezar; del resto se traza la fracción de candidatas y al terminar se
+    # conservan errores y lentas y, de las demás, la tasa por defecto
+    SENTRY_ENTORNO = os.getenv('SENTRY_ENVIRONMENT', 'development')
+    SENTRY_TRAZAS_CANDIDATAS = float(os.getenv('SENTRY_TRAZAS_CANDIDATAS', 1.0))
+    SENTRY_TRAZAS_TASA_DEFECTO = float(os.getenv('SENTRY_TRAZAS_TASA_DEFECTO', 1.0))
+    SENTRY_TRAZAS_UMBRAL_LENTO_MS = float(os.getenv('SENTRY_TRAZAS_UMBRAL_LENTO_MS', 1000))
+    SENTRY_TRAZAS_RUTAS_IGNORADAS = ('/health', '/api/v1/health', '/metrics', '/api/v1/stream/')
+    SENTRY_TRAZAS_TASAS_RUTAS = (
+        ('GET', '/api/v1/fecha', float(os.getenv('SENTRY_TRAZAS_TASA_FECHA', 1.0))),
+        ('GET', '/api/v1/reserva', float(os.getenv('SENTRY_TRAZAS_TASA_RESERVA', 1.0))),
+    )
+    SENTRY_TRAZAS_TASAS_TAREAS = {}
     GOOGLE_CREDENTIALS = {
     "type": os.getenv("GOOGLE_TYPE"),
     "project_id": os.getenv("GOOGLE_PROJECT_ID"),
     "private_key_id": os.getenv("GOOGLE_PRIVATE_KEY_ID"),
-    "private_key": os.getenv("GOOGLE_PRIVATE_KEY").replace('\\n', '\n'),
+    "private_key": os.getenv("GOOGLE_PRIVATE_KEY", "").replace('\\n', '\n'),
     "client_email": os.getenv("GOOGLE_CLIENT_EMAIL"),
     "client_id": os.getenv("GOOGLE_CLIENT_ID"),
     "auth_uri": os.getenv("GOOGLE_AUTH_URI"),
@@ -50,10 +131,13 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv('DEV_DATABASE_URI') 
     CACHE_REDIS_HOST = os.getenv('REDIS_HOST')
     CACHE_REDIS_PORT = os.getenv('REDIS_PORT')
-    CACHE_REDIS_DB = os.getenv('REDIS_DB')
+    # La caché vive en su propia base lógica: un FLUSHDB o una cuota no tocan al broker
+    CACHE_REDIS_DB = os.getenv('CACHE_REDIS_DB', 1)
     CACHE_REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
-    CACHE_TYPE = "RedisCache"
+    CACHE_TYPE = "app.caching.NearCache"
     CACHE_DEFAULT_TIMEOUT = 30  
+    # X-SQL-Count / Server-Timing en cada respuesta y aviso de N+1 en el log
+    SQL_CABECERAS = True
     @staticmethod
     def init_app(app):
         """Valida las variables de entorno críticas para desarrollo."""
@@ -61,7 +145,16 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    # Un endpoint que excede su presupuesto de sentencias responde 500 (ver benchmarks/presupuesto_sql.py)
+    SQL_PRESUPUESTO = int(os.getenv('SQL_PRESUPUESTO', 50))
+    SQL_PRESUPUESTO_ESTRICTO = True
+    SQL_CABECERAS = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    # SQLite en memoria usa StaticPool (una sola conexión): no acepta las opciones de QueuePool
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    # Sin secretos ni Redis: los chequeos (benchmarks/presupuesto_sql.py) corren en CI
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'clave-de-pruebas-no-usar-en-produccion')
+    RATELIMIT_ENABLED = False
     CACHE_TYPE = "SimpleCache"
     CACHE_DEFAULT_TIMEOUT = 300
 
@@ -69,10 +162,24 @@ class TestingConfig(Config):
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv("PROD_DATABASE_URI")
-    CACHE_TYPE = "RedisCache"
+    SENTRY_ENTORNO = os.getenv('SENTRY_ENVIRONMENT', 'production')
+    SENTRY_TRAZAS_CANDIDATAS = float(os.getenv('SENTRY_TRAZAS_CANDIDATAS', 0.5))
+    SENTRY_TRAZAS_TASA_DEFECTO = float(os.getenv('SENTRY_TRAZAS_TASA_DEFECTO', 0.1))
+    SENTRY_TRAZAS_TASAS_RUTAS = (
+        ('GET', '/api/v1/fecha', float(os.getenv('SENTRY_TRAZAS_TASA_FECHA', 0.01))),
+        ('GET', '/api/v1/reserva', float(os.getenv('SENTRY_TRAZAS_TASA_RESERVA', 0.02))),
+    )
+    # Tareas periódicas muy frecuentes: casi nunca interesa una ejecución normal
+    SENTRY_TRAZAS_TASAS_TAREAS = {
+        'app.tasks.expirar_reservas_vencidas': 0.005,
+        'app.tasks.reconciliar_uso_cache': 0.02,
+        'app.tasks.refrescar_cache_protegida': 0.01,
+    }
+    CACHE_TYPE = "app.caching.NearCache"
     CACHE_REDIS_HOST = os.getenv('REDIS_HOST')
     CACHE_REDIS_PORT = os.getenv('REDIS_PORT')
-    CACHE_REDIS_DB = os.getenv('REDIS_DB')
+    # La caché vive en su propia base lógica: un FLUSHDB o una cuota no tocan al broker
+    CACHE_REDIS_DB = os.getenv('CACHE_REDIS_DB', 1)
     CACHE_REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
     CACHE_DEFAULT_TIMEOUT = 30
 
@@ -0,0 +1,2 @@
+from .bus import EventBus, event_bus
+from .sse import SSEBroker, sse_broker
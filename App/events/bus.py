@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+
+import sentry_sdk
+from sqlalchemy import event
+
+from app.extensions import db, redis_client
+from app.utils.telemetria import inyectar_contexto
+
+
+class EventBus:
+    """
+    Bus de eventos de dominio sobre Redis Streams.
+    Los eventos se acumulan en la sesión de SQLAlchemy y se publican recién
+    después del commit, así los consumidores nunca ven cambios que luego se
+    deshicieron con un rollback.
+
+    Cada entrada lleva el traceparent de donde se emitió el evento, así el
+    consumidor continúa la misma traza (petición → tarea → consumidor → Telegram).
+    """
+    STREAM_KEY = 'eventos_dominio'
+    STREAM_MAXLEN = 10000  # Recorte aproximado del stream (los consumidores confirman con XACK)
+    SESSION_KEY = 'eventos_pendientes'
+
+    def emitir(self, tipo: str, **datos):
+        """
+        Registra un evento para publicarlo al confirmar la transacción actual.
+        """
+        pendientes = db.session.info.setdefault(self.SESSION_KEY, [])
+        # El contexto se toma ahora: al publicar (after_commit) el span de origen puede haber cerrado
+        pendientes.append((tipo, datos, datetime.utcnow(), inyectar_contexto({})))
+
+    def publicar(self, tipo: str, datos: dict, emitido_en: datetime = None) -> str:
+        """
+        Publica un evento en el stream de forma inmediata. Devuelve el ID del stream.
+        """
+        campos = self._campos(tipo, datos, emitido_en or datetime.utcnow(), inyectar_contexto({}))
+        return redis_client.xadd(self.STREAM_KEY, campos, maxlen=self.STREAM_MAXLEN, approximate=True)
+
+    def publicar_pendientes(self, session):
+        pendientes = session.info.pop(self.SESSION_KEY, None)
+        if not pendientes:
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        for tipo, datos, emitido_en, contexto in pendientes:
+            pipe.xadd(self.STREAM_KEY, self._campos(tipo, datos, emitido_en, contexto),
+                      maxlen=self.STREAM_MAXLEN, approximate=True)
+        pipe.execute()
+
+    def descartar_pendientes(self, session):
+        session.info.pop(self.SESSION_KEY, None)
+
+    @staticmethod
+    def _campos(tipo: str, datos: dict, emitido_en: datetime, contexto: dict = None) -> dict:
+        return {
+            'tipo': tipo,
+            'datos': json.dumps(datos, default=str),
+            'emitido_en': emitido_en.isoformat(),
+            **(contexto or {}),
+        }
+
+    @staticmethod
+    def decodificar(campos: dict) -> tuple[str, dict]:
+        """
+        Convierte una entrada del stream en (tipo, datos).
+        """
+        return campos.get('tipo'), json.loads(campos.get('datos') or '{}')
+
+
+event_bus = EventBus()
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publicar_eventos(session):
+    try:
+        event_bus.publicar_pendientes(session)
+    except Exception as e:
+        # El commit ya se hizo: un fallo de Redis no puede romper la petición
+        sentry_sdk.capture_exception(e)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _descartar_eventos(session):
+    event_bus.descartar_pendientes(session)
@@ -0,0 +1,123 @@
+from datetime import datetime
+
+from app.events.sse import sse_broker
+from app.extensions import cache, db, redis_client
+from app.mapping import FechaSchema
+from app.models import Fecha, Reserva
+
+# Claves de listas que dependen del estado de cualquier reserva
+CLAVES_LISTAS_RESERVAS = ('reservas', 'reservas_archivadas')
+CLAVES_LISTAS_FECHAS = ('fechas', 'fechas_all', 'todas_las_fechas', 'fechas_disponibles')
+
+
+def invalidar_cache(tipo: str, datos: dict, emitido_en: datetime = None):
+    """
+    Consumidor 'cache': borra solo las llaves afectadas por el evento.
+    """
+    claves = []
+    if tipo.startswith('reserva.'):
+        claves.extend(CLAVES_LISTAS_RESERVAS)
+        if datos.get('reserva_id'):
+            claves.append(f"reserva_{datos['reserva_id']}")
+        if datos.get('usuario_id'):
+            claves.append(f"mis_reservas_{datos['usuario_id']}")
+        # Cualquier cambio de estado de una reserva se refleja en el calendario
+        claves.extend(CLAVES_LISTAS_FECHAS)
+        if datos.get('fecha_id'):
+            claves.append(f"fecha_{datos['fecha_id']}")
+    elif tipo.startswith('pago.'):
+        # Los pagos se ven anidados en las reservas (pagos y saldo_restante)
+        claves.extend(CLAVES_LISTAS_RESERVAS)
+        if datos.get('reserva_id'):
+            claves.append(f"reserva_{datos['reserva_id']}")
+        if datos.get('usuario_id'):
+            claves.append(f"mis_reservas_{datos['usuario_id']}")
+
+    if claves:
+        cache.delete_many(*claves)
+
+
+def notificar(tipo: str, datos: dict, emitido_en: datetime = None):
+    """
+    Consumidor 'notificaciones': Telegram y correos derivados del ciclo de vida de la reserva.
+    """
+    # Importación local para evitar Circular Imports (tasks importa servicios)
+    from app.tasks import (enviar_contrato_background, notificar_arrepentimiento_async,
+                           notificar_nueva_reserva_async, tarea_enviar_reintegro_async)
+
+    if tipo == 'reserva.comprobante_procesado':
+        notificar_nueva_reserva_async(datos['reserva_id'])
+
+    elif tipo == 'reserva.confirmada' or (tipo == 'reserva.creada' and datos.get('estado') == 'confirmada'):
+        # El PDF y el SMTP son pesados: los delegamos al pool de Celery
+        enviar_contrato_background.delay(datos['reserva_id'])
+
+    elif tipo == 'reserva.cancelada' and datos.get('motivo') == 'arrepentimiento':
+        notificar_arrepentimiento_async(
+            nombre_cliente=datos.get('nombre_cliente', 'Cliente no registrado'),
+            fecha_evento=datos.get('fecha_evento', 'N/A'),
+            motivo=datos.get('detalle', '')
+        )
+
+    elif tipo == 'reserva.reintegro_pagado':
+        reserva = db.session.get(Reserva, datos['reserva_id'])
+        if reserva and reserva.usuario:
+            tarea_enviar_reintegro_async.delay(
+                to_email=reserva.usuario.correo,
+                user_name=reserva.usuario.nombre,
+                event_date=str(reserva.fecha.dia),
+                file_url=datos['comprobante_url'],
+                file_name=datos['file_name']
+            )
+
+
+def acumular_analytics(tipo: str, datos: dict, emitido_en: datetime = None):
+    """
+    Consumidor 'analytics': mantiene contadores mensuales en un hash de Redis
+    (analytics_resumen_YYYY-MM) sin recorrer las tablas.
+    """
+    mes = (emitido_en or datetime.utcnow()).strftime('%Y-%m')
+    clave = f"analytics_resumen_{mes}"
+
+    pipe = redis_client.pipeline(transaction=False)
+    if tipo.startswith('reserva.'):
+        pipe.hincrby(clave, tipo.replace('.', '_'), 1)
+    elif tipo == 'pago.registrado':
+        pipe.hincrby(clave, 'pagos_registrados', 1)
+        pipe.hincrbyfloat(clave, 'ingresos', float(datos.get('monto') or 0))
+    elif tipo == 'pago.eliminado':
+        pipe.hincrby(clave, 'pagos_eliminados', 1)
+        pipe.hincrbyfloat(clave, 'ingresos', -float(datos.get('monto') or 0))
+    pipe.execute()
+
+
+# Campos que viajan al panel de administración (sin datos personales)
+CAMPOS_DELTA_ADMIN = ('reserva_id', 'fecha_id', 'usuario_id', 'pago_id', 'estado', 'estado_anterior', 'motivo', 'monto')
+fecha_schema = FechaSchema()
+
+
+def difundir_cambios(tipo: str, datos: dict, emitido_en: datetime = None):
+    """
+    Consumidor 'tiempo_real': publica deltas compactos en los canales SSE.
+    El calendario público solo recibe el estado de la fecha afectada.
+    """
+    if tipo.startswith('reserva.') or tipo.startswith('fecha.'):
+        if tipo == 'fecha.eliminada':
+            sse_broker.publicar('calendario', 'fecha_eliminada', {'id': datos['fecha_id']})
+        elif datos.get('fecha_id'):
+            fecha = db.session.get(Fecha, datos['fecha_id'])
+            if fecha:
+                sse_broker.publicar('calendario', 'fecha', fecha_schema.dump(fecha))
+
+    delta = {campo: datos[campo] for campo in CAMPOS_DELTA_ADMIN if campo in datos}
+    delta['tipo'] = tipo
+    sse_broker.publicar('admin', tipo.split('.')[0], delta)
+
+
+# Grupo de consumidores -> función manejadora
+CONSUMIDORES = {
+    'cache': invalidar_cache,
+    'notificaciones': notificar,
+    'analytics': acumular_analytics,
+    'tiempo_real': difundir_cambios,
+}
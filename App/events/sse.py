@@ -0,0 +1,142 @@
+import json
+import secrets
+import threading
+import time
+
+from app.extensions import redis_client
+
+
+class SSEBroker:
+    """
+    Difusión de cambios en tiempo real para Server-Sent Events.
+    Cada canal tiene un stream acotado en Redis (historial para reanudar con
+    Last-Event-ID) y un canal pub/sub para despertar a los clientes conectados.
+    """
+    CANALES = ('calendario', 'admin')
+    HISTORIAL_MAXLEN = 1000
+    HEARTBEAT_SEGUNDOS = 15
+    # Las conexiones se cierran solas: el navegador reconecta enviando Last-Event-ID
+    DURACION_MAXIMA_SEGUNDOS = 55
+    RETRY_MS = 3000
+    # Los tickets de /stream/admin valen para una sola conexión y duran poco:
+    # viajan en la URL (EventSource no manda cabeceras) y quedan en los logs de acceso
+    TICKET_TTL_SEGUNDOS = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conexiones = 0
+
+    def reservar_conexion(self, maximo: int) -> bool:
+        """
+        Ocupa un lugar de stream en este proceso si quedan (ver streams_por_worker).
+        """
+        with self._lock:
+            if self.conexiones >= maximo:
+                return False
+            self.conexiones += 1
+            return True
+
+    def liberar_conexion(self):
+        with self._lock:
+            self.conexiones -= 1
+
+    @staticmethod
+    def _ticket_key(ticket: str) -> str:
+        return f"sse_ticket:{ticket}"
+
+    def emitir_ticket(self, canal: str, identidad: str) -> str:
+        """
+        Ticket de un solo uso para abrir un stream de `canal` sin poner el JWT en la URL.
+        """
+        ticket = secrets.token_urlsafe(32)
+        redis_client.set(self._ticket_key(ticket), json.dumps({'canal': canal, 'identidad': identidad}),
+                         ex=self.TICKET_TTL_SEGUNDOS)
+        return ticket
+
+    def canjear_ticket(self, canal: str, ticket: str) -> str | None:
+        """
+        Consume el ticket (GETDEL: no sirve dos veces) y devuelve la identidad si era para `canal`.
+        """
+        if not ticket:
+            return None
+        crudo = redis_client.getdel(self._ticket_key(ticket))
+        if not crudo:
+            return None
+        datos = json.loads(crudo)
+        return datos['identidad'] if datos.get('canal') == canal else None
+
+    @staticmethod
+    def _stream_key(canal: str) -> str:
+        return f"sse_{canal}"
+
+    @staticmethod
+    def _id_a_tupla(stream_id: str) -> tuple[int, int]:
+        ms, _, seq = stream_id.partition('-')
+        return int(ms), int(seq or 0)
+
+    def publicar(self, canal: str, evento: str, datos: dict) -> str:
+        """
+        Guarda el delta en el historial del canal y lo difunde por pub/sub.
+        """
+        payload = json.dumps(datos, default=str, separators=(',', ':'))
+        stream_id = redis_client.xadd(
+            self._stream_key(canal),
+            {'evento': evento, 'datos': payload},
+            maxlen=self.HISTORIAL_MAXLEN,
+            approximate=True
+        )
+        redis_client.publish(self._stream_key(canal), json.dumps({'id': stream_id, 'evento': evento, 'datos': payload}))
+        return stream_id
+
+    def historial(self, canal: str, desde_id: str) -> list[tuple[str, str, str]]:
+        """
+        Devuelve los deltas posteriores a desde_id como (id, evento, datos).
+        """
+        entradas = redis_client.xrange(self._stream_key(canal), min=f"({desde_id}", max='+', count=self.HISTORIAL_MAXLEN)
+        return [(entrada_id, campos['evento'], campos['datos']) for entrada_id, campos in entradas]
+
+    @staticmethod
+    def formatear(stream_id: str, evento: str, datos: str) -> str:
+        return f"id: {stream_id}\nevent: {evento}\ndata: {datos}\n\n"
+
+    def escuchar(self, canal: str, last_event_id: str = None):
+        """
+        Generador de texto SSE: reenvía lo perdido desde last_event_id y luego los cambios en vivo.
+        """
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        # Nos suscribimos antes de leer el historial para no perder nada entre ambos pasos
+        pubsub.subscribe(self._stream_key(canal))
+        try:
+            yield f"retry: {self.RETRY_MS}\n\n"
+
+            ultimo_enviado = None
+            if last_event_id:
+                try:
+                    pendientes = self.historial(canal, last_event_id)
+                except Exception:
+                    # Last-Event-ID inválido o recortado: el cliente debe refrescar completo
+                    pendientes = []
+                    yield "event: resync\ndata: {}\n\n"
+                if len(pendientes) >= self.HISTORIAL_MAXLEN:
+                    # Se perdieron más cambios de los que guarda el historial
+                    yield "event: resync\ndata: {}\n\n"
+                for stream_id, evento, datos in pendientes:
+                    ultimo_enviado = self._id_a_tupla(stream_id)
+                    yield self.formatear(stream_id, evento, datos)
+
+            limite = time.monotonic() + self.DURACION_MAXIMA_SEGUNDOS
+            while time.monotonic() < limite:
+                mensaje = pubsub.get_message(timeout=self.HEARTBEAT_SEGUNDOS)
+                if not mensaje:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": ping\n\n"
+                    continue
+                delta = json.loads(mensaje['data'])
+                if ultimo_enviado and self._id_a_tupla(delta['id']) <= ultimo_enviado:
+                    continue  # Ya enviado desde el historial
+                yield self.formatear(delta['id'], delta['evento'], delta['datos'])
+        finally:
+            pubsub.close()
+
+
+sse_broker = SSEBroker()
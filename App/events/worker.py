@@ -0,0 +1,173 @@
+"""
+Proceso consumidor del bus de eventos de dominio.
+
+Uso:
+    python -m app.events.worker                      # todos los grupos
+    python -m app.events.worker cache notificaciones # solo algunos grupos
+"""
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+
+import redis
+import sentry_sdk
+
+from app.events.bus import EventBus
+from app.events.consumers import CONSUMIDORES
+from app.extensions import db, redis_client
+from app.utils.telemetria import span_consumidor
+
+
+class EventConsumer:
+    """
+    Lee el stream con XREADGROUP dentro de un grupo de consumidores y confirma
+    con XACK cada evento procesado. Los que fallan quedan pendientes y se
+    reintentan hasta MAX_REINTENTOS.
+
+    Los pendientes se reclaman con XAUTOCLAIM sin importar de qué consumidor son:
+    el nombre cambia con cada reinicio (pid), así que lo que quedó sin confirmar
+    en un proceso caído o redesplegado lo retoma cualquier otro. Los consumidores
+    sin pendientes y sin actividad se borran del grupo.
+    """
+    BLOCK_MS = 5000
+    BATCH_SIZE = 50
+    MAX_REINTENTOS = 5
+    REINTENTO_SEGUNDOS = 60
+    # Un pendiente se reclama cuando nadie lo tocó en este tiempo (más que cualquier manejador)
+    RECLAMO_INACTIVO_MS = 120_000
+    MAX_RECLAMOS_POR_CICLO = 10
+    CONSUMIDOR_INACTIVO_MS = 3_600_000
+
+    def __init__(self, app, grupo: str, manejador, nombre: str = None):
+        self.app = app
+        self.grupo = grupo
+        self.manejador = manejador
+        self.nombre = nombre or os.getenv('EVENTOS_CONSUMIDOR') or f"{socket.gethostname()}-{os.getpid()}"
+        self.stream = EventBus.STREAM_KEY
+        self._activo = True
+
+    def asegurar_grupo(self):
+        try:
+            # '$': el grupo arranca con los eventos nuevos, no reprocesa el historial
+            redis_client.xgroup_create(self.stream, self.grupo, id='$', mkstream=True)
+        except redis.exceptions.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def detener(self):
+        self._activo = False
+
+    def _procesar(self, entradas):
+        for entrada_id, campos in entradas:
+            if not campos:
+                # La entrada fue recortada del stream (MAXLEN) mientras estaba pendiente
+                redis_client.xack(self.stream, self.grupo, entrada_id)
+                continue
+            tipo, datos = EventBus.decodificar(campos)
+            emitido_en = datetime.fromisoformat(campos['emitido_en']) if campos.get('emitido_en') else None
+            try:
+                # Continúa la traza de quien emitió el evento (traceparent de la entrada)
+                with span_consumidor(f"{self.grupo} {tipo}", campos):
+                    self.manejador(tipo, datos, emitido_en)
+                redis_client.xack(self.stream, self.grupo, entrada_id)
+            except Exception as e:
+                db.session.rollback()
+                sentry_sdk.capture_exception(e)
+                print(f"Error en consumidor '{self.grupo}' procesando {tipo} ({entrada_id}): {e}")
+            finally:
+                db.session.remove()
+
+    def _descartar_envenenados(self):
+        # De todo el grupo: también los que quedaron en consumidores caídos
+        pendientes = redis_client.xpending_range(
+            self.stream, self.grupo, min='-', max='+',
+            count=self.BATCH_SIZE, idle=self.RECLAMO_INACTIVO_MS
+        )
+        for pendiente in pendientes:
+            if pendiente['times_delivered'] >= self.MAX_REINTENTOS:
+                redis_client.xack(self.stream, self.grupo, pendiente['message_id'])
+                sentry_sdk.capture_message(
+                    f"Evento {pendiente['message_id']} descartado por el consumidor '{self.grupo}' "
+                    f"tras {pendiente['times_delivered']} intentos."
+                )
+
+    def _reclamar_pendientes(self):
+        """
+        XAUTOCLAIM de los pendientes inactivos de cualquier consumidor (incluido este,
+        para los que fallaron) y los procesa. Cada reclamo cuenta como una entrega.
+        """
+        inicio = '0-0'
+        for _ in range(self.MAX_RECLAMOS_POR_CICLO):
+            respuesta = redis_client.xautoclaim(
+                self.stream, self.grupo, self.nombre, self.RECLAMO_INACTIVO_MS,
+                start_id=inicio, count=self.BATCH_SIZE
+            )
+            inicio, entradas = respuesta[0], respuesta[1]
+            self._procesar(entradas)
+            if inicio in ('0-0', b'0-0'):
+                break
+
+    def _borrar_consumidores_inactivos(self):
+        for consumidor in redis_client.xinfo_consumers(self.stream, self.grupo):
+            if (consumidor['name'] != self.nombre and consumidor['pending'] == 0
+                    and consumidor['idle'] >= self.CONSUMIDOR_INACTIVO_MS):
+                redis_client.xgroup_delconsumer(self.stream, self.grupo, consumidor['name'])
+
+    def _reintentar_pendientes(self):
+        self._descartar_envenenados()
+        self._reclamar_pendientes()
+        self._borrar_consumidores_inactivos()
+
+    def run(self):
+        with self.app.app_context():
+            self.asegurar_grupo()
+            ultimo_reintento = 0.0
+            while self._activo:
+                try:
+                    if time.monotonic() - ultimo_reintento >= self.REINTENTO_SEGUNDOS:
+                        self._reintentar_pendientes()
+                        ultimo_reintento = time.monotonic()
+
+                    respuesta = redis_client.xreadgroup(
+                        self.grupo, self.nombre, {self.stream: '>'},
+                        count=self.BATCH_SIZE, block=self.BLOCK_MS
+                    )
+                    for _, entradas in respuesta or []:
+                        self._procesar(entradas)
+                except redis.exceptions.ConnectionError as e:
+                    print(f"Consumidor '{self.grupo}' sin conexión a Redis: {e}. Reintentando...")
+                    time.sleep(2)
+
+
+def main(grupos=None):
+    from flask import Config
+
+    from app import create_app
+    from app.config import factory
+    from app.utils.telemetria import iniciar_telemetria
+
+    # Antes de create_app, que ya no lo rearma: los spans del consumidor salen como salon-eventos
+    config = Config(os.path.dirname(__file__))
+    config.from_object(factory(os.getenv('FLASK_ENV')))
+    iniciar_telemetria(config, servicio=os.getenv('OTEL_SERVICIO_EVENTOS', 'salon-eventos'))
+
+    app = create_app(os.getenv('FLASK_ENV'))
+    grupos = grupos or list(CONSUMIDORES)
+
+    hilos = []
+    for grupo in grupos:
+        consumidor = EventConsumer(app, grupo, CONSUMIDORES[grupo])
+        hilo = threading.Thread(target=consumidor.run, name=f"eventos-{grupo}", daemon=True)
+        hilo.start()
+        hilos.append(hilo)
+        print(f"Consumidor de eventos '{grupo}' iniciado ({consumidor.nombre}).")
+
+    for hilo in hilos:
+        hilo.join()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
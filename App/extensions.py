@@ -7,11 +7,13 @@ from flask_caching import Cache
 from flask_jwt_extended import JWTManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 cache = Cache()
 jwt = JWTManager()
+migrate = Migrate()
 redis_host = os.getenv('REDIS_HOST', 'localhost')
 redis_port = int(os.getenv('REDIS_PORT', 6379))
 redis_password = os.getenv('REDIS_PASSWORD', '')
@@ -25,7 +27,9 @@ redis_client = redis.StrictRedis(
     decode_responses=True
 )
 
-redis_uri = f"redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}"
+# Bases lógicas separadas: 0 app (locks, streams, SSE), 1 caché, 2 limiter, 3 broker, 4 resultados
+limiter_db = int(os.getenv('RATELIMIT_REDIS_DB', 2))
+redis_uri = f"redis://:{redis_password}@{redis_host}:{redis_port}/{limiter_db}"
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["50 per minute"],
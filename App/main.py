@@ -1,41 +1,57 @@
 import os
+import sys
 
-from app import create_app, db
+# Nada de `app.*` a nivel de módulo: importar el paquete trae sentry_sdk/ssl, redis y
+# SQLAlchemy, que con gevent tienen que cargarse después del monkey-patch.
 
-# Crear la aplicación
-app = create_app()
-app.app_context().push()
 
-# Crear las tablas de la base de datos si no existen
-with app.app_context():
-    db.create_all()
+def crear_app():
+    from app import create_app
+    return create_app()
+
+
+def aplicar_migraciones():
+    """
+    Aplica las migraciones pendientes y termina. Corre como paso propio del
+    despliegue (servicio `migraciones` del compose), no en cada arranque del servidor.
+    """
+    from flask_migrate import upgrade
+
+    app = crear_app()
+    with app.app_context():
+        upgrade()
+
+
+def servir_produccion(env: str):
+    """
+    Gunicorn con la clase de worker, workers y timeouts de GUNICORN_*.
+    """
+    if os.getenv('GUNICORN_WORKER_CLASS', 'gthread') == 'gevent':
+        # El master también importa la app (servidor, config): se parchea antes que nada
+        # para que ssl, los sockets de Redis/psycopg2 y los locks sean cooperativos
+        from gevent import monkey
+        monkey.patch_all()
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+    from app.config import factory
+    from app.servidor import GunicornApp, opciones_gunicorn
+
+    # Con preload la app se crea una vez en el master y se hereda por fork; sin preload
+    # (gevent por defecto) cada worker la crea al cargar
+    GunicornApp(crear_app, opciones_gunicorn(factory(env))).run()
+
 
 # Configurar ejecución según el entorno
 if __name__ == "__main__":
+    if sys.argv[1:] == ["migrar"]:
+        aplicar_migraciones()
+        sys.exit(0)
+
     env = os.getenv("FLASK_ENV", "development")
     if env == "production":
-        # Usar Gunicorn en producción
-        from gunicorn.app.base import BaseApplication
-
-        class GunicornApp(BaseApplication):
-            def __init__(self, app, options=None):
-                self.options = options or {}
-                self.application = app
-                super().__init__()
-
-            def load_config(self):
-                config = {key: value for key, value in self.options.items() if key in self.cfg.settings and value is not None}
-                for key, value in config.items():
-                    self.cfg.set(key.lower(), value)
-
-            def load(self):
-                return self.application
-
-        options = {
-            "bind": "0.0.0.0:5000",
-            "workers": 3,  # Número de workers para manejar carga
-        }
-        GunicornApp(app, options).run()
+        servir_produccion(env)
     else:
-        # Usar servidor Flask en desarrollo
+        # Usar servidor Flask en desarrollo (migraciones: python app/main.py migrar)
+        app = crear_app()
         app.run(host="0.0.0.0", port=5000, debug=True)
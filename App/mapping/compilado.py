@@ -0,0 +1,98 @@
+from collections.abc import Mapping
+
+from marshmallow import fields
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.utils import missing
+
+
+def _fecha_iso(valor):
+    return valor.isoformat()
+
+
+def _conversor(campo):
+    """
+    Conversión directa para los tipos de campo que usan nuestros schemas.
+    Devuelve None si el campo necesita la ruta genérica de Marshmallow.
+    """
+    tipo = type(campo)
+    if tipo in (fields.String, fields.Email):
+        return str
+    if tipo is fields.Integer:
+        return None if campo.as_string else int
+    if tipo is fields.Float:
+        return None if campo.as_string else float
+    if tipo is fields.Boolean:
+        return bool
+    if tipo in (fields.DateTime, fields.Date):
+        return _fecha_iso if campo.format in (None, 'iso') else None
+    if tipo is fields.Time:
+        if campo.format in (None, 'iso'):
+            return _fecha_iso
+        formato = campo.format
+        return lambda valor: valor.strftime(formato)
+    if tipo is fields.Nested:
+        schema = campo.schema
+        if schema._has_processors(PRE_DUMP) or schema._has_processors(POST_DUMP):
+            return None
+        return compilar_dump(schema)
+    return None
+
+
+def compilar_dump(schema):
+    """
+    Genera (con exec) una función obj -> dict equivalente a schema.dump(obj)
+    para objetos (no dicts): los campos, llaves de salida y conversiones se
+    resuelven una sola vez y quedan escritos en línea. Los campos sin conversión
+    directa se serializan con el propio campo de Marshmallow.
+    """
+    entorno = {'_missing': missing, '_accessor': schema.get_attribute}
+    lineas = ['def dump_uno(obj):', '    r = {}']
+    for i, (nombre, campo) in enumerate(schema.dump_fields.items()):
+        atributo = campo.attribute or nombre
+        llave = campo.data_key if campo.data_key is not None else nombre
+        # Atributos con puntos ('usuario.nombre') los resuelve el accessor de Marshmallow
+        conversor = None if '.' in atributo else _conversor(campo)
+
+        if conversor is None:
+            entorno[f'_campo{i}'] = campo
+            lineas += [
+                f'    v = _campo{i}.serialize({atributo!r}, obj, accessor=_accessor)',
+                f'    if v is not _missing: r[{llave!r}] = v',
+            ]
+            continue
+
+        entorno[f'_conv{i}'] = conversor
+        if isinstance(campo, fields.Nested) and campo.many:
+            valor = f'None if v is None else [_conv{i}(x) for x in v]'
+        else:
+            valor = f'None if v is None else _conv{i}(v)'
+        lineas += [
+            f'    v = getattr(obj, {atributo!r}, _missing)',
+            f'    if v is not _missing: r[{llave!r}] = {valor}',
+        ]
+    lineas.append('    return r')
+
+    exec('\n'.join(lineas), entorno)
+    return entorno['dump_uno']
+
+
+class DumpCompiladoMixin:
+    """
+    Reemplaza schema.dump por una función precompilada la primera vez que se usa.
+    Mantiene la ruta de Marshmallow para dicts y para schemas con hooks de dump.
+    """
+
+    def dump(self, obj, *, many=None):
+        many = self.many if many is None else bool(many)
+        if self._has_processors(PRE_DUMP) or self._has_processors(POST_DUMP):
+            return super().dump(obj, many=many)
+
+        dump_uno = self.__dict__.get('_dump_compilado')
+        if dump_uno is None:
+            dump_uno = self._dump_compilado = compilar_dump(self)
+
+        if many:
+            return [super(DumpCompiladoMixin, self).dump(o) if isinstance(o, Mapping) else dump_uno(o) for o in obj]
+        if isinstance(obj, Mapping):
+            return super().dump(obj)
+        return dump_uno(obj)
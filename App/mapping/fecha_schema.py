@@ -1,9 +1,10 @@
 from marshmallow import Schema, fields, post_load, validate
 
+from app.mapping.compilado import DumpCompiladoMixin
 from app.models import Fecha
 
 
-class FechaSchema(Schema):
+class FechaSchema(DumpCompiladoMixin, Schema):
     id = fields.Int(dump_only=True)
     dia = fields.Date(required=True)
     estado = fields.Str(dump_only=True) 
@@ -1,9 +1,10 @@
 from marshmallow import Schema, fields, post_load, validate
 
+from app.mapping.compilado import DumpCompiladoMixin
 from app.models import Gasto
 
 
-class GastoSchema(Schema):
+class GastoSchema(DumpCompiladoMixin, Schema):
     id = fields.Int(dump_only=True)
     descripcion = fields.Str(required=True, validate=validate.Length(min=3))
     monto = fields.Float(required=True, validate=validate.Range(min=0.01))
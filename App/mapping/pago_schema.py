@@ -1,9 +1,10 @@
 from marshmallow import Schema, fields, post_load
 
+from app.mapping.compilado import DumpCompiladoMixin
 from app.models import Pago
 
 
-class PagoSchema(Schema):
+class PagoSchema(DumpCompiladoMixin, Schema):
     id = fields.Int(dump_only=True)
     monto = fields.Float(required=True)
     fecha_pago = fields.DateTime(dump_only=True)
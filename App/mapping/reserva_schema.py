@@ -1,9 +1,10 @@
 from marshmallow import Schema, fields, post_load, validate
 
+from app.mapping.compilado import DumpCompiladoMixin
 from app.models import Reserva
 
 
-class ReservaSchema(Schema):
+class ReservaSchema(DumpCompiladoMixin, Schema):
     id = fields.Int(dump_only=True)
     fecha_creacion = fields.DateTime(dump_only=True)
     estado = fields.Str()
@@ -1,9 +1,10 @@
 from marshmallow import Schema, fields, post_load, validate
 
+from app.mapping.compilado import DumpCompiladoMixin
 from app.models import Usuario
 
 
-class UsuarioSchema(Schema):
+class UsuarioSchema(DumpCompiladoMixin, Schema):
     id = fields.Int(dump_only=True)
     apellido = fields.Str(required=True, validate=validate.Length(min=1))
     correo = fields.Email(required=True)
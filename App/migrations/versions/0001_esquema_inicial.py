@@ -0,0 +1,122 @@
+"""esquema inicial (el que generaba db.create_all())
+
+Revision ID: 0001_esquema_inicial
+Revises: 
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_esquema_inicial'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Las bases existentes se crearon con db.create_all(): las adoptamos tal cual
+    if sa.inspect(op.get_bind()).has_table('persona'):
+        return
+
+    op.create_table('persona',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('apellido', sa.String(), nullable=False),
+        sa.Column('correo', sa.String(), nullable=False),
+        sa.Column('dni', sa.Integer(), nullable=False),
+        sa.Column('nombre', sa.String(), nullable=False),
+        sa.Column('telefono', sa.String(length=50), nullable=True),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('activo', sa.Boolean(), nullable=False),
+        sa.Column('consentimiento_datos', sa.Boolean(), nullable=False),
+        sa.Column('fecha_consentimiento', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('correo'),
+        sa.UniqueConstraint('dni')
+    )
+    op.create_index('ix_persona_apellido', 'persona', ['apellido'], unique=False)
+    op.create_index('ix_persona_nombre', 'persona', ['nombre'], unique=False)
+
+    op.create_table('administrador',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['id'], ['persona.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('usuario',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['id'], ['persona.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table('fecha',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('valor_estimado', sa.Float(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuario.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dia')
+    )
+    op.create_index('idx_fecha_dia', 'fecha', ['dia'], unique=False)
+    op.create_index('idx_fecha_estado_dia', 'fecha', ['estado', 'dia'], unique=False)
+
+    op.create_table('gasto',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('descripcion', sa.String(length=200), nullable=False),
+        sa.Column('monto', sa.Float(), nullable=False),
+        sa.Column('categoria', sa.String(length=50), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table('reserva',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=False),
+        sa.Column('fecha_vencimiento', sa.DateTime(), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('comprobante_url', sa.String(length=256), nullable=True),
+        sa.Column('valor_alquiler', sa.Float(), nullable=True),
+        sa.Column('ip_aceptacion', sa.String(length=45), nullable=True),
+        sa.Column('fecha_aceptacion', sa.DateTime(), nullable=True),
+        sa.Column('version_contrato', sa.String(length=50), nullable=True),
+        sa.Column('cantidad_personas', sa.Integer(), nullable=True),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('fecha_id', sa.Integer(), nullable=False),
+        sa.Column('hora_inicio', sa.Time(), nullable=True),
+        sa.Column('hora_fin', sa.Time(), nullable=True),
+        sa.Column('observaciones', sa.Text(), nullable=True),
+        sa.Column('requiere_reintegro', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['fecha_id'], ['fecha.id']),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuario.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_reserva_estado', 'reserva', ['estado'], unique=False)
+    op.create_index('idx_reserva_fecha_id', 'reserva', ['fecha_id'], unique=False)
+    op.create_index('idx_reserva_usuario_id', 'reserva', ['usuario_id'], unique=False)
+    op.create_index('ix_reserva_estado', 'reserva', ['estado'], unique=False)
+    op.create_index('ix_reserva_fecha_id', 'reserva', ['fecha_id'], unique=False)
+    op.create_index('ix_reserva_usuario_id', 'reserva', ['usuario_id'], unique=False)
+
+    op.create_table('pago',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('monto', sa.Float(), nullable=False),
+        sa.Column('fecha_pago', sa.DateTime(), nullable=False),
+        sa.Column('reserva_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['reserva_id'], ['reserva.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_pago_reserva_id', 'pago', ['reserva_id'], unique=False)
+
+
+def downgrade():
+    op.drop_table('pago')
+    op.drop_table('reserva')
+    op.drop_table('gasto')
+    op.drop_table('fecha')
+    op.drop_table('usuario')
+    op.drop_table('administrador')
+    op.drop_table('persona')
@@ -0,0 +1,51 @@
+"""updated_at para sincronización incremental y registro de eliminaciones
+
+Revision ID: 0002_updated_at_y_eliminaciones
+Revises: 0001_esquema_inicial
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_updated_at_y_eliminaciones'
+down_revision = '0001_esquema_inicial'
+branch_labels = None
+depends_on = None
+
+TABLAS = ('reserva', 'fecha', 'pago', 'gasto')
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    for tabla in TABLAS:
+        columnas = {columna['name'] for columna in inspector.get_columns(tabla)}
+        if 'updated_at' not in columnas:
+            # server_default rellena las filas existentes; el ORM mantiene el valor después
+            op.add_column(tabla, sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                           server_default=sa.text("(now() at time zone 'utc')")))
+            op.alter_column(tabla, 'updated_at', server_default=None)
+        indices = {indice['name'] for indice in inspector.get_indexes(tabla)}
+        if f'idx_{tabla}_updated_at' not in indices:
+            op.create_index(f'idx_{tabla}_updated_at', tabla, ['updated_at'], unique=False)
+
+    if not inspector.has_table('registro_eliminacion'):
+        op.create_table('registro_eliminacion',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('entidad', sa.String(length=30), nullable=False),
+            sa.Column('entidad_id', sa.Integer(), nullable=False),
+            sa.Column('eliminado_en', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('idx_registro_eliminacion_eliminado_en', 'registro_eliminacion', ['eliminado_en'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_registro_eliminacion_eliminado_en', table_name='registro_eliminacion')
+    op.drop_table('registro_eliminacion')
+    for tabla in TABLAS:
+        op.drop_index(f'idx_{tabla}_updated_at', table_name=tabla)
+        op.drop_column(tabla, 'updated_at')
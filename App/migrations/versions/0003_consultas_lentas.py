@@ -0,0 +1,42 @@
+"""registro de consultas lentas con su plan de ejecución
+
+Revision ID: 0003_consultas_lentas
+Revises: 0002_updated_at_y_eliminaciones
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_consultas_lentas'
+down_revision = '0002_updated_at_y_eliminaciones'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('consulta_lenta'):
+        return
+
+    op.create_table('consulta_lenta',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('registrada_en', sa.DateTime(), nullable=False),
+        sa.Column('origen', sa.String(length=200), nullable=False),
+        sa.Column('huella', sa.String(length=16), nullable=False),
+        sa.Column('sentencia', sa.Text(), nullable=False),
+        sa.Column('parametros', sa.Text(), nullable=True),
+        sa.Column('duracion_ms', sa.Float(), nullable=False),
+        sa.Column('plan', sa.Text(), nullable=True),
+        sa.Column('plan_capturado_en', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_consulta_lenta_huella_registrada_en', 'consulta_lenta', ['huella', 'registrada_en'], unique=False)
+    op.create_index('idx_consulta_lenta_registrada_en', 'consulta_lenta', ['registrada_en'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_consulta_lenta_registrada_en', table_name='consulta_lenta')
+    op.drop_index('idx_consulta_lenta_huella_registrada_en', table_name='consulta_lenta')
+    op.drop_table('consulta_lenta')
@@ -1,7 +1,9 @@
 from .administrador import Administrador
+from .consulta_lenta import ConsultaLenta
 from .fecha import Fecha
 from .gasto import Gasto
 from .pago import Pago
 from .persona import Persona
+from .registro_eliminacion import RegistroEliminacion
 from .reserva import Reserva
 from .usuario import Usuario
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.extensions import db
+
+
+@dataclass
+class ConsultaLenta(db.Model):
+    """
+    Sentencia SQL que superó SQL_LENTA_UMBRAL_MS, con la ruta o tarea que la ejecutó.
+    `plan` es el EXPLAIN (ANALYZE, BUFFERS) capturado por el worker para una muestra.
+    """
+    __tablename__ = 'consulta_lenta'
+    __table_args__ = (
+        db.Index('idx_consulta_lenta_huella_registrada_en', 'huella', 'registrada_en'),
+        db.Index('idx_consulta_lenta_registrada_en', 'registrada_en'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    registrada_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    origen = db.Column(db.String(200), nullable=False)  # 'GET /api/v1/reserva' o el nombre de la tarea
+    huella = db.Column(db.String(16), nullable=False)  # blake2b de la sentencia normalizada
+    sentencia = db.Column(db.Text, nullable=False)
+    parametros = db.Column(db.Text, nullable=True)  # JSON, con los valores sensibles ocultos
+    duracion_ms = db.Column(db.Float, nullable=False)
+    plan = db.Column(db.Text, nullable=True)
+    plan_capturado_en = db.Column(db.DateTime, nullable=True)
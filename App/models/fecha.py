@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from datetime import datetime
 
 from app.extensions import db
 
@@ -10,6 +11,7 @@ class Fecha(db.Model):
     __table_args__ = (
         db.Index('idx_fecha_dia', 'dia'),               # búsqueda por día exacto
         db.Index('idx_fecha_estado_dia', 'estado', 'dia'),  # filtrar disponibles + ordenar
+        db.Index('idx_fecha_updated_at', 'updated_at'),     # sincronización incremental
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -18,5 +20,6 @@ class Fecha(db.Model):
     valor_estimado = db.Column(db.Float, nullable=False, default=0.0)
 
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     reserva = db.relationship('Reserva', back_populates='fecha', uselist=False, lazy='select')
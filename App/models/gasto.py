@@ -7,9 +7,13 @@ from app.extensions import db
 @dataclass
 class Gasto(db.Model):
     __tablename__ = 'gasto'
+    __table_args__ = (
+        db.Index('idx_gasto_updated_at', 'updated_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     descripcion = db.Column(db.String(200), nullable=False)
     monto = db.Column(db.Float, nullable=False)
     categoria = db.Column(db.String(50), nullable=False) # 'Servicios', 'Insumos', 'Otros'
-    fecha = db.Column(db.Date, nullable=False, default=datetime.utcnow)
\ No newline at end of file
+    fecha = db.Column(db.Date, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
 
+from sqlalchemy import event
+
 from app.extensions import db
 
 
@@ -9,12 +11,28 @@ class Pago(db.Model):
     __tablename__ = 'pago'
     __table_args__ = (
         db.Index('idx_pago_reserva_id', 'reserva_id'), 
+        db.Index('idx_pago_updated_at', 'updated_at'),
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     monto = db.Column(db.Float, nullable=False)
     fecha_pago = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relación con Reserva
     reserva_id = db.Column(db.Integer, db.ForeignKey('reserva.id'), nullable=False)
-    reserva = db.relationship('Reserva', back_populates='pagos', lazy='select')
\ No newline at end of file
+    reserva = db.relationship('Reserva', back_populates='pagos', lazy='select')
+
+def _tocar_reserva(mapper, connection, target):
+    # saldo_restante y los pagos anidados son parte de la reserva: /sync tiene que volver
+    # a mandarla. Misma transacción que el INSERT/UPDATE/DELETE del pago.
+    from .reserva import Reserva
+    connection.execute(
+        Reserva.__table__.update()
+        .where(Reserva.__table__.c.id == target.reserva_id)
+        .values(updated_at=datetime.utcnow())
+    )
+
+
+for _evento in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Pago, _evento, _tocar_reserva)
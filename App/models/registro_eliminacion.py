@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.extensions import db
+
+from .fecha import Fecha
+from .gasto import Gasto
+from .pago import Pago
+from .reserva import Reserva
+
+
+@dataclass
+class RegistroEliminacion(db.Model):
+    """
+    Lápida de las filas borradas físicamente, para que los clientes
+    sincronizados sepan qué IDs quitar de su copia local.
+    """
+    __tablename__ = 'registro_eliminacion'
+    __table_args__ = (
+        db.Index('idx_registro_eliminacion_eliminado_en', 'eliminado_en'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    entidad = db.Column(db.String(30), nullable=False)  # 'reserva', 'fecha', 'pago', 'gasto'
+    entidad_id = db.Column(db.Integer, nullable=False)
+    eliminado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+def _registrar_eliminacion(mapper, connection, target):
+    # Se inserta dentro de la misma transacción que el DELETE
+    connection.execute(
+        RegistroEliminacion.__table__.insert().values(
+            entidad=target.__tablename__,
+            entidad_id=target.id,
+            eliminado_en=datetime.utcnow()
+        )
+    )
+
+
+for _modelo in (Reserva, Fecha, Pago, Gasto):
+    event.listen(_modelo, 'after_delete', _registrar_eliminacion)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from sqlalchemy import select, func # para el SUM en db
+from sqlalchemy import func, inspect, select  # para el SUM en db
 
 from app.extensions import db
 
@@ -13,6 +13,7 @@ class Reserva(db.Model):
         db.Index('idx_reserva_fecha_id', 'fecha_id'),
         db.Index('idx_reserva_usuario_id', 'usuario_id'),
         db.Index('idx_reserva_estado', 'estado'),
+        db.Index('idx_reserva_updated_at', 'updated_at'),  # sincronización incremental
     )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -31,6 +32,7 @@ class Reserva(db.Model):
     hora_fin = db.Column(db.Time, nullable=True)
     observaciones = db.Column(db.Text, nullable=True)
     requiere_reintegro = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     usuario = db.relationship('Usuario', back_populates='reservas', lazy='select')
     fecha   = db.relationship('Fecha',   back_populates='reserva',  lazy='select')
     
@@ -38,6 +40,10 @@ class Reserva(db.Model):
 
     @property
     def saldo_restante(self):    #ahora hago un solo SELECT SUM 
+        # Si los pagos ya vinieron con la reserva (joinedload) se suman en memoria:
+        # un SELECT SUM por fila en un listado es un N+1
+        if 'pagos' not in inspect(self).unloaded:
+            return (self.valor_alquiler or 0) - sum(p.monto or 0 for p in self.pagos)
         from app.models.pago import Pago
         total_pagado = db.session.execute(
             select(func.coalesce(func.sum(Pago.monto), 0))
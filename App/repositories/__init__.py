@@ -1,5 +1,6 @@
 
 from .administrador_repository import AdministradorRepository
+from .consulta_lenta_repository import ConsultaLentaRepository
 from .fecha_repository import FechaRepository
 from .gasto_repository import GastoRepository
 from .pago_repository import PagoRepository
@@ -7,4 +8,5 @@ from .persona_repository import PersonaRepository
 from .repository import (Repository_add, Repository_delete, Repository_get,
                          Repository_update)
 from .reserva_repository import ReservaRepository
+from .sync_repository import SyncRepository
 from .usuario_repository import UsuarioRepository
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import case, func
+
+from app.extensions import db
+from app.models import ConsultaLenta
+
+
+class ConsultaLentaRepository:
+    """
+    Registro de consultas lentas y sus planes de ejecución.
+    """
+    def agregar(self, consulta: ConsultaLenta) -> ConsultaLenta:
+        db.session.add(consulta)
+        return consulta
+
+    def get_by_id(self, id: int) -> ConsultaLenta:
+        return db.session.get(ConsultaLenta, id)
+
+    def resumen_por_huella(self, desde: datetime, limite: int) -> list:
+        """
+        Una fila por consulta (huella) ordenadas por tiempo total: ejecuciones,
+        promedio y máximo, última vez vista y el último registro con plan.
+        """
+        total_ms = func.sum(ConsultaLenta.duracion_ms)
+        return db.session.query(
+            ConsultaLenta.huella,
+            func.count(ConsultaLenta.id).label('veces'),
+            total_ms.label('total_ms'),
+            func.avg(ConsultaLenta.duracion_ms).label('promedio_ms'),
+            func.max(ConsultaLenta.duracion_ms).label('maximo_ms'),
+            func.max(ConsultaLenta.registrada_en).label('ultima_vez'),
+            func.max(ConsultaLenta.id).label('ultimo_id'),
+            func.max(case((ConsultaLenta.plan.isnot(None), ConsultaLenta.id))).label('ultimo_plan_id'),
+        ).filter(
+            ConsultaLenta.registrada_en >= desde
+        ).group_by(ConsultaLenta.huella).order_by(total_ms.desc()).limit(limite).all()
+
+    def get_by_ids(self, ids: List[int]) -> List[ConsultaLenta]:
+        if not ids:
+            return []
+        return ConsultaLenta.query.filter(ConsultaLenta.id.in_(ids)).all()
+
+    def explicar(self, sentencia: str, parametros, timeout_ms: int, analizar: bool = True) -> str:
+        """
+        EXPLAIN (ANALYZE, BUFFERS) en una transacción aparte que siempre se deshace:
+        ANALYZE ejecuta la consulta, el statement_timeout acota cuánto puede tardar.
+        Sin `analizar` (sentencias que bloquean filas o escriben) solo el plan estimado.
+        """
+        with db.engine.connect() as conexion:
+            transaccion = conexion.begin()
+            try:
+                conexion.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+                if isinstance(parametros, list):
+                    parametros = tuple(parametros)
+                if not parametros:
+                    # Sin parámetros el driver no interpreta los '%%' que escapó SQLAlchemy
+                    sentencia, parametros = sentencia.replace('%%', '%'), None
+                opciones = "(ANALYZE, BUFFERS) " if analizar else ""
+                filas = conexion.exec_driver_sql(f"EXPLAIN {opciones}{sentencia}", parametros).all()
+                return "\n".join(fila[0] for fila in filas)
+            finally:
+                transaccion.rollback()
+
+    def purgar(self, antes_de: datetime) -> int:
+        return ConsultaLenta.query.filter(
+            ConsultaLenta.registrada_en < antes_de
+        ).delete(synchronize_session=False)
@@ -5,7 +5,7 @@ from app.extensions import db
 from app.models import Fecha
 
 from .repository import (Repository_add, Repository_delete, Repository_get,
-                         Repository_update)
+                         Repository_update, opciones_proyeccion)
 
 
 class FechaRepository(Repository_add, Repository_get, Repository_delete):
@@ -18,7 +18,9 @@ class FechaRepository(Repository_add, Repository_get, Repository_delete):
             db.session.rollback()  # Deshace la transacción si hay un error
             raise e  # Propaga la excepción para manejo externo
 
-    def get_all(self) -> List[Fecha]:
+    def get_all(self, campos=None) -> List[Fecha]:
+        if campos:
+            return Fecha.query.options(*opciones_proyeccion(Fecha, campos)).all()
         return Fecha.query.all()
 
     def get_by_id(self, id: int) -> Fecha:
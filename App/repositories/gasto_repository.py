@@ -3,7 +3,8 @@ from sqlalchemy import extract, func
 
 from app.extensions import db
 from app.models import Gasto
-from .repository import Repository_add, Repository_delete, Repository_get
+from .repository import (Repository_add, Repository_delete, Repository_get,
+                         opciones_proyeccion)
 
 class GastoRepository(Repository_add, Repository_get, Repository_delete):
     
@@ -12,8 +13,10 @@ class GastoRepository(Repository_add, Repository_get, Repository_delete):
         db.session.add(entity)
         return entity
 
-    def get_all(self, month=None, year=None) -> List[Gasto]:
+    def get_all(self, month=None, year=None, campos=None) -> List[Gasto]:
         query = Gasto.query
+        if campos:
+            query = query.options(*opciones_proyeccion(Gasto, campos))
         if year:
             query = query.filter(extract('year', Gasto.fecha) == year)
         if month:
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import List, TypeVar
 
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import joinedload, load_only
+
 from app.extensions import db
 
 T = TypeVar('T')
@@ -36,4 +39,36 @@ class Repository_delete(ABC):
     
     @abstractmethod 
     def delete(self, id) -> bool:
-        pass
\ No newline at end of file
+        pass
+
+def opciones_proyeccion(modelo, campos, dependencias=None) -> list:
+    """
+    Traduce una lista de campos (`?fields=`) a opciones de carga de SQLAlchemy:
+    load_only() con las columnas pedidas y joinedload() solo para las relaciones
+    pedidas. Admite un nivel de anidamiento ('usuario.nombre').
+    `dependencias` indica columnas o relaciones que necesita un campo calculado
+    (p. ej. saldo_restante -> valor_alquiler, pagos.monto).
+    """
+    mapper = sa_inspect(modelo)
+    columnas = {'id'}
+    relaciones = {}
+
+    dependencias = dependencias or {}
+    campos = list(campos) + [d for campo in campos for d in dependencias.get(campo.partition('.')[0], ())]
+    for campo in campos:
+        raiz, _, subcampo = campo.partition('.')
+        if raiz in mapper.relationships:
+            # '*': la relación se pidió entera, no se recorta aunque una dependencia pida una columna
+            relaciones.setdefault(raiz, set()).add(subcampo or '*')
+        elif raiz in mapper.column_attrs:
+            columnas.add(raiz)
+
+    opciones = [load_only(*[getattr(modelo, columna) for columna in columnas])]
+    for nombre, subcampos in relaciones.items():
+        relacionado = mapper.relationships[nombre].mapper
+        loader = joinedload(getattr(modelo, nombre))
+        if '*' not in subcampos:
+            sub_columnas = {'id'} | {c for c in subcampos if c in relacionado.column_attrs}
+            loader = loader.load_only(*[getattr(relacionado.class_, c) for c in sub_columnas])
+        opciones.append(loader)
+    return opciones
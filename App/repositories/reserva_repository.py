@@ -7,7 +7,10 @@ from app.models import (Fecha, Reserva,  # Asegurate de importar Fecha aquí
                         Usuario)
 
 from .repository import (Repository_add, Repository_delete, Repository_get,
-                         Repository_update)
+                         Repository_update, opciones_proyeccion)
+
+# Columnas que necesitan los campos calculados del schema
+DEPENDENCIAS_PROYECCION = {'saldo_restante': ('valor_alquiler', 'pagos.monto')}
 
 
 class ReservaRepository(Repository_add, Repository_get, Repository_delete):
@@ -42,14 +45,15 @@ class ReservaRepository(Repository_add, Repository_get, Repository_delete):
             return True
         return False
 
-    def get_all(self) -> List[Reserva]:
+    def get_all(self, campos=None) -> List[Reserva]:
         # Le decimos a la consulta que cargue las relaciones 'usuario', 'fecha' y 'pagos'
         # y que excluya las reservas archivadas.
-        return Reserva.query.options(
-            joinedload(Reserva.usuario),
-            joinedload(Reserva.fecha),
-            joinedload(Reserva.pagos) 
-        ).filter(Reserva.estado != 'archivada').all() 
+        # Con `campos` solo se leen esas columnas y se omiten los JOINs que no se usan.
+        if campos:
+            opciones = opciones_proyeccion(Reserva, campos, DEPENDENCIAS_PROYECCION)
+        else:
+            opciones = [joinedload(Reserva.usuario), joinedload(Reserva.fecha), joinedload(Reserva.pagos)]
+        return Reserva.query.options(*opciones).filter(Reserva.estado != 'archivada').all() 
 
     def get_by_user_id(self, user_id: int) -> List[Reserva]:
         # También excluimos las reservas archivadas de la vista del usuario.
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models import Fecha, Gasto, Pago, RegistroEliminacion, Reserva
+
+
+class SyncRepository:
+    """
+    Consultas de sincronización incremental basadas en updated_at (indexado).
+    """
+    def reservas_modificadas(self, desde: datetime = None) -> List[Reserva]:
+        query = Reserva.query.options(
+            joinedload(Reserva.usuario),
+            joinedload(Reserva.fecha),
+            joinedload(Reserva.pagos)
+        )
+        if desde:
+            query = query.filter(Reserva.updated_at >= desde)
+        return query.order_by(Reserva.updated_at).all()
+
+    def modificados(self, modelo, desde: datetime = None) -> list:
+        query = modelo.query
+        if desde:
+            query = query.filter(modelo.updated_at >= desde)
+        return query.order_by(modelo.updated_at).all()
+
+    def fechas_modificadas(self, desde: datetime = None) -> List[Fecha]:
+        return self.modificados(Fecha, desde)
+
+    def pagos_modificados(self, desde: datetime = None) -> List[Pago]:
+        return self.modificados(Pago, desde)
+
+    def gastos_modificados(self, desde: datetime = None) -> List[Gasto]:
+        return self.modificados(Gasto, desde)
+
+    def eliminados(self, desde: datetime) -> List[tuple]:
+        """
+        Devuelve (entidad, entidad_id) de las filas borradas físicamente desde la marca.
+        """
+        return db.session.query(
+            RegistroEliminacion.entidad, RegistroEliminacion.entidad_id
+        ).filter(RegistroEliminacion.eliminado_en >= desde).all()
+
+    def purgar_eliminados(self, antes_de: datetime) -> int:
+        return RegistroEliminacion.query.filter(
+            RegistroEliminacion.eliminado_en < antes_de
+        ).delete(synchronize_session=False)
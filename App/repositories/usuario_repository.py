@@ -3,7 +3,8 @@ from typing import List
 from app.extensions import db
 from app.models import Usuario
 
-from .repository import Repository_add, Repository_delete, Repository_get
+from .repository import (Repository_add, Repository_delete, Repository_get,
+                         opciones_proyeccion)
 
 
 class UsuarioRepository(Repository_add, Repository_get, Repository_delete):
@@ -13,8 +14,11 @@ class UsuarioRepository(Repository_add, Repository_get, Repository_delete):
         db.session.add(entity)  
         return entity
 
-    def get_all(self):
-        return Usuario.query.filter_by(activo=True).order_by(Usuario.id.desc()).limit(100).all()
+    def get_all(self, campos=None):
+        query = Usuario.query
+        if campos:
+            query = query.options(*opciones_proyeccion(Usuario, campos))
+        return query.filter_by(activo=True).order_by(Usuario.id.desc()).limit(100).all()
 
     def get_by_id(self, id: int) -> Usuario:
         return Usuario.query.get(id)
@@ -3,11 +3,15 @@ from app.routes.gasto_resource import GastoBP
 from .administrador_resource import Administrador
 from .analytics_resource import Analytics
 from .auth_resource import Auth
+from .cache_resource import CacheBP
 from .chatbot_resource import ChatbotBP
 from .config_resource import Config
+from .diagnostico_resource import Diagnostico
 from .fecha_resource import Fecha
 from .pago_resource import Pago
 from .persona_resource import Persona
 from .reserva_resource import Reserva
+from .stream_resource import Stream
+from .sync_resource import Sync
 from .test_notifications_resource import TestNotifications
 from .usuario_resource import Usuario
@@ -1,12 +1,11 @@
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
 from marshmallow import ValidationError
 
 from app.config import ResponseBuilder
 from app.extensions import limiter  # Usar el limiter global
 from app.mapping import AdministradorSchema, ResponseSchema
 from app.services import AdministradorService
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required
 
 Administrador = Blueprint('Administrador', __name__)
 service = AdministradorService()
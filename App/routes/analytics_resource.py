@@ -5,21 +5,21 @@ from datetime import date, datetime, timedelta
 import pytz
 import sentry_sdk
 from flask import Blueprint, Response, render_template, request
-from flask_jwt_extended import jwt_required
 from sqlalchemy import extract, func
 from sqlalchemy.orm import joinedload
-from weasyprint import HTML
 
 from app.config.response_builder import ResponseBuilder
 from app.extensions import db, limiter
 from app.mapping import ResponseSchema
 from app.models import Fecha, Gasto, Pago, Reserva
-from app.utils.decorators import admin_required
+from app.utils.admision import limite_concurrencia
+from app.utils.decorators import admin_required, jwt_required
 
 # Definición del Blueprint
 Analytics = Blueprint('Analytics', __name__)
 
 @Analytics.route('/analytics', methods=['GET'])
+@limite_concurrencia(4)
 @jwt_required()
 @admin_required()
 @limiter.limit("100 per minute") # Límite aumentado para la carga inicial del dashboard
@@ -159,7 +159,9 @@ def get_analytics():
             })
 
         # 2. Buscamos las 10 reservas más recientes
-        reservas_recientes = db.session.query(Reserva).filter(
+        reservas_recientes = db.session.query(Reserva).options(
+            joinedload(Reserva.usuario)  # el texto usa nombre y apellido de cada una
+        ).filter(
             extract('year', Reserva.fecha_aceptacion) == anio_seleccionado,
             extract('month', Reserva.fecha_aceptacion) == mes_seleccionado
         ).order_by(Reserva.fecha_aceptacion.desc()).limit(10).all()
@@ -226,6 +228,8 @@ def get_analytics():
 
 
 @Analytics.route('/analytics/reporte-pdf', methods=['GET'])
+# WeasyPrint es CPU intensivo: pocos PDF a la vez por proceso
+@limite_concurrencia(2)
 @jwt_required()
 @admin_required()
 def download_report():
@@ -278,6 +282,9 @@ def download_report():
             format_currency=format_currency
         )
 
+        # WeasyPrint es pesado de importar: solo lo cargan los workers que generan un reporte
+        from weasyprint import HTML
+
         pdf = HTML(string=html_renderizado).write_pdf()
         return Response(
             pdf,
@@ -0,0 +1,67 @@
+import sentry_sdk
+from flask import Blueprint, current_app, request
+
+from app.config.response_builder import ResponseBuilder
+from app.extensions import cache, limiter
+from app.utils.decorators import admin_required, jwt_required
+
+CacheBP = Blueprint('Cache', __name__)
+
+@CacheBP.route('/cache/estadisticas', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("60 per minute")
+def estadisticas():
+    """
+    Aciertos/fallos por nivel (memoria local y Redis) del proceso que atiende la petición.
+    """
+    response_builder = ResponseBuilder()
+    backend = cache.cache
+    if not hasattr(backend, 'estadisticas'):
+        return response_builder.add_message("El backend de caché no lleva estadísticas").add_status_code(404).build(), 404
+
+    response_builder.add_message("Estadísticas de caché").add_status_code(200).add_data(backend.estadisticas())
+    return response_builder.build(), 200
+
+
+@CacheBP.route('/cache/uso', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("30 per minute")
+def uso():
+    """
+    Bytes y llaves por espacio (reservas, fechas, usuarios, views), cuotas,
+    rechazos y memoria de Redis. Con ?reconciliar=1 descuenta antes las llaves vencidas.
+    """
+    response_builder = ResponseBuilder()
+    backend = cache.cache
+    if not hasattr(backend, 'contabilidad'):
+        return response_builder.add_message("El backend de caché no lleva contabilidad").add_status_code(404).build(), 404
+
+    try:
+        if request.args.get('reconciliar') == '1':
+            data = backend.reconciliar()
+        else:
+            data = backend.contabilidad.reporte()
+        response_builder.add_message("Uso de memoria de la caché").add_status_code(200).add_data(data)
+        return response_builder.build(), 200
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error al leer el uso de la caché: {str(e)}").add_status_code(500).build(), 500
+
+
+@CacheBP.route('/admision/estado', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("60 per minute")
+def estado_admision():
+    """
+    Lugares ocupados, esperas y timeouts del pool y rechazos (503) por clase del proceso que atiende.
+    """
+    response_builder = ResponseBuilder()
+    control = current_app.extensions.get('admision')
+    if control is None:
+        return response_builder.add_message("El control de admisión no está activo").add_status_code(404).build(), 404
+
+    response_builder.add_message("Estado del control de admisión").add_status_code(200).add_data(control.estado())
+    return response_builder.build(), 200
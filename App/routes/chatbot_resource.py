@@ -2,11 +2,14 @@ from flask import Blueprint, request
 
 from app.config import ResponseBuilder
 from app.services.chatbot_service import ChatbotService
+from app.utils.admision import limite_concurrencia
 
 ChatbotBP = Blueprint('Chatbot', __name__)
 
 
 @ChatbotBP.route('/chatbot/query', methods=['POST'])
+# Cada consulta espera a Dialogflow: que no acaparen los lugares del proceso
+@limite_concurrencia(4)
 def handle_query():
     service = ChatbotService()
     response_builder = ResponseBuilder()
@@ -1,10 +1,10 @@
 import os
 
 from flask import Blueprint
-from flask_jwt_extended import jwt_required
 
 from app.config import ResponseBuilder
 from app.mapping import ResponseSchema
+from app.utils.decorators import jwt_required
 
 Config = Blueprint('Config', __name__)
 response_schema = ResponseSchema()
@@ -0,0 +1,174 @@
+import os
+
+import sentry_sdk
+from flask import Blueprint, Response, request
+
+from app.config.response_builder import ResponseBuilder
+from app.extensions import db, limiter, redis_client
+from app.services import ConsultaLentaService
+from app.utils import memoria, perfilador
+from app.utils.decorators import admin_required, jwt_required
+
+Diagnostico = Blueprint('Diagnostico', __name__)
+
+@Diagnostico.route('/consultas-lentas', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("30 per minute")
+def consultas_lentas():
+    """
+    Consultas que superaron SQL_LENTA_UMBRAL_MS en las últimas ?horas=24, agrupadas
+    por huella y ordenadas por tiempo total (?limite=50).
+    """
+    service = ConsultaLentaService()
+    response_builder = ResponseBuilder()
+
+    horas = request.args.get('horas', 24, type=int)
+    limite = request.args.get('limite', 50, type=int)
+    if not 0 < horas <= 24 * service.RETENCION_DIAS or not 0 < limite <= 500:
+        return response_builder.add_message("Parámetros 'horas' o 'limite' fuera de rango.").add_status_code(400).build(), 400
+
+    try:
+        data = service.resumen(horas, limite)
+        response_builder.add_message("Consultas lentas").add_status_code(200).add_data(data)
+        return response_builder.build(), 200
+    except Exception as e:
+        db.session.rollback()
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error al obtener las consultas lentas: {str(e)}").add_status_code(500).build(), 500
+
+
+@Diagnostico.route('/consultas-lentas/<int:id>', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("60 per minute")
+def consulta_lenta(id):
+    """
+    Una ejecución registrada: sentencia completa, parámetros (ocultos los sensibles) y plan si se capturó.
+    """
+    service = ConsultaLentaService()
+    response_builder = ResponseBuilder()
+    try:
+        data = service.obtener(id)
+        if data is None:
+            return response_builder.add_message("Consulta no encontrada").add_status_code(404).build(), 404
+        response_builder.add_message("Consulta lenta").add_status_code(200).add_data(data)
+        return response_builder.build(), 200
+    except Exception as e:
+        db.session.rollback()
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error al obtener la consulta: {str(e)}").add_status_code(500).build(), 500
+
+
+@Diagnostico.route('/perfiles', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("30 per minute")
+def perfiles():
+    """
+    Perfiles guardados (más recientes primero): ruta, duración, SQL y lecturas de caché de cada uno.
+    Una petición se perfila enviándola con la cabecera X-Perfilar: 1 y un token de administrador.
+    """
+    response_builder = ResponseBuilder()
+    try:
+        response_builder.add_message("Perfiles de peticiones").add_status_code(200).add_data(perfilador.listar())
+        return response_builder.build(), 200
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error al obtener los perfiles: {str(e)}").add_status_code(500).build(), 500
+
+
+@Diagnostico.route('/perfiles/<string:id>', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("30 per minute")
+def perfil(id):
+    """
+    Resumen y árbol de llamadas de un perfil. Con ?formato=html devuelve el flame graph
+    de pyinstrument y con ?formato=speedscope un archivo para abrir en speedscope.app.
+    """
+    response_builder = ResponseBuilder()
+    formato = request.args.get('formato', 'texto')
+    if formato not in perfilador.FORMATOS:
+        return response_builder.add_message(f"Formato inválido (opciones: {', '.join(perfilador.FORMATOS)})").add_status_code(400).build(), 400
+
+    try:
+        resumen = perfilador.obtener(id)
+        salida = perfilador.renderizar(id, formato) if resumen else None
+        if salida is None:
+            return response_builder.add_message("Perfil no encontrado o vencido").add_status_code(404).build(), 404
+        if formato == 'html':
+            return Response(salida, mimetype='text/html')
+        if formato == 'speedscope':
+            return Response(salida, mimetype='application/json',
+                            headers={'Content-Disposition': f'attachment; filename=perfil-{id}.speedscope.json'})
+        response_builder.add_message("Perfil de la petición").add_status_code(200).add_data({**resumen, 'arbol': salida})
+        return response_builder.build(), 200
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error al obtener el perfil: {str(e)}").add_status_code(500).build(), 500
+
+
+@Diagnostico.route('/memoria', methods=['GET'])
+@jwt_required()
+@admin_required()
+@limiter.limit("10 per minute")
+def reporte_memoria():
+    """
+    RSS del proceso que atiende y de los demás workers de gunicorn, estado del
+    recolector y, si tracemalloc está activo, las asignaciones más grandes
+    (?limite=15, ?agrupar=lineno|filename|traceback).
+    """
+    response_builder = ResponseBuilder()
+    try:
+        data = memoria.ejecutar('reporte', request.args.get('limite', 15, type=int),
+                                request.args.get('agrupar', 'lineno'), padre=os.getppid())
+        response_builder.add_message("Memoria del proceso").add_status_code(200).add_data(data)
+        return response_builder.build(), 200
+    except ValueError as e:
+        return response_builder.add_message(str(e)).add_status_code(400).build(), 400
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error al leer la memoria: {str(e)}").add_status_code(500).build(), 500
+
+
+@Diagnostico.route('/memoria', methods=['POST'])
+@jwt_required()
+@admin_required()
+@limiter.limit("10 per minute")
+def accion_memoria():
+    """
+    Acciones de tracemalloc en todos los workers de gunicorn (o solo en "pid"); cada
+    uno guarda sus snapshots y responde por separado en "procesos":
+    {"accion": "iniciar" | "detener" | "snapshot" | "diferencia", "nombre", "desde", "hasta", "limite", "agrupar", "pid"}.
+    Para seguir un worker desde el arranque: MEMORIA_TRACEMALLOC_MARCOS > 0.
+    """
+    response_builder = ResponseBuilder()
+    json_data = request.get_json(silent=True) or {}
+    accion = json_data.get('accion')
+    if accion == 'diferencia' and not json_data.get('desde'):
+        return response_builder.add_message("La diferencia necesita 'desde' (nombre de un snapshot).").add_status_code(400).build(), 400
+
+    try:
+        parametros = {'accion': accion, 'limite': int(json_data.get('limite', 15)),
+                      'agrupar': json_data.get('agrupar', 'lineno'), 'nombre': json_data.get('nombre'),
+                      'desde': json_data.get('desde'), 'hasta': json_data.get('hasta'),
+                      'marcos': int(json_data.get('marcos', 1))}
+        pid = int(json_data['pid']) if json_data.get('pid') else None
+        procesos = memoria.difundir(redis_client, 'web', parametros, pid=pid)
+        if procesos is None:
+            # Sin workers escuchando (servidor de desarrollo): solo este proceso
+            procesos = [memoria.ejecutar(**parametros)]
+        if not procesos:
+            return response_builder.add_message(f"No respondió ningún proceso con pid {pid}").add_status_code(404).build(), 404
+        errores = [proceso['error'] for proceso in procesos if 'error' in proceso]
+        if len(errores) == len(procesos):
+            return response_builder.add_message(errores[0]).add_status_code(400).build(), 400
+
+        response_builder.add_message(f"Acción '{accion}' ejecutada").add_status_code(200).add_data({'procesos': procesos})
+        return response_builder.build(), 200
+    except (ValueError, KeyError) as e:
+        return response_builder.add_message(str(e).strip("'\"")).add_status_code(400).build(), 400
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error en la acción de memoria: {str(e)}").add_status_code(500).build(), 500
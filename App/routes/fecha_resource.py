@@ -2,31 +2,43 @@ from datetime import datetime
 
 import sentry_sdk
 from flask import Blueprint, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import get_jwt_identity
 from marshmallow import ValidationError
 
 from app.config.response_builder import ResponseBuilder
 from app.extensions import db, limiter, cache
 from app.mapping import FechaSchema, ResponseSchema
+from app.caching import cache_protegida
 from app.services import FechaService
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required
+from app.utils.fieldsets import parse_fields, schema_con_campos
 
 Fecha = Blueprint('Fecha', __name__)
 
+# Instancias compartidas: los schemas no guardan estado entre peticiones y
+# así el dump precompilado se genera una sola vez por proceso
+fecha_schema = FechaSchema()
+
 @Fecha.route('/fecha', methods=['GET'])
 @limiter.limit("100 per minute") 
-@cache.cached(timeout=30, key_prefix='fechas_all')
+# Las proyecciones (?fields=) no pasan por la caché de la vista completa
+@cache_protegida('fechas_all', timeout=30, ttl_suave=20, cachear_si=lambda respuesta: respuesta[1] == 200,
+                 unless=lambda: 'fields' in request.args)
 
 def all():
     # Instanciación interna para evitar errores de contexto
     service = FechaService()
-    fecha_schema = FechaSchema()
     response_builder = ResponseBuilder()
     
     try:
-        data = fecha_schema.dump(service.all(), many=True)
+        campos = parse_fields(request.args.get('fields'))
+        fecha_schema = schema_con_campos(FechaSchema, campos)
+        data = fecha_schema.dump(service.all(campos), many=True)
         response_builder.add_message("Fechas encontradas").add_status_code(200).add_data(data)
         return response_builder.build(), 200
+    except ValidationError as err:
+        response_builder.add_message("Campos inválidos").add_status_code(400).add_data(err.messages)
+        return response_builder.build(), 400
     except Exception as e:
         db.session.rollback() # Limpia la conexión
         response_builder.add_message("Error al obtener fechas").add_status_code(500).add_data(str(e))
@@ -37,7 +49,6 @@ def all():
 
 def one(id):
     service = FechaService()
-    fecha_schema = FechaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -61,7 +72,6 @@ def one(id):
 
 def add():
     service = FechaService()
-    fecha_schema = FechaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -90,7 +100,6 @@ def add():
 
 def update(id):
     service = FechaService()
-    fecha_schema = FechaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -155,7 +164,6 @@ def delete(id):
 @limiter.limit("100 per minute")
 def get_or_create_by_date(date_string):
     service = FechaService()
-    fecha_schema = FechaSchema()
     response_builder = ResponseBuilder()
     
     try:
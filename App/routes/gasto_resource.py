@@ -1,36 +1,43 @@
 from datetime import datetime
 
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
 from marshmallow import ValidationError
 
 from app.config.response_builder import ResponseBuilder
 from app.extensions import db, limiter
 from app.mapping import GastoSchema, ResponseSchema
 from app.services.gasto_service import GastoService
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required
+from app.utils.fieldsets import parse_fields, schema_con_campos
 
 GastoBP = Blueprint('Gasto', __name__)
 
+# Instancias compartidas: los schemas no guardan estado entre peticiones y
+# así el dump precompilado se genera una sola vez por proceso
+gasto_schema = GastoSchema()
+
 @GastoBP.route('/gasto', methods=['GET'])
 @jwt_required()
 @admin_required()
 @limiter.limit("100 per minute")
 def all():
     service = GastoService()
-    gasto_schema = GastoSchema()
     response_builder = ResponseBuilder()
     
     try:
         today = datetime.utcnow()
         month = request.args.get('mes', default=today.month, type=int)
         year = request.args.get('anio', default=today.year, type=int)
+        campos = parse_fields(request.args.get('fields'))
+        gasto_schema = schema_con_campos(GastoSchema, campos)
 
-        gastos = service.get_all(month=month, year=year)
+        gastos = service.get_all(month=month, year=year, campos=campos)
         data = gasto_schema.dump(gastos, many=True)
         
         response_builder.add_data(data).add_status_code(200).add_message("Gastos encontrados")
         return response_builder.build(), 200
+    except ValidationError as err:
+        return response_builder.add_message("Campos inválidos").add_data(err.messages).add_status_code(400).build(), 400
     except Exception as e:
         db.session.rollback()
         response_builder.add_message(f"Error al obtener gastos: {str(e)}").add_status_code(500)
@@ -41,7 +48,6 @@ def all():
 @admin_required()
 def add():
     service = GastoService()
-    gasto_schema = GastoSchema()
     response_builder = ResponseBuilder()
     
     try:
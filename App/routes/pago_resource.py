@@ -1,7 +1,6 @@
 import os
 
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
 from marshmallow import ValidationError
 
 from app.config.response_builder import ResponseBuilder
@@ -9,16 +8,19 @@ from app.extensions import db
 from app.mapping import PagoSchema, ResponseSchema
 from app.models import Pago, Reserva
 from app.services.pago_service import PagoService
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required
 
 PagoBP = Blueprint('Pago', __name__)
 
+# Instancias compartidas: los schemas no guardan estado entre peticiones y
+# así el dump precompilado se genera una sola vez por proceso
+pago_schema = PagoSchema()
+
 @PagoBP.route('/reserva/<int:reserva_id>/pagos', methods=['POST'])
 @jwt_required()
 @admin_required()
 def add_pago(reserva_id):
     # Instanciación interna para evitar RuntimeError y problemas de contexto
-    pago_schema = PagoSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -37,12 +39,9 @@ def add_pago(reserva_id):
         if monto_pago > reserva.saldo_restante:
             return response_builder.add_message("El monto del pago no puede ser mayor que el saldo restante.").add_status_code(422).build(), 422
 
-        # Cargamos el objeto pago y asignamos la relación
+        # Cargamos el objeto pago; el servicio lo asocia, confirma y emite el evento
         pago = pago_schema.load(json_data)
-        pago.reserva_id = reserva_id
-
-        db.session.add(pago)
-        db.session.commit()
+        pago = PagoService().registrar_pago(reserva, pago)
 
         data = pago_schema.dump(pago)
         return response_builder.add_message("Pago registrado con éxito").add_status_code(201).add_data(data).build(), 201
@@ -1,12 +1,11 @@
 from flask import Blueprint, request
 from marshmallow import ValidationError
-from flask_jwt_extended import jwt_required
 
 from app.config.response_builder import ResponseBuilder
 from app.extensions import limiter
 from app.mapping import PersonaSchema, ResponseSchema
 from app.services import PersonaService
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required
 
 Persona = Blueprint('Persona', __name__)
 
@@ -3,7 +3,7 @@ from datetime import date, datetime
 
 import sentry_sdk
 from flask import Blueprint, render_template, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import get_jwt_identity
 from marshmallow import ValidationError
 from werkzeug.utils import secure_filename
 
@@ -12,11 +12,17 @@ from app.extensions import db, limiter
 from app.mapping import ReservaSchema, ResponseSchema
 from app.mapping.reserva_schema import ArrepentimientoSchema
 from app.services import NotificationService, ReservaService
-from app.tasks import enviar_contrato_background, procesar_reserva_background
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required
+from app.utils.perfil_sql import presupuesto_sql
+from app.utils.fieldsets import parse_fields, schema_con_campos
 
 Reserva = Blueprint('Reserva', __name__)
 
+# Instancias compartidas: los schemas no guardan estado entre peticiones y
+# así el dump precompilado se genera una sola vez por proceso
+reserva_schema = ReservaSchema()
+arrepentimiento_schema = ArrepentimientoSchema()
+
 def _enviar_contrato_confirmacion(reserva_obj):
     """
     Función de ayuda para generar el HTML del contrato y enviarlo 
@@ -46,17 +52,23 @@ def _enviar_contrato_confirmacion(reserva_obj):
         sentry_sdk.capture_exception(mail_err)  
 
 @Reserva.route('/reserva', methods=['GET'])
+# Una consulta con joinedload: más sentencias indican un N+1 (p. ej. saldo_restante)
+@presupuesto_sql(5)
 @admin_required()
 @limiter.limit("100 per minute")
 def all():
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     
     try:
-        data = reserva_schema.dump(service.all(), many=True)
+        # ?fields=id,estado,fecha.dia -> solo esas columnas en el SELECT y en el JSON
+        campos = parse_fields(request.args.get('fields'))
+        reserva_schema = schema_con_campos(ReservaSchema, campos)
+        data = reserva_schema.dump(service.all(campos), many=True)
         response_builder.add_message("Reservas encontradas").add_status_code(200).add_data(data)
         return response_builder.build(), 200
+    except ValidationError as err:
+        return response_builder.add_message("Campos inválidos").add_data(err.messages).add_status_code(400).build(), 400
     except Exception as e:
         db.session.rollback()
         sentry_sdk.capture_exception(e)
@@ -67,7 +79,6 @@ def all():
 @admin_required()
 def one(id):
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -88,7 +99,6 @@ def one(id):
 @jwt_required()
 def request_by_user():
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -129,6 +139,8 @@ def request_by_user():
 
         reserva_creada = service.add(reserva)
         
+        # Celery se importa con la primera tarea encolada, no al levantar cada worker web
+        from app.tasks import procesar_reserva_background
         procesar_reserva_background.delay(reserva_creada.id, ruta_local)
         
         data = reserva_schema.dump(reserva_creada)
@@ -156,7 +168,6 @@ def request_by_user():
 @admin_required()
 def create_for_admin():
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -179,11 +190,9 @@ def create_for_admin():
         reserva.ip_aceptacion = request.remote_addr or "IP Desconocida"
         reserva.fecha_aceptacion = datetime.utcnow()
 
+        # Si nace confirmada, el consumidor de notificaciones envía el contrato
         reserva_creada = service.add(reserva)
 
-        if reserva_creada.estado == 'confirmada':
-            enviar_contrato_background.delay(reserva_creada.id)
-
         data = reserva_schema.dump(reserva_creada)
         response_builder.add_message("Reserva creada por admin").add_status_code(201).add_data(data)
         return response_builder.build(), 201
@@ -203,7 +212,6 @@ def create_for_admin():
 @admin_required()
 def update(id):
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -214,15 +222,10 @@ def update(id):
         reserva_actual = service.find(id)
         if not reserva_actual:
             return response_builder.add_message("Reserva no encontrada").add_status_code(404).build(), 404
-        
-        estado_anterior = reserva_actual.estado
-        nuevo_estado = json_data.get("estado")
 
+        # Al pasar a 'confirmada' el servicio emite reserva.confirmada y el contrato se envía en background
         updated_reserva = service.update(id, json_data)
         
-        if nuevo_estado == 'confirmada' and estado_anterior != 'confirmada':
-            enviar_contrato_background.delay(updated_reserva.id)
-        
         data = reserva_schema.dump(updated_reserva)
         response_builder.add_message("Reserva actualizada").add_status_code(200).add_data(data)
         return response_builder.build(), 200
@@ -255,7 +258,6 @@ def delete(id):
 @limiter.limit("100 per minute")
 def all_archived():
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     try:
         data = reserva_schema.dump(service.get_all_archived(), many=True)
@@ -266,10 +268,10 @@ def all_archived():
         return response_builder.add_message(f"Error: {str(e)}").add_status_code(500).build(), 500
 
 @Reserva.route('/reserva/mis-reservas', methods=['GET'])
+@presupuesto_sql(5)
 @jwt_required()
 def get_user_reservations():
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     user_id = get_jwt_identity()
     try:
@@ -287,7 +289,6 @@ def get_user_reservations():
 @limiter.limit("120 per minute")
 def search_live():
     service = ReservaService()
-    reserva_schema = ReservaSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -311,7 +312,6 @@ def search_live():
 @limiter.limit("5 per minute") # Límite estricto para evitar abuso/spam
 def solicitar_arrepentimiento():
     service = ReservaService()
-    arrepentimiento_schema = ArrepentimientoSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -351,7 +351,6 @@ def solicitar_arrepentimiento():
 @admin_required()
 def get_reintegros_pendientes():
     service = ReservaService()
-    reserva_schema = ReservaSchema() # Asumimos que tu schema ya mapea 'usuario' y 'fecha'
     response_builder = ResponseBuilder()
     
     try:
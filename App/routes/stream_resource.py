@@ -0,0 +1,86 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+from app.config.response_builder import ResponseBuilder
+from app.events import sse_broker
+from app.extensions import limiter
+from app.servidor import streams_por_worker
+from app.utils.admision import sin_admision
+from app.utils.decorators import admin_required
+
+Stream = Blueprint('Stream', __name__)
+
+# Traefik/nginx no deben acumular la respuesta: cada delta tiene que salir al instante
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no',
+}
+
+
+def _sin_lugar():
+    # Un 503 cierra el EventSource sin reintentos: el frontend pasa a consultar /fecha periódicamente
+    response_builder = ResponseBuilder()
+    response_builder.add_message("No hay lugar para más conexiones en vivo.").add_status_code(503)
+    respuesta = jsonify(response_builder.build())
+    respuesta.status_code = 503
+    respuesta.headers['Retry-After'] = str(current_app.config['ADMISION_RETRY_AFTER'])
+    return respuesta
+
+
+def _sse_response(canal: str):
+    # Cada stream retiene un hilo del worker: sin tope, unas decenas de visitantes dejan sin hilos a la API
+    if not sse_broker.reservar_conexion(streams_por_worker(current_app.config)):
+        return _sin_lugar()
+    # EventSource reenvía el último ID recibido en la cabecera al reconectar;
+    # también lo aceptamos por query string para reconexiones manuales.
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    respuesta = Response(
+        sse_broker.escuchar(canal, last_event_id),
+        mimetype='text/event-stream',
+        headers=SSE_HEADERS
+    )
+    # El servidor cierra la respuesta aunque el generador nunca haya empezado
+    respuesta.call_on_close(sse_broker.liberar_conexion)
+    return respuesta
+
+
+@Stream.route('/stream/calendario', methods=['GET'])
+# Conexiones de larga duración sin base de datos: en lugar de la admisión tienen su propio tope por worker
+@sin_admision
+@limiter.limit("30 per minute")
+def calendario():
+    """
+    Cambios en vivo del calendario público (estado y precio de cada fecha).
+    """
+    return _sse_response('calendario')
+
+
+@Stream.route('/stream/admin/ticket', methods=['POST'])
+@admin_required()
+@limiter.limit("30 per minute")
+def ticket_admin():
+    """
+    Ticket de un solo uso (TICKET_TTL_SEGUNDOS) para abrir /stream/admin?ticket=...
+    EventSource no permite cabeceras propias: así el JWT nunca viaja en la URL.
+    """
+    response_builder = ResponseBuilder()
+    ticket = sse_broker.emitir_ticket('admin', str(get_jwt_identity()))
+    response_builder.add_message("Ticket de stream emitido").add_status_code(200).add_data(
+        {'ticket': ticket, 'expira_en': sse_broker.TICKET_TTL_SEGUNDOS}
+    )
+    return response_builder.build(), 200
+
+
+@Stream.route('/stream/admin', methods=['GET'])
+@sin_admision
+@limiter.limit("30 per minute")
+def admin():
+    """
+    Cambios en vivo de reservas y pagos para el panel de administración.
+    Se autentica con un ticket de POST /stream/admin/ticket, nunca con el JWT.
+    """
+    if sse_broker.canjear_ticket('admin', request.args.get('ticket')) is None:
+        response_builder = ResponseBuilder()
+        response_builder.add_message("Ticket de stream inválido o vencido").add_status_code(401)
+        return response_builder.build(), 401
+    return _sse_response('admin')
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+import sentry_sdk
+from flask import Blueprint, request
+
+from app.config.response_builder import ResponseBuilder
+from app.extensions import db, limiter
+from app.services import SyncService
+from app.utils.admision import limite_concurrencia
+from app.utils.decorators import admin_required, jwt_required
+
+Sync = Blueprint('Sync', __name__)
+
+@Sync.route('/sync', methods=['GET'])
+@limite_concurrencia(4)
+@jwt_required()
+@admin_required()
+@limiter.limit("60 per minute")
+def cambios():
+    """
+    Devuelve lo que cambió desde ?since=<watermark> (ISO 8601) en reservas, fechas, pagos y gastos.
+    Sin 'since' devuelve un estado completo y la marca para la próxima consulta.
+    """
+    service = SyncService()
+    response_builder = ResponseBuilder()
+
+    since = request.args.get('since')
+    try:
+        # toISOString() de JS termina en 'Z', que fromisoformat no acepta antes de Python 3.11
+        desde = datetime.fromisoformat(since[:-1] + '+00:00' if since.endswith(('Z', 'z')) else since) if since else None
+        if desde is not None and desde.tzinfo is not None:
+            # Las marcas del servidor son UTC sin zona: se comparan con datetime.utcnow()
+            desde = desde.astimezone(timezone.utc).replace(tzinfo=None)
+    except ValueError:
+        return response_builder.add_message("El parámetro 'since' debe ser una fecha ISO 8601.").add_status_code(400).build(), 400
+
+    try:
+        data = service.cambios_desde(desde)
+        response_builder.add_message("Cambios obtenidos").add_status_code(200).add_data(data)
+        return response_builder.build(), 200
+    except Exception as e:
+        db.session.rollback()
+        sentry_sdk.capture_exception(e)
+        return response_builder.add_message(f"Error al sincronizar: {str(e)}").add_status_code(500).build(), 500
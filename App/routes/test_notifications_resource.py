@@ -1,7 +1,5 @@
 from flask import Blueprint, jsonify
 
-from app.tasks import check_pending_reservations, check_upcoming_reservations
-
 # Creamos un nuevo Blueprint para las rutas de prueba
 TestNotifications = Blueprint('TestNotifications', __name__)
 
@@ -12,6 +10,7 @@ def test_pending():
     """
     print("--- EJECUTANDO PRUEBA DE NOTIFICACIÓN PENDIENTE ---")
     try:
+        from app.tasks import check_pending_reservations
         check_pending_reservations()
         return jsonify(message="Tarea de reservas pendientes ejecutada. Revisa tu celular."), 200
     except Exception as e:
@@ -25,6 +24,7 @@ def test_upcoming():
     """
     print("--- EJECUTANDO PRUEBA DE NOTIFICACIÓN PRÓXIMA ---")
     try:
+        from app.tasks import check_upcoming_reservations
         check_upcoming_reservations()
         return jsonify(message="Tarea de reservas próximas ejecutada. Revisa tu celular."), 200
     except Exception as e:
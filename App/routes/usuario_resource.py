@@ -1,15 +1,20 @@
 from flask import Blueprint, request
-from flask_jwt_extended import jwt_required
 from marshmallow import ValidationError
 
 from app.config.response_builder import ResponseBuilder
 from app.extensions import db, limiter
 from app.mapping import ResponseSchema, UsuarioSchema
 from app.services import UsuarioService
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required
+from app.utils.fieldsets import parse_fields, schema_con_campos
 
 Usuario = Blueprint('Usuario', __name__)
 
+# Instancias compartidas: los schemas no guardan estado entre peticiones y
+# así el dump precompilado se genera una sola vez por proceso
+response_schema = ResponseSchema()
+usuario_schema = UsuarioSchema()
+
 @Usuario.route('/usuario', methods=['GET'])
 @jwt_required()
 @admin_required()
@@ -17,14 +22,17 @@ Usuario = Blueprint('Usuario', __name__)
 def all():
     # Instanciación interna para evitar RuntimeError y problemas de contexto
     service = UsuarioService()
-    usuario_schema = UsuarioSchema()
-    response_schema = ResponseSchema()
     response_builder = ResponseBuilder()
     
     try:
-        data = usuario_schema.dump(service.all(), many=True)
+        campos = parse_fields(request.args.get('fields'))
+        usuario_schema = schema_con_campos(UsuarioSchema, campos)
+        data = usuario_schema.dump(service.all(campos), many=True)
         response_builder.add_message("Usuarios encontrados").add_status_code(200).add_data(data)
         return response_schema.dump(response_builder.build()), 200
+    except ValidationError as err:
+        response_builder.add_message("Campos inválidos").add_status_code(400).add_data(err.messages)
+        return response_schema.dump(response_builder.build()), 400
     except Exception as e:
         db.session.rollback() # Limpia la conexión para que no se bloquee el servidor
         response_builder.add_message("Error al obtener usuarios").add_status_code(500).add_data(str(e))
@@ -36,8 +44,6 @@ def all():
 @limiter.limit("60 per minute")
 def one(id):
     service = UsuarioService()
-    usuario_schema = UsuarioSchema()
-    response_schema = ResponseSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -58,8 +64,6 @@ def one(id):
 @limiter.limit("40 per minute")
 def add():
     service = UsuarioService()
-    usuario_schema = UsuarioSchema()
-    response_schema = ResponseSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -88,8 +92,6 @@ def add():
 @limiter.limit("40 per minute")
 def update(id):
     service = UsuarioService()
-    usuario_schema = UsuarioSchema()
-    response_schema = ResponseSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -122,7 +124,6 @@ def update(id):
 @limiter.limit("40 per minute")
 def delete(id):
     service = UsuarioService()
-    response_schema = ResponseSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -150,8 +151,6 @@ def delete(id):
 @limiter.limit("120 per minute") # Límite más alto porque el tipeo en vivo genera más peticiones
 def search_live():
     service = UsuarioService()
-    usuario_schema = UsuarioSchema()
-    response_schema = ResponseSchema()
     response_builder = ResponseBuilder()
     
     try:
@@ -1,6 +1,6 @@
-
 from .administrador_services import AdministradorService
 from .chatbot_service import ChatbotService
+from .consulta_lenta_service import ConsultaLentaService
 from .fecha_services import FechaService
 from .gasto_service import GastoService
 from .notification_services import NotificationService
@@ -8,4 +8,6 @@ from .pago_service import PagoService
 from .persona_services import PersonaService
 from .push_notification_service import PushNotificationService
 from .reserva_services import ReservaService
+from .sync_service import SyncService
 from .usuario_services import UsuarioService
+from .vencimiento_service import VencimientoService
@@ -3,6 +3,7 @@ from app.models import Administrador
 from app.repositories.administrador_repository import AdministradorRepository
 from contextlib import contextmanager
 from app.utils.decorators import transactional
+from app.utils.metricas import LOCKS
 import time
 
 class AdministradorService:
@@ -24,11 +25,13 @@ class AdministradorService:
         lock_value = str(time.time())
 
         if redis_client.set(lock_key, lock_value, ex=self.REDIS_LOCK_TIMEOUT, nx=True):
+            LOCKS.labels('administrador', 'adquirido').inc()
             try:
                 yield  # Permite la ejecución del bloque protegido
             finally:
                 redis_client.delete(lock_key)
         else:
+            LOCKS.labels('administrador', 'ocupado').inc()
             raise Exception(f"El recurso está bloqueado para el administrador {administrador_id}.")
 
     def all(self) -> list[Administrador]:
@@ -1,8 +1,22 @@
 import os
 
 from flask import current_app
-from google.cloud import dialogflow
-from google.oauth2 import service_account
+
+# google-cloud-dialogflow (gRPC) es pesado: se importa y se conecta recién en la primera consulta
+_session_client = None
+_session_pid = None
+
+
+def _obtener_session_client(credentials):
+    """
+    Cliente de Dialogflow del proceso (abre un canal gRPC, no conviene crearlo por mensaje).
+    """
+    global _session_client, _session_pid
+    if _session_client is None or _session_pid != os.getpid():
+        from google.cloud import dialogflow
+        _session_client = dialogflow.SessionsClient(credentials=credentials)
+        _session_pid = os.getpid()
+    return _session_client
 
 
 class ChatbotService:
@@ -22,6 +36,8 @@ class ChatbotService:
         if not credentials_info or not credentials_info.get('project_id'):
             raise ValueError("Las credenciales de Google Cloud no están configuradas en la App.")
             
+        from google.oauth2 import service_account
+
         project_id = credentials_info.get('project_id')
         credentials = service_account.Credentials.from_service_account_info(credentials_info)
         
@@ -35,8 +51,10 @@ class ChatbotService:
             # Obtenemos las credenciales dentro del contexto de la petición
             project_id, credentials = self._get_credentials()
 
-            # Inicializamos el cliente con las credenciales cargadas
-            session_client = dialogflow.SessionsClient(credentials=credentials)
+            from google.cloud import dialogflow
+
+            # Reutilizamos el cliente del proceso (se crea con las credenciales cargadas)
+            session_client = _obtener_session_client(credentials)
             session = session_client.session_path(project_id, user_id)
 
             # Preparar la entrada de texto
@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timedelta
+
+import sentry_sdk
+
+from app.extensions import db
+from app.models import ConsultaLenta
+from app.repositories import ConsultaLentaRepository
+from app.utils.consultas_lentas import normalizar, solo_lectura
+from app.utils.decorators import transactional
+
+
+class ConsultaLentaService:
+    """
+    Registro de consultas lentas (ver app.utils.consultas_lentas): lo escribe el
+    worker de Celery y lo consulta el panel de administración.
+    """
+    # Cuánto puede tardar el EXPLAIN ANALYZE (vuelve a ejecutar la consulta)
+    EXPLAIN_TIMEOUT_MS = 10000
+    RETENCION_DIAS = 14
+
+    def __init__(self, repository=None):
+        self.repository = repository or ConsultaLentaRepository()
+
+    def _plan(self, consulta: dict):
+        # Solo PostgreSQL entiende EXPLAIN (ANALYZE, BUFFERS)
+        if not consulta.get('explicar') or db.engine.dialect.name != 'postgresql':
+            return None
+        try:
+            # SELECT ... FOR UPDATE o CTEs que escriben: plan estimado, sin volver a ejecutarlas
+            return self.repository.explicar(consulta['sentencia'], consulta.get('parametros_originales'),
+                                            self.EXPLAIN_TIMEOUT_MS, analizar=solo_lectura(consulta['sentencia']))
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+            return None
+
+    @transactional
+    def registrar(self, origen: str, consultas: list) -> int:
+        for consulta in consultas:
+            plan = self._plan(consulta)
+            self.repository.agregar(ConsultaLenta(
+                origen=origen[:200],
+                huella=consulta['huella'],
+                sentencia=consulta['sentencia'],
+                parametros=json.dumps(consulta['parametros']) if consulta.get('parametros') is not None else None,
+                duracion_ms=consulta['duracion_ms'],
+                plan=plan,
+                plan_capturado_en=datetime.utcnow() if plan else None,
+            ))
+        return len(consultas)
+
+    def resumen(self, horas: int = 24, limite: int = 50) -> list:
+        """
+        Consultas lentas de las últimas `horas`, agrupadas por huella y ordenadas por tiempo total.
+        """
+        filas = self.repository.resumen_por_huella(datetime.utcnow() - timedelta(hours=horas), limite)
+        ultimas = {consulta.id: consulta for consulta in self.repository.get_by_ids([fila.ultimo_id for fila in filas])}
+        resumen = []
+        for fila in filas:
+            ultima = ultimas.get(fila.ultimo_id)
+            resumen.append({
+                'huella': fila.huella,
+                'sentencia': normalizar(ultima.sentencia) if ultima else None,
+                'origen': ultima.origen if ultima else None,
+                'veces': fila.veces,
+                'total_ms': round(fila.total_ms, 2),
+                'promedio_ms': round(fila.promedio_ms, 2),
+                'maximo_ms': round(fila.maximo_ms, 2),
+                'ultima_vez': fila.ultima_vez.isoformat(),
+                'ultimo_id': fila.ultimo_id,
+                'ultimo_plan_id': fila.ultimo_plan_id,
+            })
+        return resumen
+
+    def obtener(self, id: int) -> dict:
+        consulta = self.repository.get_by_id(id)
+        if consulta is None:
+            return None
+        return {
+            'id': consulta.id,
+            'registrada_en': consulta.registrada_en.isoformat(),
+            'origen': consulta.origen,
+            'huella': consulta.huella,
+            'sentencia': consulta.sentencia,
+            'parametros': json.loads(consulta.parametros) if consulta.parametros else None,
+            'duracion_ms': consulta.duracion_ms,
+            'plan': consulta.plan,
+            'plan_capturado_en': consulta.plan_capturado_en.isoformat() if consulta.plan_capturado_en else None,
+        }
+
+    @transactional
+    def purgar(self) -> int:
+        return self.repository.purgar(datetime.utcnow() - timedelta(days=self.RETENCION_DIAS))
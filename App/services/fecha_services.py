@@ -2,16 +2,20 @@ import time
 from contextlib import contextmanager
 from datetime import date
 
+from app.caching import cache_protegida, valor_en_cache
+from app.events import event_bus
 from app.extensions import cache, db, redis_client
 from app.models import Fecha
 from app.repositories import FechaRepository
 from app.utils.decorators import transactional
+from app.utils.metricas import LOCKS
 
 class FechaService:
     """
     Servicio para gestionar fechas con soporte de caché y bloqueos en Redis para concurrencia.
     """
     CACHE_TIMEOUT = 300  # Tiempo de expiración de caché en segundos
+    CACHE_TIMEOUT_NEGATIVO = 30  # IDs inexistentes: se recuerdan poco tiempo
     REDIS_LOCK_TIMEOUT = 10  # Tiempo de bloqueo en Redis en segundos
 
     def __init__(self, repository=None):
@@ -26,24 +30,28 @@ class FechaService:
         lock_value = str(time.time())
 
         if redis_client.set(lock_key, lock_value, ex=self.REDIS_LOCK_TIMEOUT, nx=True):
+            LOCKS.labels('fecha', 'adquirido').inc()
             try:
                 yield  # Permite la ejecución del bloque protegido
             finally:
                 redis_client.delete(lock_key)
         else:
+            LOCKS.labels('fecha', 'ocupado').inc()
             raise Exception(f"El recurso para la fecha {fecha_id} está bloqueado por otra operación.")
 
-    def all(self) -> list[Fecha]:
+    def all(self, campos=None) -> list[Fecha]:
         """
         Obtiene la lista de todas las fechas con soporte de caché.
+        Con `campos` se reutiliza la lista completa cacheada o se consulta solo lo pedido.
         """
-        cached_fechas = cache.get('fechas')
-        if cached_fechas is None:
-            fechas = self.repository.get_all()
-            if fechas:
-                cache.set('fechas', fechas, timeout=self.CACHE_TIMEOUT)
-            return fechas
-        return cached_fechas
+        if campos:
+            cached_fechas = valor_en_cache('fechas')
+            return cached_fechas if cached_fechas is not None else self.repository.get_all(campos)
+        return self._todas()
+
+    @cache_protegida('fechas', timeout=CACHE_TIMEOUT, refresco_anticipado=True)
+    def _todas(self) -> list[Fecha]:
+        return self.repository.get_all()
 
     @transactional
     def add(self, fecha: Fecha) -> Fecha:
@@ -60,6 +68,7 @@ class FechaService:
         cache.delete('fechas')
         cache.delete('fechas_disponibles')
         cache.delete('todas_las_fechas')
+        self._emitir('fecha.creada', new_fecha)
         
         return new_fecha
 
@@ -90,6 +99,7 @@ class FechaService:
             cache.delete('fechas')
             cache.delete('fechas_disponibles')
             cache.delete('todas_las_fechas')
+            self._emitir('fecha.actualizada', existing_fecha)
 
             return existing_fecha
 
@@ -105,19 +115,21 @@ class FechaService:
                 cache.delete('fechas')
                 cache.delete('fechas_disponibles')
                 cache.delete('todas_las_fechas')
+                event_bus.emitir('fecha.eliminada', fecha_id=fecha_id)
             return deleted
 
+    def _emitir(self, tipo: str, fecha: Fecha):
+        """
+        Emite un evento de dominio de la fecha (se publica después del commit).
+        """
+        event_bus.emitir(tipo, fecha_id=fecha.id, dia=fecha.dia, estado=fecha.estado)
+
+    @cache_protegida('fecha_{fecha_id}', timeout=CACHE_TIMEOUT, ttl_negativo=CACHE_TIMEOUT_NEGATIVO)
     def find(self, fecha_id: int) -> Fecha:
         """
         Busca una fecha por ID priorizando la caché.
         """
-        cached_fecha = cache.get(f'fecha_{fecha_id}')
-        if cached_fecha is None:
-            fecha = self.repository.get_by_id(fecha_id)
-            if fecha:
-                cache.set(f'fecha_{fecha_id}', fecha, timeout=self.CACHE_TIMEOUT)
-            return fecha
-        return cached_fecha
+        return self.repository.get_by_id(fecha_id)
 
     def find_by_dia(self, dia: date) -> Fecha:
         """
@@ -8,8 +8,8 @@ class GastoService:
     def __init__(self):
         self.repository = GastoRepository()
 
-    def get_all(self, month=None, year=None) -> List[Gasto]:
-        return self.repository.get_all(month=month, year=year)
+    def get_all(self, month=None, year=None, campos=None) -> List[Gasto]:
+        return self.repository.get_all(month=month, year=year, campos=campos)
 
     def get_desglose_para_grafico(self, month: int, year: int) -> list:
         # 1. Le pide los datos crudos al repositorio
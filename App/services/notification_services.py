@@ -5,8 +5,6 @@ from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-from weasyprint import HTML
-
 from app.utils.storage import upload_bytes_to_r2
 
 
@@ -38,6 +36,9 @@ class NotificationService:
             return False
 
         try:
+            # WeasyPrint (cairo/pango) solo se carga en el proceso que genera PDFs
+            from weasyprint import HTML
+
             # 1. Generar el PDF en memoria RAM (Bytes)
             pdf_bytes = HTML(string=html_contract).write_pdf()
 
@@ -1,4 +1,5 @@
-from app.models import Pago
+from app.events import event_bus
+from app.models import Pago, Reserva
 from app.repositories.pago_repository import PagoRepository
 from app.services.reserva_services import ReservaService
 from app.utils.decorators import transactional
@@ -7,20 +8,30 @@ from app.extensions import db
 class PagoService:
     def __init__(self):
         self.repository = PagoRepository()
-        self.reserva_service = ReservaService()
         
     @transactional
     def create_pago(self, data):
         pago = self.repository.create(data)
         if pago:
-            # Empujamos el cambio a la base de datos (sin cerrar transacción) 
-            # para que recalcular_saldo vea este nuevo pago al hacer la suma.
+            # Empujamos el cambio a la base de datos (sin cerrar transacción) para obtener el ID.
             db.session.flush() 
-            self.reserva_service.recalcular_saldo(pago.reserva_id)
+            # El consumidor de caché invalida la reserva para recalcular el saldo_restante
+            self._emitir('pago.registrado', pago.id, pago.reserva_id, pago.monto)
             
         # El decorador @transactional hará el commit() final al retornar
         return pago
 
+    @transactional
+    def registrar_pago(self, reserva: Reserva, pago: Pago) -> Pago:
+        """
+        Asocia el pago a la reserva y lo guarda (el saldo ya fue validado por la ruta).
+        """
+        pago.reserva_id = reserva.id
+        db.session.add(pago)
+        db.session.flush()
+        self._emitir('pago.registrado', pago.id, reserva.id, pago.monto, usuario_id=reserva.usuario_id)
+        return pago
+
     @transactional
     def delete_pago(self, pago_id: int) -> bool:
         pago = self.repository.get_by_id(pago_id)
@@ -28,13 +39,24 @@ class PagoService:
             return False
         
         reserva_id = pago.reserva_id
+        monto = pago.monto
         self.repository.delete(pago)
         
-        # Empujamos la eliminación a la base de datos 
-        # para que recalcular_saldo ya no cuente este pago.
+        # Empujamos la eliminación a la base de datos sin cerrar la transacción
         db.session.flush()
         
-        self.reserva_service.recalcular_saldo(reserva_id)
+        # El consumidor de caché invalida la reserva para que el saldo_restante ya no cuente este pago
+        self._emitir('pago.eliminado', pago_id, reserva_id, monto)
         
         # El decorador @transactional hará el commit() final al retornar
-        return True
\ No newline at end of file
+        return True
+
+    def _emitir(self, tipo: str, pago_id: int, reserva_id: int, monto, usuario_id: int = None):
+        """
+        Emite el evento del pago e invalida "mis reservas" del titular (saldo y pagos anidados).
+        """
+        if usuario_id is None:
+            reserva = db.session.get(Reserva, reserva_id)
+            usuario_id = reserva.usuario_id if reserva else None
+        ReservaService.invalidar_mis_reservas(usuario_id)
+        event_bus.emitir(tipo, pago_id=pago_id, reserva_id=reserva_id, usuario_id=usuario_id, monto=monto)
@@ -5,6 +5,7 @@ from app.extensions import cache, db, redis_client
 from app.models import Persona
 from app.repositories import PersonaRepository
 from app.utils.decorators import transactional
+from app.utils.metricas import LOCKS
 
 
 class PersonaService:
@@ -26,11 +27,13 @@ class PersonaService:
         lock_value = str(time.time())
 
         if redis_client.set(lock_key, lock_value, ex=self.REDIS_LOCK_TIMEOUT, nx=True):
+            LOCKS.labels('persona', 'adquirido').inc()
             try:
                 yield  # Permite la ejecución del bloque protegido
             finally:
                 redis_client.delete(lock_key)
         else:
+            LOCKS.labels('persona', 'ocupado').inc()
             raise Exception(f"El recurso está bloqueado para la persona {persona_id}.")
 
     def all(self) -> list[Persona]:
@@ -4,13 +4,17 @@ from datetime import date, datetime
 
 from werkzeug.utils import secure_filename
 
+from app.caching import cache_protegida, invalidar_al_confirmar, valor_en_cache
+from app.events import event_bus
 from app.extensions import cache, db, redis_client
 from app.models import Fecha, Reserva
 from app.repositories import ReservaRepository
 from app.services import NotificationService
 from app.services.fecha_services import FechaService
+from app.services.vencimiento_service import VencimientoService
 from app.utils.decorators import transactional
-from app.utils.storage import upload_bytes_to_r2
+from app.utils.metricas import LOCKS
+from app.utils.storage import upload_file_to_r2
 
 
 class ReservaService:
@@ -18,11 +22,13 @@ class ReservaService:
     Servicio para gestionar reservas con soporte de caché y bloqueos en Redis para concurrencia.
     """
     CACHE_TIMEOUT = 300  # Tiempo de expiración de caché en segundos
+    CACHE_TIMEOUT_NEGATIVO = 30  # IDs inexistentes: se recuerdan poco tiempo
     REDIS_LOCK_TIMEOUT = 10  # Tiempo de bloqueo en Redis en segundos
 
     def __init__(self, repository=None):
         self.repository = repository or ReservaRepository()
         self.fecha_service = FechaService() 
+        self.vencimientos = VencimientoService()
 
     @contextmanager
     def redis_lock(self, reserva_id: int):
@@ -33,24 +39,30 @@ class ReservaService:
         lock_value = str(time.time())
 
         if redis_client.set(lock_key, lock_value, ex=self.REDIS_LOCK_TIMEOUT, nx=True):
+            LOCKS.labels('reserva', 'adquirido').inc()
             try:
                 yield  # Permite la ejecución del bloque protegido
             finally:
                 redis_client.delete(lock_key)
         else:
+            LOCKS.labels('reserva', 'ocupado').inc()
             raise Exception(f"El recurso está bloqueado para la reserva {reserva_id}.")
 
-    def all(self) -> list[Reserva]:
+    def all(self, campos=None) -> list[Reserva]:
         """
         Obtiene la lista de todas las reservas, con caché.
+        Con `campos` (proyección) se reutiliza la lista completa si está en caché;
+        si no, se consulta solo lo pedido y el resultado parcial no se cachea.
         """
-        cached_reservas = cache.get('reservas')
-        if cached_reservas is None:
-            reservas = self.repository.get_all()
-            if reservas:
-                cache.set('reservas', reservas, timeout=self.CACHE_TIMEOUT)
-            return reservas
-        return cached_reservas
+        if campos:
+            cached_reservas = valor_en_cache('reservas')
+            return cached_reservas if cached_reservas is not None else self.repository.get_all(campos)
+        return self._todas()
+
+    @cache_protegida('reservas', timeout=CACHE_TIMEOUT, refresco_anticipado=True)
+    def _todas(self) -> list[Reserva]:
+        # Consulta pesada (3 joinedload): un solo proceso la recalcula al vencer la caché
+        return self.repository.get_all()
 
 
     @transactional
@@ -72,16 +84,20 @@ class ReservaService:
                 fecha_a_reservar.estado = 'reservada'
             else:
                 fecha_a_reservar.estado = 'pendiente'
+                if not reserva.fecha_vencimiento:
+                    reserva.fecha_vencimiento = self.vencimientos.calcular_vencimiento()
             
             db.session.add(reserva)
             
             # Generamos el ID en la BD sin cerrar la transacción
             db.session.flush()
+
+            # Agendamos el vencimiento (si el commit falla, el beat lo descarta al no encontrarla pendiente)
+            if reserva.estado != 'confirmada':
+                self.vencimientos.programar(reserva)
             
-            # 4. Limpieza y actualización de caché
-            cache.clear() 
-            cache.set(f'reserva_{reserva.id}', reserva, timeout=self.CACHE_TIMEOUT)
-            cache.set(f'fecha_{fecha_a_reservar.id}', fecha_a_reservar, timeout=self.CACHE_TIMEOUT)
+            # 4. La caché y las notificaciones las resuelven los consumidores del evento (post-commit)
+            self._emitir('reserva.creada', reserva)
 
             return reserva
     @transactional
@@ -94,6 +110,8 @@ class ReservaService:
 
             estado_anterior = reserva_a_actualizar.estado
             nuevo_estado = updated_data.get('estado')
+            # Si la reserva cambia de titular, la lista del anterior también queda vieja
+            self.invalidar_mis_reservas(reserva_a_actualizar.usuario_id)
 
             for key, value in updated_data.items():
                 if hasattr(reserva_a_actualizar, key):
@@ -106,9 +124,21 @@ class ReservaService:
                 reserva_a_actualizar.fecha.estado = 'disponible'
             elif nuevo_estado == 'pendiente' and estado_anterior != 'pendiente':
                 reserva_a_actualizar.fecha.estado = 'pendiente'
+
+            if nuevo_estado in ('confirmada', 'cancelada', 'pendiente') and nuevo_estado != estado_anterior:
+                self._emitir(f'reserva.{nuevo_estado}', reserva_a_actualizar, estado_anterior=estado_anterior)
+            else:
+                self._emitir('reserva.actualizada', reserva_a_actualizar)
+
+            # Mantenemos sincronizada la agenda de vencimientos
+            if nuevo_estado == 'pendiente':
+                if not reserva_a_actualizar.fecha_vencimiento:
+                    reserva_a_actualizar.fecha_vencimiento = self.vencimientos.calcular_vencimiento()
+                self.vencimientos.programar(reserva_a_actualizar)
+            elif nuevo_estado and nuevo_estado != 'pendiente':
+                self.vencimientos.cancelar(reserva_id)
                 
             reserva_fresca = self.repository.get_by_id(reserva_id)
-            cache.clear() 
 
             return reserva_fresca
 
@@ -126,9 +156,10 @@ class ReservaService:
             if fecha_asociada:
                 fecha_asociada.estado = 'disponible'
 
-            # El decorador @transactional hará el commit() al finalizar la función
-            cache.clear() 
+            self.vencimientos.cancelar(reserva_id)
+            self._emitir('reserva.archivada', reserva_a_archivar)
 
+            # El decorador @transactional hará el commit() al finalizar la función
             return True
 
     def get_all_archived(self) -> list[Reserva]:
@@ -143,30 +174,43 @@ class ReservaService:
             return reservas
         return cached_reservas
 
+    @cache_protegida('reserva_{reserva_id}', timeout=CACHE_TIMEOUT, ttl_negativo=CACHE_TIMEOUT_NEGATIVO)
     def find(self, reserva_id: int) -> Reserva:
         """
         Busca una reserva por su ID, con caché.
         """
-        cached_reserva = cache.get(f'reserva_{reserva_id}')
-        if cached_reserva is None:
-            reserva = self.repository.get_by_id(reserva_id)
-            if reserva:
-                cache.set(f'reserva_{reserva_id}', reserva, timeout=self.CACHE_TIMEOUT)
-            return reserva
-        return cached_reserva
+        return self.repository.get_by_id(reserva_id)
 
-    def recalcular_saldo(self, reserva_id: int):
+    def _emitir(self, tipo: str, reserva: Reserva, **extra):
         """
-        Invalida la caché para forzar el recálculo del saldo_restante.
+        Emite un evento de dominio de la reserva (se publica después del commit).
         """
-        cache.clear()
+        self.invalidar_mis_reservas(reserva.usuario_id)
+        event_bus.emitir(
+            tipo,
+            reserva_id=reserva.id,
+            fecha_id=reserva.fecha_id,
+            usuario_id=reserva.usuario_id,
+            estado=reserva.estado,
+            **extra
+        )
         
+    @cache_protegida('mis_reservas_{user_id}', timeout=CACHE_TIMEOUT, cachear_si=lambda reservas: reservas is not None)
     def get_by_user_id(self, user_id: int) -> list[Reserva]:
         """
-        Obtiene todas las reservas de un usuario.
+        Obtiene todas las reservas de un usuario, con caché por usuario
+        (también se cachea la lista vacía).
         """
         return self.repository.get_by_user_id(user_id)
 
+    @staticmethod
+    def invalidar_mis_reservas(usuario_id: int):
+        """
+        Borra la caché de /reserva/mis-reservas del usuario cuando confirme la transacción.
+        """
+        if usuario_id:
+            invalidar_al_confirmar(f"mis_reservas_{usuario_id}")
+
     def search(self, term: str) -> list[Reserva]:
         """
         Busca reservas activas por coincidencia de texto en el cliente o estado.
@@ -222,24 +266,18 @@ class ReservaService:
         if reserva.fecha:
             reserva.fecha.estado = 'disponible' 
 
+        self.vencimientos.cancelar(reserva.id)
+
         reserva.observaciones = f"Cancelación por Botón de Arrepentimiento. Motivo: {motivo}" if motivo else "Cancelación por Botón de Arrepentimiento. Sin motivo especificado."
-            
-        # --- Limpieza de Caché ---
-        from app.extensions import cache
-        cache.delete('reservas')
-        cache.delete('fechas_disponibles')
 
-        # --- 6. Notificación Asíncrona por Telegram (CELERY) ---
+        # --- 6. Caché y alerta de Telegram: consumidores del evento (post-commit) ---
         nombre_cliente = f"{reserva.usuario.nombre} {reserva.usuario.apellido}" if reserva.usuario else "Cliente no registrado"
-        
-        # Importación local para evitar Circular Imports
-        from app.tasks import notificar_arrepentimiento_async
-
-        # Disparamos la tarea a Celery pasando solo strings
-        notificar_arrepentimiento_async.delay(
+        self._emitir(
+            'reserva.cancelada', reserva,
+            motivo='arrepentimiento',
             nombre_cliente=nombre_cliente,
             fecha_evento=str(fecha_del_evento),
-            motivo=motivo
+            detalle=motivo
         )
 
         return reserva
@@ -254,30 +292,21 @@ class ReservaService:
         reserva.requiere_reintegro = False
         reserva.estado = 'archivada'
         
-        # 2. Leer los bytes del archivo que subiste desde React en memoria
-        file_bytes = comprobante_file.read()
+        # 2. Subir a R2 desde el stream del upload: werkzeug lo guarda en un archivo
+        # temporal si es grande y así no se carga entero en la memoria del worker
         file_name = secure_filename(f"reintegro_{reserva_id}_{comprobante_file.filename}")
-        
-        # 3. Subir a R2
-        comprobante_url = upload_bytes_to_r2(file_bytes, file_name, folder="comprobantes_reintegros")
+        comprobante_url = upload_file_to_r2(comprobante_file, folder="comprobantes_reintegros", filename=file_name)
         
         # Si la subida falla, cortamos la ejecución para no dejar datos inconsistentes
         if not comprobante_url:
             raise ValueError("Error al subir el comprobante a R2. Intentá nuevamente.")
-        from app.tasks import tarea_enviar_reintegro_async
-
-        # 4. DELEGAR A CELERY usando .delay()
-        tarea_enviar_reintegro_async.delay(
-            to_email=reserva.usuario.correo,
-            user_name=reserva.usuario.nombre,
-            event_date=str(reserva.fecha.dia),
-            file_url=comprobante_url,
-            file_name=file_name
-        )
 
-        # 5. Dejamos un registro textual por las dudas
+        # 3. Dejamos un registro textual por las dudas
         reserva.observaciones = f"{reserva.observaciones} | Reintegro transferido. URL Comprobante: {comprobante_url}"
-        cache.delete('reservas')
+
+        # 4. El correo con el comprobante lo dispara el consumidor de notificaciones (post-commit)
+        self._emitir('reserva.reintegro_pagado', reserva, comprobante_url=comprobante_url, file_name=file_name)
+        self._emitir('reserva.archivada', reserva)
         
         return reserva
     def get_reintegros_pendientes(self):
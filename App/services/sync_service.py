@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from app.mapping import FechaSchema, GastoSchema, PagoSchema, ReservaSchema
+from app.repositories import SyncRepository
+from app.utils.decorators import transactional
+
+
+class SyncService:
+    """
+    Sincronización incremental ("¿qué cambió desde X?") para el panel de administración.
+    """
+    # La nueva marca se retrasa unos segundos para cubrir transacciones que hicieron
+    # commit después de leer: el cliente puede recibir filas repetidas (upsert por id),
+    # pero nunca pierde cambios.
+    MARGEN_SEGUNDOS = 5
+    # Las lápidas se conservan este tiempo; una marca más vieja obliga a un refresco completo.
+    RETENCION_DIAS = 30
+
+    def __init__(self, repository=None):
+        self.repository = repository or SyncRepository()
+
+    def cambios_desde(self, desde: datetime = None) -> dict:
+        inicio = datetime.utcnow()
+        completo = desde is None or desde < inicio - timedelta(days=self.RETENCION_DIAS)
+        if completo:
+            desde = None
+
+        eliminados = {'reserva': [], 'fecha': [], 'pago': [], 'gasto': []}
+        if desde:
+            for entidad, entidad_id in self.repository.eliminados(desde):
+                eliminados.setdefault(entidad, []).append(entidad_id)
+
+        # Las reservas archivadas desaparecen de las listas activas: viajan como eliminadas
+        reservas_modificadas, reservas_archivadas = [], []
+        for reserva in self.repository.reservas_modificadas(desde):
+            if reserva.estado == 'archivada':
+                reservas_archivadas.append(reserva.id)
+            else:
+                reservas_modificadas.append(reserva)
+
+        pago_schema = PagoSchema()
+        pagos = [
+            {**pago_schema.dump(pago), 'reserva_id': pago.reserva_id}
+            for pago in self.repository.pagos_modificados(desde)
+        ]
+
+        return {
+            'watermark': (inicio - timedelta(seconds=self.MARGEN_SEGUNDOS)).isoformat(),
+            'completo': completo,
+            'reservas': {
+                'modificados': ReservaSchema().dump(reservas_modificadas, many=True),
+                'eliminados': reservas_archivadas + eliminados['reserva'],
+            },
+            'fechas': {
+                'modificados': FechaSchema().dump(self.repository.fechas_modificadas(desde), many=True),
+                'eliminados': eliminados['fecha'],
+            },
+            'pagos': {
+                'modificados': pagos,
+                'eliminados': eliminados['pago'],
+            },
+            'gastos': {
+                'modificados': GastoSchema().dump(self.repository.gastos_modificados(desde), many=True),
+                'eliminados': eliminados['gasto'],
+            },
+        }
+
+    @transactional
+    def purgar_eliminaciones(self) -> int:
+        """
+        Borra las lápidas más viejas que la retención.
+        """
+        return self.repository.purgar_eliminados(datetime.utcnow() - timedelta(days=self.RETENCION_DIAS))
@@ -3,10 +3,12 @@ from contextlib import contextmanager
 from datetime import datetime
 
 from app import db
+from app.caching import cache_protegida
 from app.extensions import cache, db, redis_client
 from app.models import Usuario
 from app.repositories import UsuarioRepository
 from app.utils.decorators import transactional
+from app.utils.metricas import LOCKS
 
 
 class UsuarioService:
@@ -14,6 +16,7 @@ class UsuarioService:
     Servicio para gestionar usuarios con soporte de caché y bloqueos en Redis para concurrencia.
     """
     CACHE_TIMEOUT = 300
+    CACHE_TIMEOUT_NEGATIVO = 30  # IDs inexistentes o inactivos: se recuerdan poco tiempo
     REDIS_LOCK_TIMEOUT = 10
 
     def __init__(self, repository=None):
@@ -28,19 +31,24 @@ class UsuarioService:
         lock_value = str(time.time())
 
         if redis_client.set(lock_key, lock_value, ex=self.REDIS_LOCK_TIMEOUT, nx=True):
+            LOCKS.labels('usuario', 'adquirido').inc()
             try:
                 yield
             finally:
                 redis_client.delete(lock_key)
         else:
+            LOCKS.labels('usuario', 'ocupado').inc()
             raise Exception(f"El recurso está bloqueado para el usuario {usuario_id}.")
 
-    def all(self) -> list[Usuario]:
+    def all(self, campos=None) -> list[Usuario]:
         """
         Obtiene la lista de todos los usuarios (activos), con caché.
+        Con `campos` se reutiliza la lista completa cacheada o se consulta solo lo pedido.
         """
         cached_usuarios = cache.get('usuarios')
         if cached_usuarios is None:
+            if campos:
+                return self.repository.get_all(campos)
             usuarios = self.repository.get_all()
             if usuarios:
                 cache.set('usuarios', usuarios, timeout=self.CACHE_TIMEOUT)
@@ -145,19 +153,16 @@ class UsuarioService:
             cache.delete('usuarios')
             
             return True
+    @cache_protegida('usuario_{usuario_id}', timeout=CACHE_TIMEOUT, ttl_negativo=CACHE_TIMEOUT_NEGATIVO)
     def find(self, usuario_id: int) -> Usuario:
         """
         Busca un usuario por su ID, con caché.
         """
-        cached_usuario = cache.get(f'usuario_{usuario_id}')
-        if cached_usuario is None:
-            usuario = self.repository.get_by_id(usuario_id)
-            # Solo devolvemos si existe y está activo
-            if usuario and getattr(usuario, 'activo', True):
-                cache.set(f'usuario_{usuario_id}', usuario, timeout=self.CACHE_TIMEOUT)
-                return usuario
-            return None
-        return cached_usuario
+        usuario = self.repository.get_by_id(usuario_id)
+        # Solo devolvemos si existe y está activo
+        if usuario and getattr(usuario, 'activo', True):
+            return usuario
+        return None
     def search(self, term: str) -> list[Usuario]:
         """
         Busca usuarios activos por coincidencia de texto.
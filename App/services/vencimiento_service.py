@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from app.extensions import db, redis_client
+from app.models import Reserva
+
+
+class VencimientoService:
+    """
+    Agenda de vencimientos de reservas pendientes sobre un sorted set de Redis.
+    Cada miembro es el ID de la reserva y su score es el timestamp (UTC) de su
+    fecha_vencimiento, así el beat solo toca las entradas ya vencidas.
+    """
+    ZSET_KEY = 'reservas_vencimiento'
+    BATCH_SIZE = 200  # Máximo de reservas que se liberan por ejecución
+    DEFAULT_VENCIMIENTO_HORAS = 72
+
+    # Extrae y elimina de forma atómica las entradas vencidas (evita que dos
+    # workers procesen la misma reserva).
+    _POP_VENCIDAS_LUA = """
+    local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+    if #ids > 0 then
+        redis.call('ZREM', KEYS[1], unpack(ids))
+    end
+    return ids
+    """
+
+    def __init__(self):
+        self._pop_vencidas = redis_client.register_script(self._POP_VENCIDAS_LUA)
+
+    @staticmethod
+    def _score(momento: datetime) -> float:
+        # Las fechas del modelo se guardan en UTC "naive" (datetime.utcnow)
+        return momento.replace(tzinfo=timezone.utc).timestamp()
+
+    def calcular_vencimiento(self, desde: datetime = None) -> datetime:
+        """
+        Devuelve la fecha límite para confirmar una reserva pendiente.
+        """
+        horas = current_app.config.get('RESERVA_VENCIMIENTO_HORAS', self.DEFAULT_VENCIMIENTO_HORAS)
+        return (desde or datetime.utcnow()) + timedelta(hours=horas)
+
+    def programar(self, reserva: Reserva):
+        """
+        Registra (o reprograma) el vencimiento de una reserva pendiente.
+        """
+        if reserva.id is None or reserva.fecha_vencimiento is None:
+            return
+        redis_client.zadd(self.ZSET_KEY, {str(reserva.id): self._score(reserva.fecha_vencimiento)})
+
+    def cancelar(self, reserva_id: int):
+        """
+        Quita la reserva de la agenda (fue confirmada, cancelada o archivada).
+        """
+        redis_client.zrem(self.ZSET_KEY, str(reserva_id))
+
+    def pop_vencidas(self, ahora: datetime = None) -> list[int]:
+        """
+        Extrae de la agenda los IDs cuyo vencimiento ya pasó. O(log N + vencidas).
+        """
+        limite = self._score(ahora or datetime.utcnow())
+        ids = self._pop_vencidas(keys=[self.ZSET_KEY], args=[limite, self.BATCH_SIZE])
+        return [int(reserva_id) for reserva_id in ids]
+
+    def reprogramar(self, vencimientos: dict):
+        """
+        Vuelve a agendar {reserva_id: fecha_vencimiento}, por ejemplo si falló el commit.
+        """
+        if vencimientos:
+            redis_client.zadd(self.ZSET_KEY, {
+                str(reserva_id): self._score(vence) for reserva_id, vence in vencimientos.items()
+            })
+
+    def reconstruir(self) -> int:
+        """
+        Reconstruye la agenda desde PostgreSQL. Las reservas pendientes antiguas sin
+        fecha_vencimiento reciben un plazo nuevo contado desde ahora.
+        """
+        sin_vencimiento = Reserva.query.filter(
+            Reserva.estado == 'pendiente',
+            Reserva.fecha_vencimiento.is_(None)
+        ).update({Reserva.fecha_vencimiento: self.calcular_vencimiento()}, synchronize_session=False)
+        if sin_vencimiento:
+            db.session.commit()
+
+        pendientes = db.session.query(Reserva.id, Reserva.fecha_vencimiento).filter(
+            Reserva.estado == 'pendiente',
+            Reserva.fecha_vencimiento.isnot(None)
+        ).all()
+
+        # Armamos la agenda en una llave temporal y la renombramos de forma atómica
+        # para que el beat nunca vea un set vacío a mitad de la reconstrucción.
+        tmp_key = f"{self.ZSET_KEY}_rebuild"
+        pipe = redis_client.pipeline()
+        pipe.delete(tmp_key)
+        for i in range(0, len(pendientes), 1000):
+            lote = pendientes[i:i + 1000]
+            pipe.zadd(tmp_key, {str(r.id): self._score(r.fecha_vencimiento) for r in lote})
+        if pendientes:
+            pipe.rename(tmp_key, self.ZSET_KEY)
+        else:
+            pipe.delete(self.ZSET_KEY)
+        pipe.execute()
+
+        return len(pendientes)
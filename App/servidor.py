@@ -0,0 +1,184 @@
+import itertools
+import os
+
+from gunicorn.app.base import BaseApplication
+
+# Workers por defecto según la clase: los sync solo atienden una petición a la vez,
+# gthread reparte la espera de E/S entre hilos y gevent entre greenlets.
+CLASES_WORKER = ('sync', 'gthread', 'gevent')
+
+
+def cpus_disponibles() -> int:
+    try:
+        # Respeta el cpuset del contenedor, os.cpu_count() ve todos los núcleos del host
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def workers_por_defecto(clase: str, cpus: int) -> int:
+    if clase == 'sync':
+        return 2 * cpus + 1
+    if clase == 'gthread':
+        return cpus + 1
+    return cpus
+
+
+def concurrencia_worker(config) -> int:
+    """
+    Peticiones que un worker atiende a la vez según su clase (config: el de la app).
+    """
+    clase = config.get('GUNICORN_WORKER_CLASS', 'gthread')
+    if clase == 'sync':
+        return 1
+    if clase == 'gevent':
+        return config.get('GUNICORN_WORKER_CONNECTIONS', 1000)
+    return config.get('GUNICORN_THREADS', 1)
+
+
+def streams_por_worker(config) -> int:
+    """
+    Streams SSE simultáneos por worker. Cada uno ocupa un hilo hasta casi un minuto:
+    con sync no se admite ninguno (ocuparía el único lugar), con gthread una cuarta
+    parte de los hilos (2 con GUNICORN_THREADS=8) y con gevent la mitad de los greenlets.
+
+    Con gthread el tope es solo un resguardo para la API: en producción los streams
+    van al servicio `sse` del compose (gevent, SSE_MAX_CONEXIONES=900 por worker).
+    El cliente que recibe el 503 pasa a consultar /fecha cada 30 segundos.
+    """
+    if config.get('SSE_MAX_CONEXIONES') is not None:
+        return config['SSE_MAX_CONEXIONES']
+    clase = config.get('GUNICORN_WORKER_CLASS', 'gthread')
+    if clase == 'sync':
+        return 0
+    return concurrencia_worker(config) // (2 if clase == 'gevent' else 4)
+
+
+def opciones_gunicorn(config) -> dict:
+    """
+    Arma las opciones de gunicorn a partir de la clase de configuración (GUNICORN_*).
+    """
+    clase = config.GUNICORN_WORKER_CLASS
+    if clase not in CLASES_WORKER:
+        raise ValueError(f"GUNICORN_WORKER_CLASS inválida: {clase} (opciones: {', '.join(CLASES_WORKER)})")
+
+    cpus = config.GUNICORN_CPUS or cpus_disponibles()
+    # Con gevent cada worker crea su app (main.py parchea antes de importarla): con
+    # preload el master abriría conexiones que los workers heredan por fork
+    preload = config.GUNICORN_PRELOAD if config.GUNICORN_PRELOAD is not None else clase != 'gevent'
+    opciones = {
+        'bind': config.GUNICORN_BIND,
+        'worker_class': clase,
+        'workers': config.GUNICORN_WORKERS or workers_por_defecto(clase, cpus),
+        'keepalive': config.GUNICORN_KEEPALIVE,
+        'timeout': config.GUNICORN_TIMEOUT,
+        'graceful_timeout': config.GUNICORN_GRACEFUL_TIMEOUT,
+        'preload_app': preload,
+        'max_requests': config.GUNICORN_MAX_REQUESTS,
+        'max_requests_jitter': config.GUNICORN_MAX_REQUESTS_JITTER,
+        'accesslog': config.GUNICORN_ACCESSLOG,
+        'post_fork': post_fork,
+        'on_starting': on_starting,
+        'child_exit': child_exit,
+    }
+    if config.GUNICORN_MAX_RSS_MB:
+        opciones['post_request'] = reciclar_por_memoria(config.GUNICORN_MAX_RSS_MB, config.GUNICORN_RSS_CADA)
+    if clase == 'gthread':
+        opciones['threads'] = config.GUNICORN_THREADS
+    elif clase == 'gevent':
+        opciones['worker_connections'] = config.GUNICORN_WORKER_CONNECTIONS
+    return opciones
+
+
+def reiniciar_recursos(app=None):
+    """
+    Descarta en el worker recién forkeado las conexiones heredadas del master:
+    el pool de SQLAlchemy, los pools de Redis y el cliente de R2. Compartir un
+    socket entre procesos mezcla respuestas de distintas peticiones.
+    """
+    from app.extensions import cache, db, redis_client
+    from app.utils.storage import reiniciar_cliente_s3
+
+    if app is not None:
+        with app.app_context():
+            for engine in db.engines.values():
+                # close=False: no cierra los sockets que el master sigue usando
+                engine.dispose(close=False)
+            backend = cache.cache
+            for cliente in {getattr(backend, '_write_client', None), getattr(backend, '_read_client', None)} - {None}:
+                cliente.connection_pool.reset()
+
+    redis_client.connection_pool.reset()
+    reiniciar_cliente_s3()
+    # El storage del limiter (redis-py) detecta el cambio de pid por su cuenta
+
+
+def on_starting(server):
+    # Valores de Prometheus de una ejecución anterior (modo multiproceso)
+    from app.utils.metricas import limpiar_directorio
+    limpiar_directorio()
+
+
+def child_exit(server, worker):
+    from app.utils.metricas import proceso_terminado
+    proceso_terminado(worker.pid)
+
+
+def reciclar_por_memoria(maximo_mb: int, cada: int):
+    """
+    Como max_requests, pero por memoria: cada `cada` peticiones el worker mira su
+    RSS y, si pasó el techo, termina las que tiene en curso y el master lo reemplaza.
+    """
+    # El contador se copia en cada worker al forkear
+    peticiones = itertools.count(1)
+
+    def post_request(worker, req, environ, resp):
+        if next(peticiones) % cada or not worker.alive:
+            return
+        from app.utils.memoria import rss_bytes
+        rss_mb = rss_bytes() / (1024 * 1024)
+        if rss_mb > maximo_mb:
+            worker.log.warning("Worker %s con %.0f MB de RSS (máximo %s MB): se recicla", worker.pid, rss_mb, maximo_mb)
+            worker.alive = False
+
+    return post_request
+
+
+def post_fork(server, worker):
+    if server.cfg.worker_class_str == 'gevent':
+        try:
+            # psycopg2 bloquea el hub de gevent si no se lo hace cooperativo
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen no está instalado: las consultas bloquearán el worker gevent")
+
+    reiniciar_recursos(getattr(server.app, 'aplicacion', None))
+
+    # Acciones de POST /memoria (tracemalloc) difundidas a todos los workers
+    from app.extensions import redis_client
+    from app.utils.memoria import escuchar_acciones
+    escuchar_acciones(redis_client, 'web')
+
+
+class GunicornApp(BaseApplication):
+    """
+    Gunicorn embebido. Recibe la factory de la app: con preload_app se crea una
+    vez en el master (los workers la heredan por fork); sin preload, cada worker crea la suya.
+    """
+
+    def __init__(self, factory, options=None):
+        self.options = options or {}
+        self.factory = factory
+        self.aplicacion = None
+        super().__init__()
+
+    def load_config(self):
+        config = {key: value for key, value in self.options.items() if key in self.cfg.settings and value is not None}
+        for key, value in config.items():
+            self.cfg.set(key.lower(), value)
+
+    def load(self):
+        if self.aplicacion is None:
+            self.aplicacion = self.factory()
+        return self.aplicacion
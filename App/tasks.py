@@ -5,14 +5,22 @@ from datetime import datetime, timedelta
 import requests
 
 import sentry_sdk
+from sqlalchemy.orm import contains_eager, joinedload
 from celery import shared_task
+from celery.signals import worker_ready
 from werkzeug.datastructures import FileStorage
 
+# Asegura que las tareas se encolen con la app de Celery configurada (broker/backend propios)
+from app.celery_app import celery  # noqa: F401
+from app.caching.single_flight import refrescar as refrescar_cache
+from app.events import event_bus
 from app.extensions import cache, db
 from app.models import Fecha, Reserva
 from app.services.push_notification_service import PushNotificationService
 from app.utils.storage import upload_file_to_r2
-from app.services import NotificationService
+from app.services import ConsultaLentaService, NotificationService, ReservaService
+from app.services.sync_service import SyncService
+from app.services.vencimiento_service import VencimientoService
 
 @shared_task
 def check_pending_reservations():
@@ -28,6 +36,128 @@ def check_pending_reservations():
         print(f"Tarea 'check_pending_reservations' ejecutada: {pending_reservas} pendientes encontradas.")
 
 
+@shared_task
+def expirar_reservas_vencidas():
+    """
+    Libera las fechas de las reservas pendientes cuyo plazo venció.
+    Solo lee del sorted set las entradas vencidas, sin recorrer la tabla de reservas.
+    """
+    vencimientos = VencimientoService()
+    ids_vencidos = vencimientos.pop_vencidas()
+    if not ids_vencidos:
+        return 0
+
+    ahora = datetime.utcnow()
+    try:
+        # Revalidamos contra la BD: la reserva pudo confirmarse o reprogramarse después de agendarla
+        vencidas = db.session.query(Reserva.id, Reserva.fecha_id, Reserva.usuario_id, Reserva.fecha_vencimiento).filter(
+            Reserva.id.in_(ids_vencidos),
+            Reserva.estado == 'pendiente',
+            Reserva.fecha_vencimiento <= ahora
+        ).with_for_update().all()
+
+        if not vencidas:
+            db.session.rollback()
+            return 0
+
+        reserva_ids = [r.id for r in vencidas]
+        fecha_ids = [r.fecha_id for r in vencidas]
+
+        # Los consumidores invalidan la caché y el calendario al publicarse (post-commit)
+        for r in vencidas:
+            ReservaService.invalidar_mis_reservas(r.usuario_id)
+            event_bus.emitir('reserva.cancelada', reserva_id=r.id, fecha_id=r.fecha_id, usuario_id=r.usuario_id,
+                             estado='cancelada', motivo='vencimiento')
+
+        Reserva.query.filter(Reserva.id.in_(reserva_ids)).update(
+            {Reserva.estado: 'cancelada'}, synchronize_session=False
+        )
+        # Solo liberamos fechas que sigan bloqueadas como 'pendiente'
+        Fecha.query.filter(Fecha.id.in_(fecha_ids), Fecha.estado == 'pendiente').update(
+            {Fecha.estado: 'disponible'}, synchronize_session=False
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        sentry_sdk.capture_exception(e)
+        # Devolvemos las entradas a la agenda para reintentar en la próxima ejecución
+        pendientes = db.session.query(Reserva.id, Reserva.fecha_vencimiento).filter(
+            Reserva.id.in_(ids_vencidos),
+            Reserva.estado == 'pendiente',
+            Reserva.fecha_vencimiento.isnot(None)
+        ).all()
+        vencimientos.reprogramar({r.id: r.fecha_vencimiento for r in pendientes})
+        return 0
+
+    print(f"Tarea 'expirar_reservas_vencidas' ejecutada: {len(reserva_ids)} reserva(s) vencida(s).")
+    return len(reserva_ids)
+
+
+@shared_task
+def reconstruir_vencimientos():
+    """
+    Reconstruye desde PostgreSQL la agenda de vencimientos en Redis.
+    """
+    total = VencimientoService().reconstruir()
+    print(f"Tarea 'reconstruir_vencimientos' ejecutada: {total} reserva(s) pendiente(s) agendada(s).")
+    return total
+
+
+@shared_task
+def purgar_registro_eliminaciones():
+    """
+    Borra las lápidas de sincronización más viejas que la retención.
+    """
+    borradas = SyncService().purgar_eliminaciones()
+    print(f"Tarea 'purgar_registro_eliminaciones' ejecutada: {borradas} registro(s) eliminado(s).")
+    return borradas
+
+
+@shared_task(ignore_result=True)
+def registrar_consultas_lentas(origen: str, consultas: list):
+    """
+    Guarda las consultas lentas de una petición o tarea; a las muestreadas
+    les captura el plan con EXPLAIN (ANALYZE, BUFFERS), o solo el estimado si
+    bloquean filas (FOR UPDATE/SHARE) o escriben.
+    """
+    ConsultaLentaService().registrar(origen, consultas)
+
+
+@shared_task
+def purgar_consultas_lentas():
+    """
+    Borra el registro de consultas lentas más viejo que la retención.
+    """
+    borradas = ConsultaLentaService().purgar()
+    print(f"Tarea 'purgar_consultas_lentas' ejecutada: {borradas} registro(s) eliminado(s).")
+    return borradas
+
+
+@shared_task(ignore_result=True)
+def refrescar_cache_protegida(nombre: str, argumentos: list, kwargs: dict = None, token: str = None):
+    """
+    Refresco anticipado de una entrada de caché vencida (ver app.caching.cache_protegida).
+    Quien encoló la tarea tiene el lease; aquí se recalcula y se libera.
+    """
+    refrescar_cache(nombre, argumentos, kwargs, token)
+
+
+@shared_task(ignore_result=True)
+def reconciliar_uso_cache():
+    """
+    Recalcula la contabilidad de memoria de la caché quitando las llaves vencidas.
+    """
+    backend = cache.cache
+    if hasattr(backend, 'reconciliar'):
+        backend.reconciliar()
+
+
+@worker_ready.connect
+def _reconstruir_vencimientos_al_iniciar(sender=None, **kwargs):
+    # Redis puede haberse reiniciado sin persistencia: al levantar el worker rehacemos la agenda
+    reconstruir_vencimientos.delay()
+
+
 @shared_task
 def check_upcoming_reservations():
     """
@@ -36,7 +166,9 @@ def check_upcoming_reservations():
     today = datetime.utcnow().date()
     
     # Buscamos reservas para mañana
-    upcoming_reservas = Reserva.query.join(Reserva.fecha).filter(
+    upcoming_reservas = Reserva.query.join(Reserva.fecha).options(
+        contains_eager(Reserva.fecha), joinedload(Reserva.usuario)
+    ).filter(
         Reserva.estado == 'confirmada',
         Reserva.fecha.has(dia=today + timedelta(days=1))
     ).all()
@@ -107,24 +239,19 @@ def procesar_reserva_background(reserva_id: int, ruta_archivo_local: str = None)
             fecha.estado = 'pendiente'
             db.session.add(fecha)
 
-        # 4. Guardamos los cambios definitivos (URL de R2 + Estado de la Fecha)
-        db.session.commit()
+        # 4. Al confirmar, el evento invalida la caché del calendario y dispara el aviso por Telegram
+        event_bus.emitir(
+            'reserva.comprobante_procesado',
+            reserva_id=reserva.id,
+            fecha_id=reserva.fecha_id,
+            usuario_id=reserva.usuario_id,
+            estado=reserva.estado
+        )
 
-        # 5. Destruimos la caché para que el calendario de React se actualice al instante
-        cache.delete('fechas')
-        cache.delete(f'fecha_{fecha.id if fecha else "unknown"}')
-        cache.delete('todas_las_fechas')
-        cache.delete('fechas_all')
-
-        # 6. Enviamos la notificación a Telegram
-        try:
-            u = reserva.usuario
-            nombre_cliente = f"{u.nombre} {u.apellido}" if u else "Nuevo Cliente"
-            telegram = PushNotificationService()
-            mensaje = f"👤 *Cliente:* {nombre_cliente}\n📅 *Fecha:* {fecha.dia if fecha else 'N/A'}\n✅ *Reserva solicitada y agendada exitosamente*"
-            telegram.send_notification(mensaje, title="🆕 ¡Nueva Reserva!")
-        except Exception as tel_err:
-            sentry_sdk.capture_exception(tel_err)
+        ReservaService.invalidar_mis_reservas(reserva.usuario_id)
+
+        # 5. Guardamos los cambios definitivos (URL de R2 + Estado de la Fecha)
+        db.session.commit()
 
     except Exception as e:
         db.session.rollback()
@@ -163,6 +290,26 @@ def enviar_contrato_background(reserva_id: int):
         sentry_sdk.capture_exception(e)
         print(f"Error al enviar contrato en background: {e}")
 
+@shared_task
+def notificar_nueva_reserva_async(reserva_id: int):
+    """
+    Tarea en segundo plano: Avisa por Telegram que un cliente solicitó una reserva.
+    """
+    try:
+        reserva = db.session.get(Reserva, reserva_id)
+        if not reserva:
+            return False
+
+        u = reserva.usuario
+        nombre_cliente = f"{u.nombre} {u.apellido}" if u else "Nuevo Cliente"
+        dia = reserva.fecha.dia if reserva.fecha else 'N/A'
+        telegram = PushNotificationService()
+        mensaje = f"👤 *Cliente:* {nombre_cliente}\n📅 *Fecha:* {dia}\n✅ *Reserva solicitada y agendada exitosamente*"
+        return telegram.send_notification(mensaje, title="🆕 ¡Nueva Reserva!")
+    except Exception as tel_err:
+        sentry_sdk.capture_exception(tel_err)
+        return False
+
 @shared_task
 def tarea_enviar_reintegro_async(to_email: str, user_name: str, event_date: str, file_url: str, file_name: str):
     """
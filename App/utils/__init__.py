@@ -1,3 +1,3 @@
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, jwt_required, verificar_jwt
 from app.utils.storage import upload_bytes_to_r2, upload_file_to_r2
 from app.utils.decorators import transactional
\ No newline at end of file
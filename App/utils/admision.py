@@ -0,0 +1,300 @@
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import current_app, g, jsonify, request
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.config.response_builder import ResponseBuilder
+from app.utils import metricas as prometheus
+from app.utils.decorators import verificar_jwt
+
+METODOS_ESCRITURA = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Fracción de la capacidad que puede ocupar cada clase de tráfico: cuando el
+# proceso se llena, las lecturas públicas son las primeras en recibir 503 y
+# las escrituras de administración las últimas.
+PRIORIDADES = {
+    'admin_escritura': 1.0,
+    'escritura': 0.85,
+    'admin_lectura': 0.75,
+    'lectura': 0.6,
+}
+
+
+def lugares_por_clase(capacidad: int) -> dict:
+    """
+    Lugares que puede ocupar cada clase. Con capacidades chicas (8 hilos) las
+    fracciones se redondean hacia arriba pero cada clase deja al menos un lugar
+    para las escrituras de administración; con un solo lugar no hay reparto posible.
+    """
+    return {
+        clase: capacidad if fraccion >= 1 else max(1, min(capacidad - 1, math.ceil(capacidad * fraccion)))
+        for clase, fraccion in PRIORIDADES.items()
+    }
+
+
+# Plazo de la petición en curso, leído por el pool al pedir conexión. ContextVar y no
+# threading.local: un local creado antes del monkey-patch de gevent lo comparten todos
+# los greenlets del worker, y cada greenlet tiene su propio contexto.
+_limite = ContextVar('admision_limite', default=None)
+_timeout_pool = ContextVar('admision_timeout_pool', default=False)
+
+
+def limite_concurrencia(maximo: int):
+    """
+    Limita cuántas peticiones de este endpoint pueden ejecutarse a la vez por proceso.
+    Va justo debajo de @route para que la marca quede en la vista registrada.
+    """
+    def wrapper(fn):
+        fn._limite_concurrencia = maximo
+        return fn
+    return wrapper
+
+
+def sin_admision(fn):
+    """
+    Excluye el endpoint del control de admisión (p. ej. streams SSE de larga duración).
+    """
+    fn._sin_admision = True
+    return fn
+
+
+class MetricasAdmision:
+    """
+    Contadores del proceso: esperas del pool, timeouts y rechazos por clase.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.pool_esperas = 0
+            self.pool_espera_total = 0.0
+            self.pool_espera_maxima = 0.0
+            self.pool_timeouts = 0
+            self.rechazos = {}
+            self.admitidas = {}
+
+    def registrar_espera_pool(self, segundos: float):
+        with self._lock:
+            self.pool_esperas += 1
+            self.pool_espera_total += segundos
+            self.pool_espera_maxima = max(self.pool_espera_maxima, segundos)
+
+    def registrar_timeout_pool(self):
+        with self._lock:
+            self.pool_timeouts += 1
+
+    def registrar(self, tipo: str, clase: str):
+        with self._lock:
+            contador = self.rechazos if tipo == 'rechazo' else self.admitidas
+            contador[clase] = contador.get(clase, 0) + 1
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'pool_esperas': self.pool_esperas,
+                'pool_espera_promedio_ms': round(self.pool_espera_total * 1000 / self.pool_esperas, 2) if self.pool_esperas else 0,
+                'pool_espera_maxima_ms': round(self.pool_espera_maxima * 1000, 2),
+                'pool_timeouts': self.pool_timeouts,
+                'admitidas': dict(self.admitidas),
+                'rechazos': dict(self.rechazos),
+            }
+
+
+metricas = MetricasAdmision()
+
+
+class PoolConPlazo(QueuePool):
+    """
+    QueuePool cuyo timeout de checkout se recorta al tiempo que le queda a la
+    petición actual: una petición nunca espera conexión más allá de su plazo.
+    También mide cuánto se esperó cada checkout.
+    """
+
+    @property
+    def _timeout(self):
+        limite = _limite.get()
+        if limite is None:
+            return self._timeout_base
+        return max(0.0, min(self._timeout_base, limite - time.monotonic()))
+
+    @_timeout.setter
+    def _timeout(self, valor):
+        self._timeout_base = valor
+
+    def recreate(self):
+        # Sin el plazo de la petición que disparó la recreación
+        token = _limite.set(None)
+        try:
+            return super().recreate()
+        finally:
+            _limite.reset(token)
+
+    def _do_get(self):
+        inicio = time.monotonic()
+        resultado = 'error'
+        try:
+            conexion = super()._do_get()
+            resultado = 'ok'
+            return conexion
+        except exc.TimeoutError:
+            resultado = 'timeout'
+            metricas.registrar_timeout_pool()
+            _timeout_pool.set(True)
+            raise
+        finally:
+            espera = time.monotonic() - inicio
+            metricas.registrar_espera_pool(espera)
+            prometheus.POOL_CHECKOUTS.labels(resultado).inc()
+            prometheus.POOL_ESPERA.observe(espera)
+
+
+class ControlAdmision:
+    """
+    Control de admisión por proceso, delante de las vistas:
+
+    - Capacidad total (por defecto la concurrencia real del worker, acotada por el
+      pool) repartida por prioridad: escrituras de admin > escrituras > lecturas de
+      admin > lecturas.
+    - Límites de concurrencia por endpoint (@limite_concurrencia).
+    - Plazo por petición que acota la espera por un lugar y por una conexión del pool.
+    - Si no hay lugar dentro de la espera máxima, 503 inmediato con Retry-After.
+    """
+
+    def __init__(self, app=None):
+        self._condicion = threading.Condition()
+        self._en_curso = 0
+        self._por_endpoint = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        opciones = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        if app.config.get('ADMISION_CAPACIDAD') is None:
+            app.config['ADMISION_CAPACIDAD'] = self.capacidad_por_defecto(app.config, opciones)
+        self._lugares = lugares_por_clase(app.config['ADMISION_CAPACIDAD'])
+        app.config.setdefault('ADMISION_ESPERA_MAXIMA', 0.5)
+        app.config.setdefault('ADMISION_PLAZO_SEGUNDOS', 10)
+        app.config.setdefault('ADMISION_RETRY_AFTER', 2)
+
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        if not uri.startswith('sqlite'):
+            opciones['poolclass'] = PoolConPlazo
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones
+
+        app.before_request(self._admitir)
+        app.after_request(self._timeout_pool_a_503)
+        app.teardown_request(self._liberar)
+        app.extensions['admision'] = self
+
+    @staticmethod
+    def capacidad_por_defecto(config, opciones: dict) -> int:
+        """
+        Lo que el worker atiende a la vez (1 sync, hilos gthread, conexiones gevent)
+        menos los lugares reservados a streams SSE, sin pasar del tamaño del pool:
+        más allá de eso las peticiones solo esperan en la cola de gunicorn o del pool.
+        """
+        from app.servidor import concurrencia_worker, streams_por_worker
+
+        concurrencia = concurrencia_worker(config) - streams_por_worker(config)
+        pool = opciones.get('pool_size', 5) + opciones.get('max_overflow', 10)
+        return max(1, min(concurrencia, pool))
+
+    # --- Clasificación ------------------------------------------------------
+
+    @staticmethod
+    def _es_admin() -> bool:
+        claims = verificar_jwt(opcional=True)
+        return bool(claims) and claims.get('role') == 'administrador'
+
+    def _clase(self) -> str:
+        escritura = request.method in METODOS_ESCRITURA
+        if self._es_admin():
+            return 'admin_escritura' if escritura else 'admin_lectura'
+        return 'escritura' if escritura else 'lectura'
+
+    def _hay_lugar(self, clase: str, endpoint: str, limite_endpoint) -> bool:
+        if self._en_curso >= self._lugares[clase]:
+            return False
+        if limite_endpoint is not None and self._por_endpoint.get(endpoint, 0) >= limite_endpoint:
+            return False
+        return True
+
+    # --- Hooks --------------------------------------------------------------
+
+    def _admitir(self):
+        vista = current_app.view_functions.get(request.endpoint)
+        if vista is None or getattr(vista, '_sin_admision', False) or request.method == 'OPTIONS':
+            return None
+
+        ahora = time.monotonic()
+        limite = ahora + current_app.config['ADMISION_PLAZO_SEGUNDOS']
+        _limite.set(limite)
+        _timeout_pool.set(False)
+
+        clase = self._clase()
+        endpoint = request.endpoint
+        limite_endpoint = getattr(vista, '_limite_concurrencia', None)
+        espera_hasta = min(ahora + current_app.config['ADMISION_ESPERA_MAXIMA'], limite)
+
+        with self._condicion:
+            while not self._hay_lugar(clase, endpoint, limite_endpoint):
+                restante = espera_hasta - time.monotonic()
+                if restante <= 0:
+                    metricas.registrar('rechazo', clase)
+                    prometheus.ADMISION_RECHAZOS.labels(clase).inc()
+                    _limite.set(None)
+                    return self._sobrecargado()
+                self._condicion.wait(restante)
+            self._en_curso += 1
+            self._por_endpoint[endpoint] = self._por_endpoint.get(endpoint, 0) + 1
+
+        g.admision = endpoint
+        metricas.registrar('admitida', clase)
+        return None
+
+    def _liberar(self, exception=None):
+        endpoint = g.pop('admision', None)
+        _limite.set(None)
+        if endpoint is None:
+            return
+        with self._condicion:
+            self._en_curso -= 1
+            self._por_endpoint[endpoint] -= 1
+            self._condicion.notify_all()
+
+    def _timeout_pool_a_503(self, response):
+        # Las rutas capturan Exception y responden 500: si la causa fue el plazo del pool, es sobrecarga
+        if _timeout_pool.get() and response.status_code == 500:
+            _timeout_pool.set(False)
+            return self._sobrecargado()
+        return response
+
+    @staticmethod
+    def _sobrecargado():
+        response_builder = ResponseBuilder()
+        response_builder.add_message("Servicio sobrecargado, reintente en unos segundos.").add_status_code(503)
+        respuesta = jsonify(response_builder.build())
+        respuesta.status_code = 503
+        respuesta.headers['Retry-After'] = str(current_app.config['ADMISION_RETRY_AFTER'])
+        return respuesta
+
+    def estado(self) -> dict:
+        with self._condicion:
+            en_curso = self._en_curso
+            por_endpoint = {k: v for k, v in self._por_endpoint.items() if v}
+        return {
+            'capacidad': current_app.config['ADMISION_CAPACIDAD'],
+            'lugares': dict(self._lugares),
+            'en_curso': en_curso,
+            'por_endpoint': por_endpoint,
+            **metricas.resumen(),
+        }
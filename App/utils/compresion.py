@@ -0,0 +1,154 @@
+import hashlib
+import zlib
+
+import sentry_sdk
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Sin brotli se negocia solo gzip
+    brotli = None
+
+TIPOS_COMPRIMIBLES = (
+    'application/json',
+    'application/pdf',
+    'application/javascript',
+    'text/html',
+    'text/plain',
+    'text/csv',
+)
+
+
+class Compresion:
+    """
+    Compresión gzip/brotli de respuestas según Accept-Encoding.
+
+    - Solo comprime tipos de texto/JSON/PDF por encima de COMPRESION_MIN_BYTES.
+    - Las respuestas en streaming se comprimen por fragmentos (flush en cada
+      uno) sin acumular el cuerpo; text/event-stream nunca se toca.
+    - Los cuerpos grandes se cachean ya comprimidos, identificados por el hash
+      del contenido: una lista que se repite no se vuelve a comprimir.
+    """
+
+    def __init__(self, app=None, cache=None):
+        self.cache = cache
+        if app is not None:
+            self.init_app(app, cache)
+
+    def init_app(self, app, cache=None):
+        self.cache = cache or self.cache
+        app.config.setdefault('COMPRESION_MIN_BYTES', 1024)
+        app.config.setdefault('COMPRESION_NIVEL_GZIP', 6)
+        app.config.setdefault('COMPRESION_NIVEL_BROTLI', 5)
+        app.config.setdefault('COMPRESION_CACHE_MIN_BYTES', 16 * 1024)
+        app.config.setdefault('COMPRESION_CACHE_TTL', 120)
+        self.config = app.config
+        app.after_request(self.comprimir)
+
+    # --- Negociación --------------------------------------------------------
+
+    @staticmethod
+    def _aceptadas(cabecera: str) -> dict:
+        aceptadas = {}
+        for parte in cabecera.split(','):
+            nombre, _, params = parte.strip().partition(';')
+            calidad = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    calidad = float(params.strip()[2:])
+                except ValueError:
+                    calidad = 0.0
+            if nombre:
+                aceptadas[nombre.lower()] = calidad
+        return aceptadas
+
+    def _elegir_codificacion(self):
+        aceptadas = self._aceptadas(request.headers.get('Accept-Encoding', ''))
+        if brotli is not None and aceptadas.get('br', 0) > 0:
+            return 'br'
+        if aceptadas.get('gzip', 0) > 0:
+            return 'gzip'
+        return None
+
+    # --- Compresores --------------------------------------------------------
+
+    def _comprimir_bytes(self, datos: bytes, codificacion: str) -> bytes:
+        if codificacion == 'br':
+            return brotli.compress(datos, quality=self.config['COMPRESION_NIVEL_BROTLI'])
+        compresor = zlib.compressobj(self.config['COMPRESION_NIVEL_GZIP'], zlib.DEFLATED, 31)
+        return compresor.compress(datos) + compresor.flush()
+
+    def _comprimir_stream(self, fragmentos, codificacion: str):
+        if codificacion == 'br':
+            compresor = brotli.Compressor(quality=self.config['COMPRESION_NIVEL_BROTLI'])
+            for fragmento in fragmentos:
+                if isinstance(fragmento, str):
+                    fragmento = fragmento.encode()
+                salida = compresor.process(fragmento) + compresor.flush()
+                if salida:
+                    yield salida
+            yield compresor.finish()
+            return
+
+        compresor = zlib.compressobj(self.config['COMPRESION_NIVEL_GZIP'], zlib.DEFLATED, 31)
+        for fragmento in fragmentos:
+            if isinstance(fragmento, str):
+                fragmento = fragmento.encode()
+            # Z_SYNC_FLUSH: el cliente puede descomprimir cada fragmento apenas llega
+            salida = compresor.compress(fragmento) + compresor.flush(zlib.Z_SYNC_FLUSH)
+            if salida:
+                yield salida
+        yield compresor.flush()
+
+    def _comprimir_con_cache(self, datos: bytes, codificacion: str) -> bytes:
+        if self.cache is None or len(datos) < self.config['COMPRESION_CACHE_MIN_BYTES']:
+            return self._comprimir_bytes(datos, codificacion)
+
+        # Variante comprimida junto a las vistas cacheadas (espacio 'views' de la caché)
+        clave = f"view/comprimido/{codificacion}/{hashlib.blake2b(datos, digest_size=16).hexdigest()}"
+        try:
+            comprimido = self.cache.get(clave)
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+            return self._comprimir_bytes(datos, codificacion)
+        if comprimido is None:
+            comprimido = self._comprimir_bytes(datos, codificacion)
+            try:
+                self.cache.set(clave, comprimido, timeout=self.config['COMPRESION_CACHE_TTL'])
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
+        return comprimido
+
+    # --- Hook ---------------------------------------------------------------
+
+    def _comprimible(self, response) -> bool:
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if 'Content-Encoding' in response.headers or response.direct_passthrough:
+            return False
+        if response.mimetype == 'text/event-stream':
+            return False
+        return response.mimetype in TIPOS_COMPRIMIBLES or response.mimetype.startswith('text/')
+
+    def comprimir(self, response):
+        if not self._comprimible(response):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codificacion = self._elegir_codificacion()
+        if codificacion is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._comprimir_stream(response.response, codificacion)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = codificacion
+            return response
+
+        datos = response.get_data()
+        if len(datos) < self.config['COMPRESION_MIN_BYTES']:
+            return response
+
+        response.set_data(self._comprimir_con_cache(datos, codificacion))
+        response.headers['Content-Encoding'] = codificacion
+        return response
@@ -0,0 +1,130 @@
+import hashlib
+import random
+import re
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import redis
+import sentry_sdk
+
+# Valores literales y marcadores de parámetros (psycopg2 usa %(nombre)s)
+_VALORES = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|%s|\$\d+|\?|\b\d+(?:\.\d+)?\b")
+# IN (?, ?, ?) con distinta cantidad de valores es la misma consulta
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+# Lo que EXPLAIN ANALYZE no puede volver a ejecutar: bloqueos de filas (FOR UPDATE /
+# NO KEY UPDATE / SHARE / KEY SHARE) y CTEs que modifican datos (WITH ... INSERT/UPDATE/DELETE)
+_BLOQUEOS = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b")
+_ESCRITURAS = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE)\b")
+
+# Parámetros cuyo valor nunca se guarda: el nombre del parámetro sale de la columna
+CLAVES_SENSIBLES = ('password', 'contrasena', 'token', 'secret', 'hash', 'correo', 'email',
+                    'dni', 'telefono', 'nombre', 'apellido', 'cbu', 'alias')
+MAX_LARGO_VALOR = 64
+
+
+def normalizar(sentencia: str) -> str:
+    normalizada = _VALORES.sub('?', sentencia)
+    normalizada = _LISTAS.sub('(?)', normalizada)
+    return _ESPACIOS.sub(' ', normalizada).strip()
+
+
+def solo_lectura(sentencia: str) -> bool:
+    """
+    Si se puede ejecutar de nuevo con EXPLAIN ANALYZE sin tomar bloqueos ni escribir:
+    un SELECT ... FOR UPDATE retendría filas de producción hasta el statement_timeout.
+    """
+    # Sin literales: un texto con 'update' adentro no cuenta
+    normalizada = normalizar(sentencia).upper()
+    if not normalizada.startswith(('SELECT', 'WITH')) or _BLOQUEOS.search(normalizada):
+        return False
+    return not (normalizada.startswith('WITH') and _ESCRITURAS.search(normalizada))
+
+
+def huella(sentencia: str) -> str:
+    """
+    Identifica la consulta sin importar los valores: agrupa sus ejecuciones en el registro.
+    """
+    return hashlib.blake2b(normalizar(sentencia).encode(), digest_size=8).hexdigest()
+
+
+def _valor_json(valor):
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return f'<{len(valor)} bytes>'
+    if isinstance(valor, dict):
+        return {str(clave): _valor_json(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_valor_json(v) for v in valor]
+    if valor is None or isinstance(valor, (str, int, float, bool)):
+        return valor
+    return str(valor)
+
+
+def _sensible(clave) -> bool:
+    clave = str(clave).lower()
+    return any(sensible in clave for sensible in CLAVES_SENSIBLES)
+
+
+def _truncar(valor):
+    if isinstance(valor, str) and len(valor) > MAX_LARGO_VALOR:
+        return valor[:MAX_LARGO_VALOR] + '…'
+    if isinstance(valor, list):
+        return [_truncar(v) for v in valor]
+    return valor
+
+
+def redactar(parametros):
+    """
+    Parámetros aptos para guardar: oculta los sensibles y recorta textos largos.
+    Con parámetros posicionales no se sabe a qué columna van: se ocultan todos los textos.
+    """
+    if isinstance(parametros, dict):
+        return {clave: '***' if _sensible(clave) else _truncar(_valor_json(valor))
+                for clave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return ['***' if isinstance(valor, str) else _truncar(_valor_json(valor)) for valor in parametros]
+    return None
+
+
+def _muestrear(identificador: str, muestra: float, intervalo: int) -> bool:
+    """
+    Un EXPLAIN por huella y por intervalo como máximo, y solo para una fracción de las candidatas.
+    """
+    if random.random() >= muestra:
+        return False
+    from app.extensions import redis_client
+    try:
+        return bool(redis_client.set(f'consulta_lenta_explain:{identificador}', 1, ex=int(intervalo), nx=True))
+    except redis.exceptions.RedisError:
+        return False
+
+
+def encolar(origen: str, lentas: list, muestra: float, intervalo: int):
+    """
+    Manda al worker las consultas lentas de una petición o tarea. Solo las muestreadas
+    para EXPLAIN viajan con los parámetros originales (el plan necesita los valores reales).
+    """
+    consultas = []
+    for sentencia, parametros, duracion in lentas:
+        identificador = huella(sentencia)
+        es_select = sentencia.lstrip()[:6].upper() in ('SELECT', 'WITH')
+        explicar = es_select and parametros is not None and _muestrear(identificador, muestra, intervalo)
+        consultas.append({
+            'huella': identificador,
+            'sentencia': sentencia,
+            'parametros': redactar(parametros),
+            'duracion_ms': round(duracion * 1000, 2),
+            'explicar': explicar,
+            'parametros_originales': _valor_json(parametros) if explicar else None,
+        })
+
+    try:
+        from app.tasks import registrar_consultas_lentas
+        registrar_consultas_lentas.delay(origen, consultas)
+    except Exception as e:
+        # El registro de lentas nunca debe romper la respuesta o la tarea que las produjo
+        sentry_sdk.capture_exception(e)
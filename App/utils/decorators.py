@@ -1,17 +1,59 @@
 from functools import wraps
 
-from flask import jsonify
+from flask import current_app, g, jsonify
 from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_jwt_extended.exceptions import NoAuthorizationError
 from app import db
 
+
+def verificar_jwt(opcional: bool = False):
+    """
+    Decodifica y valida el token una sola vez por petición y devuelve sus claims.
+    El resultado (o el error) queda en `g`: el contexto de Sentry, el control de
+    admisión, @jwt_required y @admin_required lo reutilizan sin volver a verificar
+    la firma. Con `opcional` devuelve None si no hay token o es inválido.
+    """
+    if '_auth_verificado' not in g:
+        g._auth_verificado = True
+        g._auth_error = None
+        try:
+            # Deja los claims donde los busca flask_jwt_extended (get_jwt, get_jwt_identity)
+            verify_jwt_in_request(optional=True)
+        except Exception as e:
+            g._auth_error = e
+
+    if g._auth_error is not None:
+        if opcional:
+            return None
+        raise g._auth_error
+
+    claims = get_jwt()
+    if not claims:
+        if opcional:
+            return None
+        raise NoAuthorizationError("Missing Authorization Header")
+    return claims
+
+
+def jwt_required():
+    """
+    Reemplazo de flask_jwt_extended.jwt_required que usa la verificación única de la petición.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            verificar_jwt()
+            return current_app.ensure_sync(fn)(*args, **kwargs)
+        return decorator
+    return wrapper
+
+
 def admin_required():
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            # Verifica que hay un token válido
-            verify_jwt_in_request()
-            # Obtiene los "claims" (datos adicionales) del token
-            claims = get_jwt()
+            # Verifica que hay un token válido y obtiene sus "claims" (ya decodificados si otro los pidió antes)
+            claims = verificar_jwt()
             # Si el rol es 'administrador', permite el acceso
             if claims.get("role") == "administrador":
                 return fn(*args, **kwargs)
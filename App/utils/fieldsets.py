@@ -0,0 +1,39 @@
+from functools import lru_cache
+
+from marshmallow import ValidationError
+
+
+def parse_fields(raw: str):
+    """
+    Convierte '?fields=id,estado,usuario.nombre' en una tupla de campos.
+    Devuelve None si no se pidió una proyección.
+    """
+    if not raw:
+        return None
+    campos = tuple(dict.fromkeys(c.strip() for c in raw.split(',') if c.strip()))
+    return campos or None
+
+
+def schema_con_campos(schema_cls, campos=None, **kwargs):
+    """
+    Instancia el schema limitado a los campos pedidos (only=).
+    Marshmallow valida los nombres; un campo inexistente se informa como ValidationError.
+    """
+    if kwargs:
+        return _instanciar(schema_cls, campos, **kwargs)
+    # Las instancias se reutilizan: así el dump precompilado se genera una sola vez por proyección
+    return _schema_compartido(schema_cls, campos)
+
+
+@lru_cache(maxsize=128)
+def _schema_compartido(schema_cls, campos):
+    return _instanciar(schema_cls, campos)
+
+
+def _instanciar(schema_cls, campos, **kwargs):
+    if not campos:
+        return schema_cls(**kwargs)
+    try:
+        return schema_cls(only=campos, **kwargs)
+    except ValueError as e:
+        raise ValidationError({'fields': [str(e)]})
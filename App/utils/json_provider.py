@@ -0,0 +1,46 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Sin orjson seguimos con el encoder estándar de Flask
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask respaldado por orjson (encoder en C).
+
+    Las fechas pasan por el `default` de Flask (OPT_PASSTHROUGH_DATETIME) para
+    que las respuestas mantengan exactamente el mismo formato que antes; los
+    schemas ya entregan las fechas como texto ISO, así que en las listas ese
+    camino casi no se usa. En modo debug se conserva la salida indentada.
+    """
+    sort_keys = False
+
+    if orjson is not None:
+        OPCIONES = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _usar_orjson(self, kwargs) -> bool:
+        if orjson is None or kwargs:
+            return False
+        # compact=None sigue la convención de Flask: indentado solo en debug
+        return self.compact or (self.compact is None and not self._app.debug)
+
+    def _a_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self.OPCIONES)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if not self._usar_orjson(kwargs):
+            return super().dumps(obj, **kwargs)
+        return self._a_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self._usar_orjson({}):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._a_bytes(obj) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,266 @@
+import gc
+import json
+import os
+import resource
+import socket
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+
+_PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_MB = 1024 * 1024
+
+# Snapshots de tracemalloc de este proceso, por nombre (los más viejos se descartan)
+MAX_SNAPSHOTS = 5
+_snapshots = OrderedDict()
+_lock = threading.Lock()
+
+# Memoria del propio tracemalloc y del sistema de imports: ruido en los reportes
+_FILTROS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+AGRUPACIONES = ('lineno', 'filename', 'traceback')
+ACCIONES = ('reporte', 'iniciar', 'detener', 'snapshot', 'diferencia')
+
+
+def rss_bytes(pid: int = None) -> int:
+    """
+    RSS actual del proceso (por defecto el propio) leído de /proc.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGINA
+    except (OSError, ValueError, IndexError):
+        if pid is None:
+            # Sin /proc solo se conoce el pico
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return 0
+
+
+def procesos_hijos(padre: int) -> list:
+    """
+    RSS de los procesos hijos de `padre`: los workers de gunicorn (hijos del master)
+    o los procesos del pool de Celery (hijos del worker principal).
+    """
+    procesos = []
+    try:
+        pids = [int(nombre) for nombre in os.listdir('/proc') if nombre.isdigit()]
+    except OSError:
+        return procesos
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as stat:
+                # El nombre del comando va entre paréntesis y puede tener espacios
+                ppid = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == padre:
+            procesos.append({'pid': pid, 'rss_mb': round(rss_bytes(pid) / _MB, 1)})
+    return sorted(procesos, key=lambda proceso: -proceso['rss_mb'])
+
+
+# --- tracemalloc ------------------------------------------------------------
+
+def iniciar_tracemalloc(marcos: int = 1) -> bool:
+    """
+    Empieza a trazar las asignaciones de este proceso. Cuesta CPU y memoria
+    mientras está activo: se prende para investigar y se apaga después.
+    """
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(marcos)
+    return True
+
+
+def detener_tracemalloc():
+    with _lock:
+        _snapshots.clear()
+    tracemalloc.stop()
+
+
+def _snapshot():
+    if not tracemalloc.is_tracing():
+        raise ValueError("tracemalloc no está activo en este proceso")
+    return tracemalloc.take_snapshot().filter_traces(_FILTROS)
+
+
+def tomar_snapshot(nombre: str = None) -> str:
+    snapshot = _snapshot()
+    with _lock:
+        nombre = nombre or f's{len(_snapshots) + 1}'
+        _snapshots.pop(nombre, None)
+        _snapshots[nombre] = snapshot
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return nombre
+
+
+def _ubicacion(traceback, agrupar: str) -> str:
+    marco = traceback[0]
+    if agrupar == 'filename':
+        return marco.filename
+    if agrupar == 'traceback':
+        return ' <- '.join(f'{m.filename}:{m.lineno}' for m in reversed(traceback))
+    return f'{marco.filename}:{marco.lineno}'
+
+
+def top(limite: int = 15, agrupar: str = 'lineno') -> list:
+    """
+    Dónde está la memoria asignada ahora, por línea o por archivo.
+    """
+    return [{
+        'ubicacion': _ubicacion(estadistica.traceback, agrupar),
+        'kb': round(estadistica.size / 1024, 1),
+        'bloques': estadistica.count,
+    } for estadistica in _snapshot().statistics(agrupar)[:limite]]
+
+
+def diferencia(desde: str, hasta: str = None, limite: int = 15, agrupar: str = 'lineno') -> list:
+    """
+    Qué creció entre dos snapshots guardados (o entre uno y el momento actual).
+    """
+    with _lock:
+        anterior = _snapshots.get(desde)
+        posterior = _snapshots.get(hasta) if hasta else None
+    if anterior is None or (hasta and posterior is None):
+        raise KeyError(f"Snapshot inexistente: {hasta if anterior is not None else desde}")
+    posterior = posterior or _snapshot()
+    return [{
+        'ubicacion': _ubicacion(estadistica.traceback, agrupar),
+        'diferencia_kb': round(estadistica.size_diff / 1024, 1),
+        'kb': round(estadistica.size / 1024, 1),
+        'diferencia_bloques': estadistica.count_diff,
+    } for estadistica in posterior.compare_to(anterior, agrupar)[:limite]]
+
+
+def reporte(limite: int = 15, agrupar: str = 'lineno', padre: int = None) -> dict:
+    """
+    Estado de la memoria de este proceso: RSS (actual y pico), el de los procesos
+    hermanos/hijos de `padre`, el recolector de basura y, si tracemalloc está
+    activo, las asignaciones más grandes.
+    """
+    trazando = tracemalloc.is_tracing()
+    datos = {
+        'pid': os.getpid(),
+        'rss_mb': round(rss_bytes() / _MB, 1),
+        'rss_pico_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'gc': {'conteos': gc.get_count(), 'no_recolectables': len(gc.garbage)},
+        'tracemalloc': {'activo': trazando, 'snapshots': list(_snapshots)},
+    }
+    if padre is not None:
+        datos['procesos'] = procesos_hijos(padre)
+    if trazando:
+        actual, pico = tracemalloc.get_traced_memory()
+        datos['tracemalloc'].update({
+            'trazada_mb': round(actual / _MB, 1),
+            'pico_trazado_mb': round(pico / _MB, 1),
+            'top': top(limite, agrupar),
+        })
+    return datos
+
+
+def validar(accion: str, agrupar: str = 'lineno'):
+    if accion not in ACCIONES:
+        raise ValueError(f"Acción inválida (opciones: {', '.join(ACCIONES)})")
+    if agrupar not in AGRUPACIONES:
+        raise ValueError(f"Agrupación inválida (opciones: {', '.join(AGRUPACIONES)})")
+
+
+def ejecutar(accion: str, limite: int = 15, agrupar: str = 'lineno', nombre: str = None,
+             desde: str = None, hasta: str = None, padre: int = None, marcos: int = 1) -> dict:
+    """
+    Ejecuta la acción en este proceso (ver difundir para hacerlo en todos los de un rol).
+    """
+    validar(accion, agrupar)
+    if accion == 'iniciar':
+        iniciar_tracemalloc(marcos)
+    elif accion == 'detener':
+        detener_tracemalloc()
+    elif accion == 'snapshot':
+        return {'pid': os.getpid(), 'snapshot': tomar_snapshot(nombre)}
+    elif accion == 'diferencia':
+        return {'pid': os.getpid(), 'desde': desde, 'hasta': hasta or 'ahora',
+                'diferencias': diferencia(desde, hasta, limite, agrupar)}
+    return reporte(limite, agrupar, padre)
+
+
+# --- Acciones en todos los procesos -----------------------------------------
+# tracemalloc y los snapshots son de cada proceso, y quien recibe la orden (un
+# worker de gunicorn cualquiera, el proceso principal de Celery) no es el que hay
+# que medir. Cada proceso de un rol ('web': workers de gunicorn, 'worker': pool de
+# Celery) escucha un canal pub/sub y responde con su pid en una lista de Redis:
+# 'snapshot' y 'diferencia' llegan siempre a los mismos procesos.
+
+ESPERA_RESPUESTAS = 3.0
+RESPUESTAS_TTL = 60
+
+
+def _canal(rol: str) -> str:
+    return f'memoria:acciones:{rol}'
+
+
+def _responder(cliente, pedido: dict):
+    if pedido.get('pid') and pedido['pid'] != os.getpid():
+        return
+    try:
+        resultado = ejecutar(**pedido['parametros'])
+    except (KeyError, ValueError) as e:
+        resultado = {'pid': os.getpid(), 'error': str(e).strip("'\"")}
+    resultado['host'] = socket.gethostname()
+    respuestas = f"memoria:respuestas:{pedido['id']}"
+    pipe = cliente.pipeline(transaction=False)
+    pipe.rpush(respuestas, json.dumps(resultado, default=str))
+    pipe.expire(respuestas, RESPUESTAS_TTL)
+    pipe.execute()
+
+
+def escuchar_acciones(cliente, rol: str) -> threading.Thread:
+    """
+    Hilo que atiende las acciones difundidas a `rol`. Se inicia en cada proceso
+    después del fork (post_fork de gunicorn, worker_process_init de Celery).
+    """
+    def escuchar():
+        while True:
+            try:
+                pubsub = cliente.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(_canal(rol))
+                for mensaje in pubsub.listen():
+                    _responder(cliente, json.loads(mensaje['data']))
+            except Exception:
+                # Redis caído o reiniciado: se vuelve a suscribir
+                time.sleep(5)
+
+    hilo = threading.Thread(target=escuchar, name=f'memoria-{rol}', daemon=True)
+    hilo.start()
+    return hilo
+
+
+def difundir(cliente, rol: str, parametros: dict, pid: int = None, espera: float = ESPERA_RESPUESTAS) -> list | None:
+    """
+    Ejecuta la acción en todos los procesos de `rol` (o solo en `pid`) y junta sus
+    respuestas, ordenadas por pid. None si ningún proceso escucha (servidor de
+    desarrollo, Celery con --pool=solo): la acción va en el proceso actual.
+    """
+    validar(parametros.get('accion'), parametros.get('agrupar', 'lineno'))
+    pedido_id = uuid.uuid4().hex
+    suscriptos = cliente.publish(_canal(rol), json.dumps({'id': pedido_id, 'pid': pid, 'parametros': parametros}))
+    if not suscriptos:
+        return None
+
+    esperadas = 1 if pid else suscriptos
+    respuestas = []
+    limite = time.monotonic() + espera
+    while len(respuestas) < esperadas:
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            break
+        item = cliente.blpop(f'memoria:respuestas:{pedido_id}', timeout=restante)
+        if item is None:
+            break
+        respuestas.append(json.loads(item[1]))
+    return sorted(respuestas, key=lambda respuesta: respuesta['pid'])
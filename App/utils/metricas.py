@@ -0,0 +1,155 @@
+import os
+import shutil
+import time
+
+# En modo multiproceso (gunicorn con varios workers, Celery prefork) cada proceso
+# escribe sus valores en archivos de este directorio y /metrics los agrega.
+DIRECTORIO_MULTIPROCESO = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if DIRECTORIO_MULTIPROCESO:
+    os.makedirs(DIRECTORIO_MULTIPROCESO, exist_ok=True)
+
+from flask import Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_ESPERA_POOL = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SQL = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+LATENCIA_PETICIONES = Histogram(
+    'salon_http_request_duration_seconds', 'Duración de las peticiones HTTP',
+    ('blueprint', 'endpoint', 'metodo', 'estado'), buckets=BUCKETS_LATENCIA)
+SQL_POR_PETICION = Histogram(
+    'salon_sql_statements_per_request', 'Sentencias SQL ejecutadas por petición',
+    ('endpoint',), buckets=BUCKETS_SQL)
+# resultado: ok (se obtuvo la conexión), timeout (venció esperando) o error (no se pudo conectar)
+POOL_CHECKOUTS = Counter('salon_db_pool_checkouts_total', 'Checkouts del pool de SQLAlchemy por resultado',
+                         ('resultado',))
+POOL_ESPERA = Histogram('salon_db_pool_wait_seconds', 'Espera por una conexión del pool', buckets=BUCKETS_ESPERA_POOL)
+ADMISION_RECHAZOS = Counter('salon_admision_rechazos_total', 'Peticiones rechazadas con 503 por sobrecarga', ('clase',))
+CACHE_OPERACIONES = Counter(
+    'salon_cache_lecturas_total', 'Lecturas de la caché por espacio y resultado',
+    ('espacio', 'resultado'))
+LOCKS = Counter(
+    'salon_redis_lock_total', 'Intentos de tomar un redis_lock de los servicios',
+    ('recurso', 'resultado'))
+TAREAS_DURACION = Histogram(
+    'salon_celery_task_duration_seconds', 'Duración de las tareas de Celery',
+    ('tarea', 'estado'), buckets=BUCKETS_LATENCIA)
+TAREAS_FALLIDAS = Counter('salon_celery_task_failures_total', 'Tareas de Celery que terminaron con excepción', ('tarea',))
+
+
+def registro():
+    """
+    Registro a exponer: en multiproceso uno nuevo por lectura que agrega los archivos de todos los procesos.
+    """
+    if not DIRECTORIO_MULTIPROCESO:
+        return REGISTRY
+    registro_multiproceso = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro_multiproceso)
+    return registro_multiproceso
+
+
+def limpiar_directorio():
+    """
+    Borra los valores de una ejecución anterior (al arrancar el master de gunicorn o el worker de Celery).
+    """
+    if DIRECTORIO_MULTIPROCESO and os.path.isdir(DIRECTORIO_MULTIPROCESO):
+        for nombre in os.listdir(DIRECTORIO_MULTIPROCESO):
+            ruta = os.path.join(DIRECTORIO_MULTIPROCESO, nombre)
+            if os.path.isdir(ruta):
+                shutil.rmtree(ruta, ignore_errors=True)
+            else:
+                os.remove(ruta)
+
+
+def proceso_terminado(pid: int):
+    if DIRECTORIO_MULTIPROCESO:
+        multiprocess.mark_process_dead(pid)
+
+
+class ProfundidadColas:
+    """
+    Collector que lee en el momento del scrape cuántos mensajes esperan en cada cola del broker.
+    """
+
+    def __init__(self, broker_url: str, colas):
+        self.broker_url = broker_url
+        self.colas = tuple(colas)
+
+    def collect(self):
+        import redis
+
+        metrica = GaugeMetricFamily('salon_celery_queue_depth', 'Mensajes pendientes en la cola del broker',
+                                    labels=('cola',))
+        try:
+            cliente = redis.Redis.from_url(self.broker_url, socket_timeout=1)
+            for cola in self.colas:
+                metrica.add_metric((cola,), cliente.llen(cola))
+        except redis.exceptions.RedisError:
+            return
+        yield metrica
+
+
+class Metricas:
+    """
+    Instrumentación Prometheus de la app:
+
+    - Latencia por blueprint/endpoint/método/estado y sentencias SQL por petición.
+    - GET /metrics (fuera de /api, Traefik no lo publica) con los valores agregados
+      de todos los workers y la profundidad de las colas de Celery.
+    - METRICS_TOKEN opcional: si está definido, /metrics exige `Authorization: Bearer <token>`.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_TOKEN', os.getenv('METRICS_TOKEN'))
+        app.config.setdefault('METRICS_COLAS_CELERY', ('celery',))
+        self.config = app.config
+        app.before_request(self._inicio)
+        app.after_request(self._fin)
+
+        from app.utils.admision import sin_admision
+
+        @sin_admision
+        def metricas():
+            return self.exponer()
+
+        app.add_url_rule('/metrics', 'metricas', metricas, methods=['GET'])
+        app.extensions['metricas'] = self
+
+    def _inicio(self):
+        g._metricas_inicio = time.perf_counter()
+
+    def _fin(self, response):
+        inicio = g.get('_metricas_inicio')
+        if inicio is None or request.endpoint in (None, 'metricas', 'static'):
+            return response
+        blueprint = request.blueprint or ''
+        LATENCIA_PETICIONES.labels(blueprint, request.endpoint, request.method, str(response.status_code)) \
+            .observe(time.perf_counter() - inicio)
+        # Lo cuenta PerfilSQL (app.utils.perfil_sql), que cierra su contexto antes que este hook
+        perfil = g.get('perfil_sql')
+        if perfil is not None:
+            SQL_POR_PETICION.labels(request.endpoint).observe(perfil.sentencias)
+        return response
+
+    def exponer(self):
+        token = self.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('No autorizado\n', status=401, mimetype='text/plain')
+
+        # La profundidad de las colas se lee en el momento, no la escribe ningún proceso
+        colas = CollectorRegistry()
+        broker = os.getenv('CELERY_BROKER_URL') or self._broker_por_defecto()
+        colas.register(ProfundidadColas(broker, self.config['METRICS_COLAS_CELERY']))
+        return Response(generate_latest(registro()) + generate_latest(colas), mimetype=CONTENT_TYPE_LATEST)
+
+    @staticmethod
+    def _broker_por_defecto() -> str:
+        base = f"redis://:{os.getenv('REDIS_PASSWORD', '1234')}@{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', 6379)}"
+        return f"{base}/{os.getenv('CELERY_BROKER_DB', 0)}"
@@ -0,0 +1,198 @@
+import time
+from contextvars import ContextVar
+
+import sentry_sdk
+from flask import current_app, g, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Contexto de la petición o tarea en curso (por hilo/greenlet); None fuera de ellas
+_contexto = ContextVar('contexto_sql', default=None)
+
+# Consultas lentas que se guardan por petición o tarea (el resto solo se cuenta)
+MAX_LENTAS = 20
+
+
+class PresupuestoSQLExcedido(Exception):
+    pass
+
+
+class ContextoSQL:
+    """
+    Sentencias y tiempo de SQL de una petición o tarea. Agrupa por texto de la
+    sentencia: con parámetros enlazados, la misma consulta con distintos valores
+    tiene el mismo texto, así un N+1 aparece como una sentencia repetida N veces.
+    Las que tardan más que `umbral_lento` (segundos) se guardan con sus parámetros
+    en `lentas` para el registro de consultas lentas (app.utils.consultas_lentas).
+    `cache` cuenta las lecturas de la caché de la misma petición por resultado.
+    """
+    __slots__ = ('nombre', 'presupuesto', 'umbral_lento', 'sentencias', 'duracion', 'por_sentencia', 'lentas', 'cache')
+
+    def __init__(self, nombre: str, presupuesto: int = None, umbral_lento: float = None):
+        self.nombre = nombre
+        self.presupuesto = presupuesto
+        self.umbral_lento = umbral_lento
+        self.sentencias = 0
+        self.duracion = 0.0
+        self.por_sentencia = {}
+        self.lentas = []
+        self.cache = {}
+
+    def registrar(self, sentencia: str, duracion: float, parametros=None):
+        self.sentencias += 1
+        self.duracion += duracion
+        self.por_sentencia[sentencia] = self.por_sentencia.get(sentencia, 0) + 1
+        if self.umbral_lento is not None and duracion >= self.umbral_lento and len(self.lentas) < MAX_LENTAS:
+            # Los EXPLAIN del propio registro y sus escrituras no se vuelven a registrar
+            if sentencia.lstrip()[:7].upper() != 'EXPLAIN' and 'consulta_lenta' not in sentencia:
+                self.lentas.append((sentencia, parametros, duracion))
+
+    def repetidas(self, umbral: int) -> dict:
+        return {sentencia: n for sentencia, n in self.por_sentencia.items() if n >= umbral}
+
+    @property
+    def excedido(self) -> bool:
+        return self.presupuesto is not None and self.sentencias > self.presupuesto
+
+    def resumen(self, umbral_repetidas: int) -> dict:
+        return {
+            'nombre': self.nombre,
+            'sentencias': self.sentencias,
+            'duracion_ms': round(self.duracion * 1000, 2),
+            'presupuesto': self.presupuesto,
+            'repetidas': [{'sentencia': s[:300], 'veces': n}
+                          for s, n in sorted(self.repetidas(umbral_repetidas).items(), key=lambda x: -x[1])],
+        }
+
+
+def iniciar(nombre: str, presupuesto: int = None, umbral_lento: float = None):
+    return _contexto.set(ContextoSQL(nombre, presupuesto, umbral_lento))
+
+
+def terminar(token) -> ContextoSQL:
+    contexto = _contexto.get()
+    _contexto.reset(token)
+    return contexto
+
+
+def actual():
+    return _contexto.get()
+
+
+def contar_cache(resultado: str):
+    contexto = _contexto.get()
+    if contexto is not None:
+        contexto.cache[resultado] = contexto.cache.get(resultado, 0) + 1
+
+
+def presupuesto_sql(maximo: int):
+    """
+    Máximo de sentencias SQL para este endpoint (por defecto SQL_PRESUPUESTO).
+    Va justo debajo de @route para que la marca quede en la vista registrada.
+    """
+    def wrapper(fn):
+        fn._presupuesto_sql = maximo
+        return fn
+    return wrapper
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _contexto.get() is not None:
+        conn.info.setdefault('perfil_sql_inicios', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    contexto = _contexto.get()
+    inicios = conn.info.get('perfil_sql_inicios')
+    if contexto is None or not inicios:
+        return
+    # En executemany (inserciones masivas) los parámetros no sirven para un EXPLAIN
+    contexto.registrar(statement, time.perf_counter() - inicios.pop(), None if executemany else parameters)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _error(contexto_excepcion):
+    # La sentencia falló: no llega a after_cursor_execute
+    conexion = contexto_excepcion.connection
+    if conexion is not None and conexion.info.get('perfil_sql_inicios'):
+        conexion.info['perfil_sql_inicios'].pop()
+
+
+class PerfilSQL:
+    """
+    Cuenta sentencias y tiempo de SQL por petición y detecta N+1.
+
+    - SQL_PRESUPUESTO: máximo de sentencias por petición (None: sin límite);
+      @presupuesto_sql(n) lo fija por endpoint. Con SQL_PRESUPUESTO_ESTRICTO
+      (tests) excederlo responde 500; si no, solo se registra.
+    - SQL_N_MAS_1_UMBRAL: veces que una misma sentencia puede repetirse antes de avisar.
+    - SQL_CABECERAS: agrega X-SQL-Count y Server-Timing (nunca en producción).
+    - SQL_LENTA_UMBRAL_MS: las sentencias más lentas se registran en la tabla
+      consulta_lenta (con un EXPLAIN muestreado) al terminar la petición.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SQL_PRESUPUESTO', None)
+        app.config.setdefault('SQL_PRESUPUESTO_ESTRICTO', False)
+        app.config.setdefault('SQL_N_MAS_1_UMBRAL', 5)
+        app.config.setdefault('SQL_CABECERAS', False)
+        app.config.setdefault('SQL_LENTA_UMBRAL_MS', None)
+        app.config.setdefault('SQL_LENTA_EXPLAIN_MUESTRA', 0.1)
+        app.config.setdefault('SQL_LENTA_EXPLAIN_INTERVALO', 3600)
+        app.before_request(self._iniciar)
+        app.after_request(self._terminar)
+        app.teardown_request(self._limpiar)
+
+    def _iniciar(self):
+        vista = current_app.view_functions.get(request.endpoint)
+        presupuesto = getattr(vista, '_presupuesto_sql', current_app.config['SQL_PRESUPUESTO'])
+        umbral_ms = current_app.config['SQL_LENTA_UMBRAL_MS']
+        g._perfil_sql_token = iniciar(request.endpoint or request.path, presupuesto,
+                                      umbral_ms / 1000 if umbral_ms is not None else None)
+
+    def _terminar(self, response):
+        token = g.pop('_perfil_sql_token', None)
+        if token is None:
+            return response
+        contexto = g.perfil_sql = terminar(token)
+        config = current_app.config
+
+        repetidas = contexto.repetidas(config['SQL_N_MAS_1_UMBRAL'])
+        if repetidas:
+            current_app.logger.warning(
+                "Posible N+1 en %s: %s", contexto.nombre,
+                "; ".join(f"{n}x {sentencia[:160]}" for sentencia, n in repetidas.items()))
+
+        if config['SQL_CABECERAS']:
+            response.headers['X-SQL-Count'] = str(contexto.sentencias)
+            response.headers.add('Server-Timing', f'db;dur={contexto.duracion * 1000:.1f};desc="{contexto.sentencias} SQL"')
+            if repetidas:
+                response.headers['X-SQL-Repetidas'] = str(sum(repetidas.values()))
+
+        if contexto.lentas:
+            from app.utils.consultas_lentas import encolar
+            encolar(f"{request.method} {request.url_rule or request.path}", contexto.lentas,
+                    config['SQL_LENTA_EXPLAIN_MUESTRA'], config['SQL_LENTA_EXPLAIN_INTERVALO'])
+
+        if contexto.excedido:
+            mensaje = f"Presupuesto SQL excedido en {contexto.nombre}: {contexto.sentencias} > {contexto.presupuesto}"
+            if config['SQL_PRESUPUESTO_ESTRICTO']:
+                respuesta = jsonify(message=mensaje, status_code=500,
+                                    data=contexto.resumen(config['SQL_N_MAS_1_UMBRAL']))
+                respuesta.status_code = 500
+                return respuesta
+            current_app.logger.warning(mensaje)
+            sentry_sdk.capture_exception(PresupuestoSQLExcedido(mensaje))
+        return response
+
+    def _limpiar(self, exception=None):
+        # Si la vista lanzó una excepción no pasa por after_request
+        token = g.pop('_perfil_sql_token', None)
+        if token is not None:
+            _contexto.reset(token)
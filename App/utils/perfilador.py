@@ -0,0 +1,150 @@
+import json
+import time
+import uuid
+from datetime import datetime
+
+import redis
+import sentry_sdk
+from flask import current_app, g, request
+
+from app.extensions import redis_client
+from app.utils.decorators import verificar_jwt
+
+CLAVE_INDICE = 'perfiles'
+FORMATOS = ('texto', 'html', 'speedscope')
+
+
+def _clave(id: str, parte: str) -> str:
+    return f'perfil:{id}:{parte}'
+
+
+def guardar(resumen: dict, sesion: dict, ttl: int, maximo: int):
+    """
+    Guarda el resumen y la sesión de pyinstrument (JSON, se renderiza al leerla).
+    El índice conserva los `maximo` más recientes; el TTL borra el resto.
+    """
+    id = resumen['id']
+    with redis_client.pipeline() as pipe:
+        pipe.set(_clave(id, 'resumen'), json.dumps(resumen), ex=ttl)
+        pipe.set(_clave(id, 'sesion'), json.dumps(sesion), ex=ttl)
+        pipe.lpush(CLAVE_INDICE, id)
+        pipe.ltrim(CLAVE_INDICE, 0, maximo - 1)
+        pipe.execute()
+
+
+def listar() -> list:
+    ids = redis_client.lrange(CLAVE_INDICE, 0, -1)
+    if not ids:
+        return []
+    resumenes = redis_client.mget([_clave(id, 'resumen') for id in ids])
+    return [json.loads(resumen) for resumen in resumenes if resumen]
+
+
+def obtener(id: str) -> dict:
+    resumen = redis_client.get(_clave(id, 'resumen'))
+    return json.loads(resumen) if resumen else None
+
+
+def renderizar(id: str, formato: str) -> str:
+    """
+    Árbol de llamadas en texto, flame graph HTML de pyinstrument o archivo para speedscope.app.
+    """
+    crudo = redis_client.get(_clave(id, 'sesion'))
+    if crudo is None:
+        return None
+
+    from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer, SpeedscopeRenderer
+    from pyinstrument.session import Session
+
+    sesion = Session.from_json(json.loads(crudo))
+    if formato == 'html':
+        return HTMLRenderer().render(sesion)
+    if formato == 'speedscope':
+        return SpeedscopeRenderer().render(sesion)
+    return ConsoleRenderer(unicode=True, color=False, show_all=False).render(sesion)
+
+
+class Perfilador:
+    """
+    Perfil de una petición a pedido de un administrador: con la cabecera
+    `X-Perfilar: 1` (o `?_perfilar=1`) y un token de administrador, la petición
+    corre bajo el profiler por muestreo de pyinstrument. El resultado se guarda
+    en Redis junto con las sentencias SQL y las lecturas de caché de esa
+    petición, y la respuesta trae su id en `X-Perfil-Id` (ver GET /perfiles/<id>).
+
+    Sin la cabecera el costo es buscarla en la petición. Va después de Metricas
+    y antes de PerfilSQL: cierra el perfil cuando PerfilSQL ya dejó su contexto en g.
+    En las respuestas en streaming solo se perfila la vista, no la generación.
+    """
+    CABECERA = 'X-Perfilar'
+    PARAMETRO = '_perfilar'
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PERFILADOR_HABILITADO', True)
+        app.config.setdefault('PERFILADOR_INTERVALO', 0.001)
+        app.config.setdefault('PERFILADOR_TTL', 86400)
+        app.config.setdefault('PERFILADOR_MAX', 50)
+        if not app.config['PERFILADOR_HABILITADO']:
+            return
+        app.before_request(self._iniciar)
+        app.after_request(self._terminar)
+        app.teardown_request(self._limpiar)
+        app.extensions['perfilador'] = self
+
+    def _pedido(self) -> bool:
+        return self.CABECERA in request.headers or self.PARAMETRO in request.args
+
+    def _iniciar(self):
+        if not self._pedido():
+            return
+        claims = verificar_jwt(opcional=True)
+        if not claims or claims.get('role') != 'administrador':
+            return
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            current_app.logger.warning("pyinstrument no está instalado: no se puede perfilar la petición")
+            return
+
+        profiler = Profiler(interval=current_app.config['PERFILADOR_INTERVALO'], async_mode='disabled')
+        g._perfilador = (profiler, claims.get('sub'), time.perf_counter())
+        profiler.start()
+
+    def _terminar(self, response):
+        registro = g.pop('_perfilador', None)
+        if registro is None:
+            return response
+        profiler, administrador, inicio = registro
+        profiler.stop()
+        duracion = time.perf_counter() - inicio
+
+        contexto = g.get('perfil_sql')
+        config = current_app.config
+        resumen = {
+            'id': uuid.uuid4().hex,
+            'fecha': datetime.utcnow().isoformat(),
+            'administrador': administrador,
+            'metodo': request.method,
+            'ruta': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'estado': response.status_code,
+            'duracion_ms': round(duracion * 1000, 2),
+            'sql': contexto.resumen(config['SQL_N_MAS_1_UMBRAL']) if contexto is not None else None,
+            'cache': dict(contexto.cache) if contexto is not None else None,
+        }
+        try:
+            guardar(resumen, profiler.last_session.to_json(), config['PERFILADOR_TTL'], config['PERFILADOR_MAX'])
+            response.headers['X-Perfil-Id'] = resumen['id']
+        except redis.exceptions.RedisError as e:
+            sentry_sdk.capture_exception(e)
+        return response
+
+    def _limpiar(self, exception=None):
+        # La vista lanzó una excepción: after_request no corrió
+        registro = g.pop('_perfilador', None)
+        if registro is not None:
+            registro[0].stop()
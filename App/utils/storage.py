@@ -2,33 +2,60 @@ import io
 import os
 import uuid
 
-import boto3
-from botocore.exceptions import ClientError
 from werkzeug.utils import secure_filename
 
-# Inicializamos el cliente de S3 apuntando a Cloudflare R2
-s3_client = boto3.client(
-    's3',
-    endpoint_url=os.getenv('R2_ENDPOINT_URL'),
-    aws_access_key_id=os.getenv('R2_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.getenv('R2_SECRET_ACCESS_KEY'),
-    region_name='auto' # R2 no usa regiones específicas como AWS
-)
+_s3_client = None
+_s3_pid = None
 
-def upload_file_to_r2(file, folder="uploads"):
+
+def obtener_cliente_s3():
+    """
+    Cliente de S3 apuntando a Cloudflare R2, creado en el primer uso de cada proceso.
+    Los clientes de boto3 no sobreviven a un fork: cada worker arma el suyo.
+    """
+    global _s3_client, _s3_pid
+    if _s3_client is None or _s3_pid != os.getpid():
+        # boto3/botocore tardan en importarse: solo se cargan al primer upload
+        import boto3
+
+        from app.utils.telemetria import instrumentar_boto
+        instrumentar_boto()
+        _s3_client = boto3.client(
+            's3',
+            endpoint_url=os.getenv('R2_ENDPOINT_URL'),
+            aws_access_key_id=os.getenv('R2_ACCESS_KEY_ID'),
+            aws_secret_access_key=os.getenv('R2_SECRET_ACCESS_KEY'),
+            region_name='auto' # R2 no usa regiones específicas como AWS
+        )
+        _s3_pid = os.getpid()
+    return _s3_client
+
+
+def reiniciar_cliente_s3():
+    """
+    Descarta el cliente actual (post-fork de gunicorn); el próximo uso crea uno nuevo.
+    """
+    global _s3_client, _s3_pid
+    _s3_client = None
+    _s3_pid = None
+
+def upload_file_to_r2(file, folder="uploads", filename=None):
     """
     Sube un archivo a Cloudflare R2 y retorna la URL pública.
+    Lo lee por partes (upload_fileobj): nunca queda entero en memoria.
     """
+    from botocore.exceptions import ClientError
+
     try:
         # 1. Limpiamos el nombre original (quita espacios y caracteres raros)
-        filename = secure_filename(file.filename)
+        filename = secure_filename(filename or file.filename)
         
         # 2. Generamos un nombre único para evitar que se sobreescriban archivos
         # Ejemplo: contratos/a1b2c3d4_contrato_juan.pdf
         unique_filename = f"{folder}/{uuid.uuid4().hex}_{filename}"
         
         # 3. Subimos el archivo a la nube
-        s3_client.upload_fileobj(
+        obtener_cliente_s3().upload_fileobj(
             file,
             os.getenv('R2_BUCKET_NAME'),
             unique_filename,
@@ -57,7 +84,7 @@ def upload_bytes_to_r2(file_bytes, filename, folder="contratos_definitivos"):
         file_obj = io.BytesIO(file_bytes)
         
         # Subimos a la nube
-        s3_client.upload_fileobj(
+        obtener_cliente_s3().upload_fileobj(
             file_obj,
             os.getenv('R2_BUCKET_NAME'),
             unique_filename,
@@ -0,0 +1,139 @@
+import os
+from contextlib import contextmanager
+
+# Exportadores de trazas de OpenTelemetry (OTEL_EXPORTADOR)
+EXPORTADORES = ('otlp', 'archivo', 'azure', 'consola')
+
+_proveedor = None
+
+
+def activa() -> bool:
+    return _proveedor is not None
+
+
+def _exportador(config):
+    tipo = config['OTEL_EXPORTADOR']
+    if tipo == 'otlp':
+        # Destino en OTEL_EXPORTER_OTLP_ENDPOINT (p. ej. http://jaeger:4318), lo lee el exportador
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if tipo == 'azure':
+        # Usa APPLICATIONINSIGHTS_CONNECTION_STRING
+        from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
+        return AzureMonitorTraceExporter()
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    if tipo == 'archivo':
+        # Un span por línea (JSON) para analizarlo después sin colector
+        destino = open(config['OTEL_ARCHIVO'], 'a', buffering=1)
+        return ConsoleSpanExporter(out=destino, formatter=lambda span: span.to_json(indent=None) + os.linesep)
+    return ConsoleSpanExporter()
+
+
+def iniciar_telemetria(config, servicio: str = None) -> bool:
+    """
+    Proveedor de trazas de OpenTelemetry del proceso, una sola vez. Sin
+    OTEL_EXPORTADOR no se importa nada de OpenTelemetry (ver benchmarks/arranque.py).
+
+    El BatchSpanProcessor rearma su hilo de exportación después de un fork, así
+    que el proveedor creado en el master de gunicorn (preload) sirve a los workers.
+    """
+    global _proveedor
+    tipo = config.get('OTEL_EXPORTADOR')
+    if _proveedor is not None or not tipo:
+        return False
+    if tipo not in EXPORTADORES:
+        raise ValueError(f"OTEL_EXPORTADOR inválido: {tipo} (opciones: {', '.join(EXPORTADORES)})")
+
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    proveedor = TracerProvider(
+        resource=Resource.create({
+            'service.name': servicio or config['OTEL_SERVICIO'],
+            'deployment.environment': config['SENTRY_ENTORNO'],
+        }),
+        # Las tareas siguen la decisión de la petición que las encoló
+        sampler=ParentBased(TraceIdRatioBased(float(config['OTEL_MUESTRA']))),
+    )
+    proveedor.add_span_processor(BatchSpanProcessor(_exportador(config)))
+    trace.set_tracer_provider(proveedor)
+    _proveedor = proveedor
+
+    from opentelemetry.instrumentation.redis import RedisInstrumentor
+    from opentelemetry.instrumentation.requests import RequestsInstrumentor
+    RedisInstrumentor().instrument()
+    # Telegram, Dialogflow REST y la descarga de comprobantes salen por requests
+    RequestsInstrumentor().instrument()
+    return True
+
+
+def instrumentar_app(app, db):
+    """
+    Peticiones de Flask y sentencias de SQLAlchemy de la app (después de db.init_app).
+    """
+    if not activa():
+        return
+    from opentelemetry.instrumentation.flask import FlaskInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+    FlaskInstrumentor().instrument_app(app, excluded_urls=app.config['OTEL_RUTAS_EXCLUIDAS'])
+    with app.app_context():
+        engines = list(db.engines.values())
+    SQLAlchemyInstrumentor().instrument(engines=engines)
+
+
+def instrumentar_boto():
+    """
+    Subidas a R2. Se llama al crear el cliente de S3 para no importar botocore al arrancar.
+    """
+    if not activa():
+        return
+    from opentelemetry.instrumentation.botocore import BotocoreInstrumentor
+    instrumentor = BotocoreInstrumentor()
+    if not instrumentor.is_instrumented_by_opentelemetry:
+        instrumentor.instrument()
+
+
+def instrumentar_celery():
+    """
+    Publica el contexto de la traza en los headers de cada .delay() y lo retoma
+    al ejecutar la tarea: la petición y sus tareas quedan en una misma traza.
+    """
+    if not activa():
+        return
+    from opentelemetry.instrumentation.celery import CeleryInstrumentor
+    instrumentor = CeleryInstrumentor()
+    if not instrumentor.is_instrumented_by_opentelemetry:
+        instrumentor.instrument()
+
+
+def inyectar_contexto(campos: dict) -> dict:
+    """
+    Agrega el contexto de la traza actual (traceparent) a los campos de un
+    mensaje que no pasa por una librería instrumentada (entradas del bus de eventos).
+    """
+    if activa():
+        from opentelemetry.propagate import inject
+        inject(campos)
+    return campos
+
+
+@contextmanager
+def span_consumidor(nombre: str, campos: dict):
+    """
+    Span CONSUMER hijo del contexto que trae el mensaje (ver inyectar_contexto):
+    lo que haga el manejador (SQL, Redis, Telegram, .delay()) queda en la traza de origen.
+    """
+    if not activa():
+        yield
+        return
+    from opentelemetry import trace
+    from opentelemetry.propagate import extract
+
+    tracer = trace.get_tracer(__name__)
+    with tracer.start_as_current_span(nombre, context=extract(campos), kind=trace.SpanKind.CONSUMER):
+        yield
@@ -0,0 +1,129 @@
+import os
+import random
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import sentry_sdk
+
+# Estados de transacción que indican falla (5xx, timeouts, tareas con excepción)
+ESTADOS_ERROR = ('internal_error', 'unavailable', 'deadline_exceeded', 'unknown_error', 'unimplemented', 'data_loss')
+
+_iniciado = False
+
+
+class MuestreoTrazas:
+    """
+    Muestreo de trazas de Sentry en dos etapas:
+
+    1. `traces_sampler` (al empezar): descarta rutas sin valor (health checks,
+       streams SSE, /metrics). Las rutas y tareas con tasa propia (GET /fecha y
+       /reserva, tareas periódicas) se muestrean acá con esa tasa: las que no
+       salen no pagan la instrumentación de sus spans. El resto se traza en la
+       fracción `candidatas`.
+    2. `before_send_transaction` (al terminar, cuando ya se conoce el resultado):
+       de las candidatas conserva siempre errores y transacciones lentas y del
+       resto envía `tasa_defecto`. Las de tasa propia ya se decidieron y pasan.
+       Los errores de una ruta caliente no muestreada igual llegan como evento de error.
+
+    La configuración sale de la clase de configuración del entorno (SENTRY_*).
+    """
+
+    def __init__(self, config):
+        self.candidatas = float(config['SENTRY_TRAZAS_CANDIDATAS'])
+        self.tasa_defecto = float(config['SENTRY_TRAZAS_TASA_DEFECTO'])
+        self.umbral_lento = float(config['SENTRY_TRAZAS_UMBRAL_LENTO_MS']) / 1000
+        self.rutas_ignoradas = tuple(config['SENTRY_TRAZAS_RUTAS_IGNORADAS'])
+        self.tasas_rutas = [(metodo, prefijo, float(tasa)) for metodo, prefijo, tasa in config['SENTRY_TRAZAS_TASAS_RUTAS']]
+        self.tasas_tareas = {tarea: float(tasa) for tarea, tasa in config['SENTRY_TRAZAS_TASAS_TAREAS'].items()}
+
+    # --- Reglas ------------------------------------------------------------
+
+    def tasa_ruta(self, metodo: str, ruta: str):
+        """
+        Tasa propia de la ruta, o None si se muestrea como candidata.
+        """
+        for metodo_regla, prefijo, tasa in self.tasas_rutas:
+            if metodo_regla in (metodo, '*') and ruta.startswith(prefijo):
+                return tasa
+        return None
+
+    def tasa_tarea(self, tarea: str):
+        return self.tasas_tareas.get(tarea)
+
+    # --- Etapa 1: al empezar la transacción ----------------------------------
+
+    def traces_sampler(self, contexto: dict) -> float:
+        # Si quien nos llamó ya decidió (traza distribuida), respetamos su decisión
+        if contexto.get('parent_sampled') is not None:
+            return float(contexto['parent_sampled'])
+
+        tasa = None
+        entorno_wsgi = contexto.get('wsgi_environ')
+        if entorno_wsgi is not None:
+            ruta = entorno_wsgi.get('PATH_INFO', '')
+            if ruta.startswith(self.rutas_ignoradas) or entorno_wsgi.get('REQUEST_METHOD') == 'OPTIONS':
+                return 0.0
+            tasa = self.tasa_ruta(entorno_wsgi.get('REQUEST_METHOD', 'GET'), ruta)
+        elif contexto.get('celery_job'):
+            tasa = self.tasa_tarea(contexto['celery_job'].get('task', ''))
+        return tasa if tasa is not None else self.candidatas
+
+    # --- Etapa 2: con el resultado conocido ----------------------------------
+
+    @staticmethod
+    def _duracion(evento: dict) -> float:
+        inicio, fin = evento.get('start_timestamp'), evento.get('timestamp')
+        if isinstance(inicio, str):
+            inicio, fin = datetime.fromisoformat(inicio.rstrip('Z')), datetime.fromisoformat(fin.rstrip('Z'))
+        if isinstance(inicio, datetime):
+            return (fin - inicio).total_seconds()
+        return float(fin or 0) - float(inicio or 0)
+
+    def before_send_transaction(self, evento: dict, hint=None):
+        solicitud = evento.get('request') or {}
+        if solicitud.get('url'):
+            tasa = self.tasa_ruta(solicitud.get('method', 'GET'), urlsplit(solicitud['url']).path)
+        else:
+            tasa = self.tasa_tarea(evento.get('transaction', ''))
+        if tasa is not None:
+            # Muestreada al empezar con la tasa de su ruta o tarea
+            return evento
+
+        traza = (evento.get('contexts') or {}).get('trace') or {}
+        codigo_http = (evento.get('tags') or {}).get('http.status_code')
+        if traza.get('status') in ESTADOS_ERROR or (codigo_http and int(codigo_http) >= 500):
+            return evento
+        try:
+            if self._duracion(evento) >= self.umbral_lento:
+                return evento
+        except (TypeError, ValueError):
+            return evento
+        return evento if random.random() < self.tasa_defecto else None
+
+
+def iniciar_sentry(config, celery: bool = False):
+    """
+    Inicializa Sentry una sola vez por proceso con el muestreo configurado.
+    El worker de Celery lo llama antes que create_app y agrega la integración de Celery.
+    """
+    global _iniciado
+    dsn = os.getenv("SENTRY_DSN_BACKEND")
+    if _iniciado or not dsn:
+        return
+
+    # Las integraciones se importan solo si Sentry está configurado
+    from sentry_sdk.integrations.flask import FlaskIntegration
+    integraciones = [FlaskIntegration()]
+    if celery:
+        from sentry_sdk.integrations.celery import CeleryIntegration
+        integraciones.append(CeleryIntegration(monitor_beat_tasks=False))
+
+    muestreo = MuestreoTrazas(config)
+    sentry_sdk.init(
+        dsn=dsn,
+        environment=config['SENTRY_ENTORNO'],
+        integrations=integraciones,
+        traces_sampler=muestreo.traces_sampler,
+        before_send_transaction=muestreo.before_send_transaction,
+    )
+    _iniciado = True
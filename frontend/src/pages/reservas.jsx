@@ -29,6 +29,32 @@ function Reservas() {
       }
     };
     fetchFechas();
+
+    // Cambios en vivo del calendario (SSE): evita volver a pedir /fecha completo
+    const stream = new EventSource('/api/v1/stream/calendario');
+    stream.addEventListener('fecha', (event) => {
+      const fecha = JSON.parse(event.data);
+      setFechas((prev) => ({ ...prev, [fecha.dia]: fecha }));
+    });
+    stream.addEventListener('fecha_eliminada', (event) => {
+      const { id } = JSON.parse(event.data);
+      setFechas((prev) => Object.fromEntries(Object.entries(prev).filter(([, f]) => f.id !== id)));
+    });
+    stream.addEventListener('resync', fetchFechas);
+
+    // Si el servidor no tiene lugar para el stream (503) el EventSource queda cerrado:
+    // volvemos a pedir el calendario cada 30 segundos
+    let polling = null;
+    stream.onerror = () => {
+      if (stream.readyState === EventSource.CLOSED && !polling) {
+        polling = setInterval(fetchFechas, 30000);
+      }
+    };
+
+    return () => {
+      stream.close();
+      if (polling) clearInterval(polling);
+    };
   }, []);
 
   const handleDateClick = (dateString) => {